@@ -30,6 +30,8 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+_TRUTHY = frozenset({"1", "true", "yes", "on"})
+
 
 @dataclass
 class APIConfig:
@@ -74,6 +76,17 @@ class APIManager:
         except (ValueError, TypeError):
             return default
     
+    @classmethod
+    def _env_int(cls, name: str, default: int = 0) -> int:
+        """Read an integer environment variable, falling back to default."""
+        return cls._safe_int(os.getenv(name, ""), default)
+    
+    @staticmethod
+    def _env_bool(name: str, default: bool = False) -> bool:
+        """Read a boolean environment variable (1/true/yes/on)."""
+        value = os.getenv(name)
+        return default if value is None else value.lower() in _TRUTHY
+    
     def _load_default_apis(self):
         """Load all APIs from environment variables."""
         
@@ -109,14 +122,14 @@ class APIManager:
                 "refresh_token": os.getenv("TWITCH_REFRESH_TOKEN", ""),
                 "broadcaster_id": os.getenv("TWITCH_BROADCASTER_ID", ""),
                 "channel_name": os.getenv("TWITCH_CHANNEL_NAME", ""),
-                "guild_id": self._safe_int(os.getenv("TWITCH_GUILD_ID", "0"), 0),
-                "live_role_id": self._safe_int(os.getenv("TWITCH_LIVE_ROLE_ID", "0"), 0),
-                "announce_channel_id": self._safe_int(os.getenv("TWITCH_ANNOUNCE_CHANNEL_ID", "0"), 0),
-                "clips_channel_id": self._safe_int(os.getenv("TWITCH_CLIPS_CHANNEL_ID", "0"), 0),
-                "reminder_channel_id": self._safe_int(os.getenv("TWITCH_REMINDER_CHANNEL_ID", "0"), 0),
-                "event_log_channel_id": self._safe_int(os.getenv("TWITCH_EVENT_LOG_CHANNEL_ID", "0"), 0),
-                "monitor_interval": self._safe_int(os.getenv("TWITCH_MONITOR_INTERVAL", "60"), 60),
-                "chat_enabled": os.getenv("TWITCH_CHAT_ENABLED", "true").lower() in {"1", "true", "yes", "on"},
+                "guild_id": self._env_int("TWITCH_GUILD_ID", 0),
+                "live_role_id": self._env_int("TWITCH_LIVE_ROLE_ID", 0),
+                "announce_channel_id": self._env_int("TWITCH_ANNOUNCE_CHANNEL_ID", 0),
+                "clips_channel_id": self._env_int("TWITCH_CLIPS_CHANNEL_ID", 0),
+                "reminder_channel_id": self._env_int("TWITCH_REMINDER_CHANNEL_ID", 0),
+                "event_log_channel_id": self._env_int("TWITCH_EVENT_LOG_CHANNEL_ID", 0),
+                "monitor_interval": self._env_int("TWITCH_MONITOR_INTERVAL", 60),
+                "chat_enabled": self._env_bool("TWITCH_CHAT_ENABLED", True),
                 "description": "Twitch API and Integration Settings"
             }
         )
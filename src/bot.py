@@ -1,4 +1,8 @@
+import asyncio
 import datetime as dt
+import random
+
+import aiohttp
 import discord
 from discord.ext import commands
 
@@ -6,7 +10,7 @@ import integration
 from api_manager import require_token
 from discord_bot import analytics, command_handler, lifecycle, maintenance, storage_api, utils_misc
 from discord_bot.config_store import get_guild_config, set_guild_config
-from discord_bot.games import coin_flip, poll_creator, rps_game, roll_dice
+from discord_bot.games import coin_flip, parse_poll_payload, poll_creator, rps_game, roll_dice
 from discord_bot.member_roles import (
     on_member_join as handle_member_join,
     on_member_remove as handle_member_remove,
@@ -31,11 +35,10 @@ from discord_bot import gaming_utilities
 from integrations import ai_integration
 # Import external APIs
 from integrations import external_apis
+from discord_bot.messaging import send_paginated, send_queued
 from discord_bot.notifications import notify_user, react_to_message, send_announcement
 from discord_bot.scheduler import temporary_message
 from discord_bot.security import is_admin, is_moderator
-from integrations.spotify_integration import SpotifyIntegration
-from integrations.twitch_integration import TwitchIntegration
 
 # Optional import for check_imports
 try:
@@ -51,25 +54,39 @@ intents = discord.Intents.default()
 intents.message_content = True  # Enable for prefix commands
 intents.members = True  # Enable for member events
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = commands.Bot(
+    command_prefix="!",
+    intents=intents,
+    allowed_mentions=discord.AllowedMentions.none(),
+)
+
+# Role panel buttons carry their role id, so they dispatch across restarts.
+bot.add_dynamic_items(admin_tools.RoleButton)
 
-# Initialize integrations with error handling
+# Integrations are constructed in main() so importing this module stays cheap
 twitch = None
 spotify = None
 
-try:
-    twitch = TwitchIntegration(bot)
-    print("✓ Twitch integration initialized")
-except Exception as e:
-    print(f"⚠ Warning: Twitch integration failed to initialize: {e}")
-    print("  Twitch commands will be disabled. Check your Twitch API credentials in .env")
 
-try:
-    spotify = SpotifyIntegration(bot)
-    print("✓ Spotify integration initialized")
-except Exception as e:
-    print(f"⚠ Warning: Spotify integration failed to initialize: {e}")
-    print("  Spotify commands will be disabled. Check your Spotify API credentials in .env")
+def _init_integrations() -> None:
+    """Import and construct the Twitch and Spotify integrations."""
+    global twitch, spotify
+    from integrations.spotify_integration import SpotifyIntegration
+    from integrations.twitch_integration import TwitchIntegration
+
+    try:
+        twitch = TwitchIntegration(bot)
+        print("✓ Twitch integration initialized")
+    except Exception as e:
+        print(f"⚠ Warning: Twitch integration failed to initialize: {e}")
+        print("  Twitch commands will be disabled. Check your Twitch API credentials in .env")
+
+    try:
+        spotify = SpotifyIntegration(bot)
+        print("✓ Spotify integration initialized")
+    except Exception as e:
+        print(f"⚠ Warning: Spotify integration failed to initialize: {e}")
+        print("  Spotify commands will be disabled. Check your Spotify API credentials in .env")
 
 # Initialize auto-moderation configuration
 automod_config = automod.AutoModConfig()
@@ -98,8 +115,53 @@ def _get_channel_from_config(
     return channel if isinstance(channel, discord.TextChannel) else None
 
 
+# (guild_id, user_id) -> moderator status; dropped on member updates
+_mod_check_cache = storage_api.TTLCache(maxsize=1024, ttl=30)
+
+
 def _mod_check(ctx: commands.Context) -> bool:
-    return isinstance(ctx.author, discord.Member) and (is_admin(ctx.author) or is_moderator(ctx.author))
+    if not isinstance(ctx.author, discord.Member):
+        return False
+    key = (ctx.author.guild.id, ctx.author.id)
+    result = _mod_check_cache.get(key)
+    if result is None:
+        result = is_admin(ctx.author) or is_moderator(ctx.author)
+        _mod_check_cache[key] = result
+    return result
+
+
+def _audit_reason(ctx: commands.Context, action: str) -> str:
+    """Audit-log reason naming the moderator, e.g. 'Muted by name'."""
+    return f"{action} by {ctx.author}"
+
+
+class NotTextChannel(commands.CheckFailure):
+    """Raised when a command needs a guild text channel but was used elsewhere."""
+
+
+def _text_channel_only():
+    """Check that the command is invoked from a guild text channel."""
+    def predicate(ctx: commands.Context) -> bool:
+        if not isinstance(ctx.channel, discord.TextChannel):
+            raise NotTextChannel("This command can only be used in a text channel.")
+        return True
+    return commands.check(predicate)
+
+
+class NotInVoiceChannel(commands.CheckFailure):
+    """Raised when a command needs the author to be in a voice channel."""
+
+
+def _requires_voice():
+    """Check that the author is connected to a (non-stage) voice channel."""
+    def predicate(ctx: commands.Context) -> bool:
+        voice = ctx.author.voice if isinstance(ctx.author, discord.Member) else None
+        if not voice or not voice.channel:
+            raise NotInVoiceChannel("You need to be in a voice channel to use this command.")
+        if not isinstance(voice.channel, discord.VoiceChannel):
+            raise NotInVoiceChannel("You need to be in a voice channel (not a stage channel).")
+        return True
+    return commands.check(predicate)
 
 
 def _check_integration(integration, name: str) -> bool:
@@ -148,9 +210,15 @@ async def on_command_completion(ctx: commands.Context):
 @bot.event
 async def on_command_error(ctx: commands.Context, error: commands.CommandError):
     analytics.log_error(error)
+    if isinstance(error, commands.NoPrivateMessage):
+        await send_queued(ctx, "This command can only be used in a server.")
+        return
+    if isinstance(error, (NotTextChannel, NotInVoiceChannel)):
+        await send_queued(ctx, str(error))
+        return
     if isinstance(error, (commands.CommandNotFound, commands.CheckFailure, commands.CommandOnCooldown)):
         return
-    await ctx.send(f"Error: {error}")
+    await send_queued(ctx, f"Error: {error}")
 
 
 @bot.before_invoke
@@ -158,7 +226,7 @@ async def _rate_limit(ctx: commands.Context):
     if ctx.author.bot or not ctx.command:
         return
     if not command_handler.cooldown_check(ctx.author.id, ctx.command.name):
-        await ctx.send("Slow down, that command is on cooldown.")
+        await send_queued(ctx, "Slow down, that command is on cooldown.")
         raise commands.CheckFailure("On cooldown")
 
 
@@ -174,6 +242,7 @@ async def on_member_join(member: discord.Member):
     
     # Check for suspicious alt accounts
     is_suspicious, reason = await automod.detect_alt_account(member)
+    automod.index_member_name(member)
     if is_suspicious:
         log_channel_id = logging_system.get_log_channel(member.guild.id)
         if log_channel_id:
@@ -201,6 +270,8 @@ async def on_member_join(member: discord.Member):
 
 @bot.event
 async def on_member_remove(member: discord.Member):
+    automod.unindex_member_name(member)
+    
     # Update server stats
     await community_features.update_server_stats(member.guild.id, members_left=1)
     
@@ -270,6 +341,23 @@ async def on_message_edit(before: discord.Message, after: discord.Message):
         await logging_system.send_to_log_channel(before.guild, embed)
 
 
+@bot.event
+async def on_user_update(before: discord.User, after: discord.User):
+    """Keep the alt-detection name index current across username changes."""
+    if before.name != after.name:
+        for guild in after.mutual_guilds:
+            member = guild.get_member(after.id)
+            if member:
+                automod.index_member_name(member)
+
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    """Forget cached permission checks when a member's roles change."""
+    if before.roles != after.roles:
+        _mod_check_cache.pop((after.guild.id, after.id))
+
+
 @bot.event
 async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
     """Handle reaction role assignments."""
@@ -286,7 +374,7 @@ async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
 async def status(ctx: commands.Context):
     """Return the current status from the integration layer."""
     message = await integration.get_status()
-    await ctx.send(message)
+    await send_queued(ctx, message)
 
 
 @bot.command(name="search")
@@ -294,7 +382,7 @@ async def search(ctx: commands.Context, *, query: str):
     """Run a quick web search."""
     results = await integration.search_web(query)
     if not results:
-        await ctx.send("No results found.")
+        await send_queued(ctx, "No results found.")
         return
 
     lines = []
@@ -314,7 +402,7 @@ async def search(ctx: commands.Context, *, query: str):
             break
 
     message = "\n".join(lines)
-    await ctx.send(message[:1990] or "No results found.")
+    await send_queued(ctx, message[:1990] or "No results found.")
 
 
 @bot.command(name="imagine", aliases=["art", "image"])
@@ -322,7 +410,7 @@ async def imagine(ctx: commands.Context, *, prompt: str):
     """Generate AI art using a ChatGPT-style prompt enhancer + image model."""
     result = await integration.generate_art(prompt)
     if result.get("error"):
-        await ctx.send(result["error"])
+        await send_queued(ctx, result["error"])
         return
 
     url = result.get("url") or ""
@@ -330,7 +418,7 @@ async def imagine(ctx: commands.Context, *, prompt: str):
     text = f"Prompt: {prompt_used}"
     if url:
         text += f"\n{url}"
-    await ctx.send(text[:1990])
+    await send_queued(ctx, text[:1990])
 
 
 # =============================================================================
@@ -341,74 +429,74 @@ async def imagine(ctx: commands.Context, *, prompt: str):
 async def uptime(ctx: commands.Context):
     """Report Twitch stream uptime."""
     if not twitch:
-        await ctx.send("❌ Twitch integration is not configured.")
+        await send_queued(ctx, "❌ Twitch integration is not configured.")
         return
     await twitch.check_stream_live()
-    await ctx.send(twitch.stream_uptime())
+    await send_queued(ctx, twitch.stream_uptime())
 
 
 @bot.command(name="live")
 async def live(ctx: commands.Context):
     """Check if Twitch stream is live and post embed."""
     if not twitch:
-        await ctx.send("❌ Twitch integration is not configured.")
+        await send_queued(ctx, "❌ Twitch integration is not configured.")
         return
     await twitch.check_stream_live()
     if not twitch.state.is_live:
-        await ctx.send("Stream is offline.")
+        await send_queued(ctx, "Stream is offline.")
         return
     embed = twitch.create_stream_embed(live=True)
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="twitchstats", aliases=["tstats"])
 async def twitchstats(ctx: commands.Context):
     """Show Twitch stream stats summary."""
     if not twitch:
-        await ctx.send("❌ Twitch integration is not configured.")
+        await send_queued(ctx, "❌ Twitch integration is not configured.")
         return
     summary = await twitch.stream_stats_summary()
-    await ctx.send(summary[:1990])
+    await send_queued(ctx, summary[:1990])
 
 
 @bot.command(name="tchat")
 async def tchat(ctx: commands.Context, *, message: str):
     """Relay a Discord message to Twitch chat."""
     if not twitch:
-        await ctx.send("❌ Twitch integration is not configured.")
+        await send_queued(ctx, "❌ Twitch integration is not configured.")
         return
     await twitch.relay_discord_chat_to_twitch(ctx.author.display_name, message)
-    await ctx.send("Sent to Twitch chat.")
+    await send_queued(ctx, "Sent to Twitch chat.")
 
 
 @bot.command(name="followers")
 async def followers(ctx: commands.Context):
     """Show follower count."""
     if not twitch:
-        await ctx.send("❌ Twitch integration is not configured.")
+        await send_queued(ctx, "❌ Twitch integration is not configured.")
         return
     count = await twitch.get_follow_count()
-    await ctx.send(f"Followers: {count or 'N/A'}")
+    await send_queued(ctx, f"Followers: {count or 'N/A'}")
 
 
 @bot.command(name="subs")
 async def subs(ctx: commands.Context):
     """Show subscriber count."""
     if not twitch:
-        await ctx.send("❌ Twitch integration is not configured.")
+        await send_queued(ctx, "❌ Twitch integration is not configured.")
         return
     count = await twitch.get_subscriber_count()
-    await ctx.send(f"Subscribers: {count or 'N/A'}")
+    await send_queued(ctx, f"Subscribers: {count or 'N/A'}")
 
 
 @bot.command(name="streamgame")
 async def streamgame(ctx: commands.Context):
     """Report the current game/category."""
     if not twitch:
-        await ctx.send("❌ Twitch integration is not configured.")
+        await send_queued(ctx, "❌ Twitch integration is not configured.")
         return
     await twitch.check_stream_live()
-    await ctx.send(f"Game/category: {twitch.stream_game_category()}")
+    await send_queued(ctx, f"Game/category: {twitch.stream_game_category()}")
 
 
 @bot.command(name="health")
@@ -428,46 +516,54 @@ async def health(ctx: commands.Context):
         parts.append("Spotify: Not configured")
     
     combined = "\n".join(parts)
-    await ctx.send(combined[:1990])
+    await send_queued(ctx, combined[:1990])
 
 
 # =============================================================================
 # Spotify Commands
 # =============================================================================
 
+# timeframe argument -> (Spotify time_range, display label)
+_TIMEFRAMES = {
+    "short": ("short_term", "4 weeks"),
+    "medium": ("medium_term", "6 months"),
+    "long": ("long_term", "all time"),
+}
+
 @bot.command(name="spotify", aliases=["sp", "nowlistening"])
 async def spotify_now(ctx: commands.Context):
     """Show what's currently playing on Spotify."""
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     track = await spotify.get_current_track()
     if not track:
-        await ctx.send("Nothing is playing on Spotify right now, or Spotify integration is not configured.")
+        await send_queued(ctx, "Nothing is playing on Spotify right now, or Spotify integration is not configured.")
         return
     embed = spotify.create_now_playing_embed(track)
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="spotifysearch", aliases=["spsearch", "searchtrack"])
 async def spotify_search(ctx: commands.Context, *, query: str):
     """Search for tracks on Spotify."""
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     tracks = await spotify.search_track(query, limit=5)
     if not tracks:
-        await ctx.send("No tracks found or Spotify integration is not configured.")
+        await send_queued(ctx, "No tracks found or Spotify integration is not configured.")
         return
     
-    lines = ["**Spotify Search Results:**"]
-    for idx, track in enumerate(tracks, start=1):
-        duration_sec = track["duration_ms"] // 1000
-        duration_str = f"{duration_sec // 60}:{duration_sec % 60:02d}"
-        lines.append(f"{idx}. **{track['name']}** by {track['artist']} [{duration_str}]\n   {track['url']}")
-    
-    message = "\n".join(lines)
-    await ctx.send(message[:1990])
+    await send_paginated(
+        ctx,
+        "**Spotify Search Results:**",
+        (
+            f"{idx}. **{track['name']}** by {track['artist']} [{minutes}:{seconds:02d}]\n   {track['url']}"
+            for idx, track in enumerate(tracks, start=1)
+            for minutes, seconds in [divmod(track["duration_ms"] // 1000, 60)]
+        ),
+    )
 
 
 @bot.command(name="toptracks", aliases=["mytoptracks"])
@@ -477,27 +573,23 @@ async def top_tracks(ctx: commands.Context, timeframe: str = "medium"):
     Timeframe: short (4 weeks), medium (6 months), long (all time)
     """
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
-    time_range_map = {
-        "short": "short_term",
-        "medium": "medium_term",
-        "long": "long_term",
-    }
-    time_range = time_range_map.get(timeframe.lower(), "medium_term")
+    time_range, timeframe_label = _TIMEFRAMES.get(timeframe.lower(), _TIMEFRAMES["medium"])
     
     tracks = await spotify.get_top_tracks(time_range=time_range, limit=10)
     if not tracks:
-        await ctx.send("Could not fetch top tracks. Make sure Spotify integration is configured.")
+        await send_queued(ctx, "Could not fetch top tracks. Make sure Spotify integration is configured.")
         return
     
-    timeframe_display = {"short_term": "4 weeks", "medium_term": "6 months", "long_term": "all time"}
-    lines = [f"**Your Top Tracks ({timeframe_display.get(time_range, 'recent')}):**"]
-    for idx, track in enumerate(tracks, start=1):
-        lines.append(f"{idx}. **{track['name']}** by {track['artist']}\n   {track['url']}")
-    
-    message = "\n".join(lines)
-    await ctx.send(message[:1990])
+    await send_paginated(
+        ctx,
+        f"**Your Top Tracks ({timeframe_label}):**",
+        (
+            f"{idx}. **{track['name']}** by {track['artist']}\n   {track['url']}"
+            for idx, track in enumerate(tracks, start=1)
+        ),
+    )
 
 
 @bot.command(name="topartists", aliases=["mytopartists"])
@@ -506,48 +598,46 @@ async def top_artists(ctx: commands.Context, timeframe: str = "medium"):
     Show your top artists on Spotify.
     Timeframe: short (4 weeks), medium (6 months), long (all time)
     """
-    time_range_map = {
-        "short": "short_term",
-        "medium": "medium_term",
-        "long": "long_term",
-    }
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
-    time_range = time_range_map.get(timeframe.lower(), "medium_term")
+    time_range, timeframe_label = _TIMEFRAMES.get(timeframe.lower(), _TIMEFRAMES["medium"])
     
     artists = await spotify.get_top_artists(time_range=time_range, limit=10)
     if not artists:
-        await ctx.send("Could not fetch top artists. Make sure Spotify integration is configured.")
+        await send_queued(ctx, "Could not fetch top artists. Make sure Spotify integration is configured.")
         return
     
-    timeframe_display = {"short_term": "4 weeks", "medium_term": "6 months", "long_term": "all time"}
-    lines = [f"**Your Top Artists ({timeframe_display.get(time_range, 'recent')}):**"]
-    for idx, artist in enumerate(artists, start=1):
-        followers_str = f"{artist['followers']:,}" if artist['followers'] > 0 else "N/A"
-        lines.append(f"{idx}. **{artist['name']}** ({artist['genres']})\n   Followers: {followers_str} | {artist['url']}")
-    
-    message = "\n".join(lines)
-    await ctx.send(message[:1990])
+    await send_paginated(
+        ctx,
+        f"**Your Top Artists ({timeframe_label}):**",
+        (
+            f"{idx}. **{artist['name']}** ({artist['genres']})\n   Followers: {followers} | {artist['url']}"
+            for idx, artist in enumerate(artists, start=1)
+            for followers in [f"{artist['followers']:,}" if artist["followers"] > 0 else "N/A"]
+        ),
+    )
 
 
 @bot.command(name="playlists", aliases=["myplaylists", "spotifyplaylists"])
 async def playlists(ctx: commands.Context):
     """Show your Spotify playlists."""
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     playlists = await spotify.get_playlists(limit=10)
     if not playlists:
-        await ctx.send("Could not fetch playlists. Make sure Spotify integration is configured.")
+        await send_queued(ctx, "Could not fetch playlists. Make sure Spotify integration is configured.")
         return
     
-    lines = ["**Your Spotify Playlists:**"]
-    for idx, playlist in enumerate(playlists, start=1):
-        lines.append(f"{idx}. **{playlist['name']}** by {playlist['owner']}\n   {playlist['tracks']} tracks | {playlist['url']}")
-    
-    message = "\n".join(lines)
-    await ctx.send(message[:1990])
+    await send_paginated(
+        ctx,
+        "**Your Spotify Playlists:**",
+        (
+            f"{idx}. **{playlist['name']}** by {playlist['owner']}\n   {playlist['tracks']} tracks | {playlist['url']}"
+            for idx, playlist in enumerate(playlists, start=1)
+        ),
+    )
 
 
 # =============================================================================
@@ -555,105 +645,95 @@ async def playlists(ctx: commands.Context):
 # =============================================================================
 
 @bot.command(name="join", aliases=["connect"])
+@_requires_voice()
 async def join_voice(ctx: commands.Context):
     """Join your current voice channel."""
-    if not isinstance(ctx.author, discord.Member) or not ctx.author.voice or not ctx.author.voice.channel:
-        await ctx.send("You need to be in a voice channel to use this command.")
-        return
-    
     channel = ctx.author.voice.channel
-    if not isinstance(channel, discord.VoiceChannel):
-        await ctx.send("You need to be in a voice channel (not a stage channel).")
-        return
     
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
     message = await spotify.join_voice(channel)
-    await ctx.send(message)
+    await send_queued(ctx, message)
 
 
 @bot.command(name="leave", aliases=["disconnect", "dc"])
+@commands.guild_only()
 async def leave_voice(ctx: commands.Context):
     """Leave the current voice channel."""
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
     message = await spotify.leave_voice()
-    await ctx.send(message)
+    await send_queued(ctx, message)
 
 
 @bot.command(name="play", aliases=["p"])
+@commands.guild_only()
+@_requires_voice()
 async def play_music(ctx: commands.Context, *, query: str):
     """
     Play a song from Spotify search.
     Example: !play never gonna give you up
     """
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
     # Auto-join if not connected
     if not spotify.voice_client or not spotify.voice_client.is_connected():
-        if isinstance(ctx.author, discord.Member) and ctx.author.voice and ctx.author.voice.channel:
-            channel = ctx.author.voice.channel
-            if isinstance(channel, discord.VoiceChannel):
-                await spotify.join_voice(channel)
-            else:
-                await ctx.send("You need to be in a voice channel (not a stage channel).")
-                return
-        else:
-            await ctx.send("You need to be in a voice channel or the bot needs to be connected to one.")
-            return
+        await spotify.join_voice(ctx.author.voice.channel)
     
     message = await spotify.play_track(query, requester=ctx.author.display_name)
-    await ctx.send(message)
+    await send_queued(ctx, message)
 
 
 @bot.command(name="pause")
 async def pause_music(ctx: commands.Context):
     """Pause the current playback."""
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
     message = await spotify.pause()
-    await ctx.send(message)
+    await send_queued(ctx, message)
 
 
 @bot.command(name="resume", aliases=["unpause"])
 async def resume_music(ctx: commands.Context):
     """Resume paused playback."""
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
     message = await spotify.resume()
-    await ctx.send(message)
+    await send_queued(ctx, message)
 
 
 @bot.command(name="skip", aliases=["next", "s"])
+@commands.guild_only()
 async def skip_music(ctx: commands.Context):
     """Skip the current track."""
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
     message = await spotify.skip()
-    await ctx.send(message)
+    await send_queued(ctx, message)
 
 
 @bot.command(name="stop")
+@commands.guild_only()
 async def stop_music(ctx: commands.Context):
     """Stop playback and clear the queue."""
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
     message = await spotify.stop_playback()
-    await ctx.send(message)
+    await send_queued(ctx, message)
 
 
 @bot.command(name="loop", aliases=["repeat"])
@@ -664,11 +744,11 @@ async def loop_music(ctx: commands.Context, mode: str = "off"):
     Example: !loop track
     """
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
     message = await spotify.set_loop(mode)
-    await ctx.send(message)
+    await send_queued(ctx, message)
 
 
 @bot.command(name="volume", aliases=["vol", "v"])
@@ -678,68 +758,49 @@ async def set_volume(ctx: commands.Context, volume: int):
     Example: !volume 50
     """
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
     message = await spotify.set_volume(volume)
-    await ctx.send(message)
+    await send_queued(ctx, message)
 
 
 @bot.command(name="queue", aliases=["q"])
 async def show_queue(ctx: commands.Context):
     """Show the current music queue."""
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
     embed = spotify.create_queue_embed()
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="nowplaying", aliases=["np", "current"])
+@commands.guild_only()
 async def now_playing(ctx: commands.Context):
     """Show the currently playing track in voice."""
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
-    if not spotify.current_track:
-        await ctx.send("Nothing is currently playing.")
+    embed = spotify.create_voice_now_playing_embed()
+    if not embed:
+        await send_queued(ctx, "Nothing is currently playing.")
         return
     
-    track = spotify.current_track
-    embed = discord.Embed(
-        title="🎵 Now Playing",
-        description=f"**{track['name']}**",
-        color=discord.Color.green(),
-        url=track['url'],
-    )
-    
-    embed.add_field(name="Artist", value=track['artist'], inline=True)
-    embed.add_field(name="Album", value=track.get('album', 'Unknown'), inline=True)
-    
-    if track.get('duration_ms'):
-        duration_sec = track['duration_ms'] // 1000
-        duration_str = f"{duration_sec // 60}:{duration_sec % 60:02d}"
-        embed.add_field(name="Duration", value=duration_str, inline=True)
-    
-    if track.get('requester'):
-        embed.add_field(name="Requested by", value=track['requester'], inline=True)
-    
-    embed.set_footer(text="Spotify Music Player")
-    
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="clearqueue", aliases=["cq", "clear"])
 async def clear_queue(ctx: commands.Context):
     """Clear the music queue."""
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
     message = await spotify.clear_queue()
-    await ctx.send(message)
+    await send_queued(ctx, message)
 
 
 @bot.command(name="remove", aliases=["rm"])
@@ -749,22 +810,22 @@ async def remove_from_queue(ctx: commands.Context, position: int):
     Example: !remove 3
     """
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
     message = await spotify.remove_from_queue(position)
-    await ctx.send(message)
+    await send_queued(ctx, message)
 
 
 @bot.command(name="shuffle")
 async def shuffle_queue(ctx: commands.Context):
     """Shuffle the music queue."""
     if not spotify:
-        await ctx.send("❌ Spotify integration is not configured.")
+        await send_queued(ctx, "❌ Spotify integration is not configured.")
         return
     
     message = await spotify.shuffle_queue()
-    await ctx.send(message)
+    await send_queued(ctx, message)
 
 
 # =============================================================================
@@ -783,14 +844,14 @@ async def reloadext(ctx: commands.Context, *extensions: str):
     if failed:
         errs = "; ".join(f"{name} ({err})" for name, err in failed)
         parts.append(f"Failed: {errs}")
-    await ctx.send("; ".join(parts) if parts else "No extensions reloaded.")
+    await send_queued(ctx, "; ".join(parts) if parts else "No extensions reloaded.")
 
 
 @bot.command(name="shutdown")
 @commands.has_permissions(manage_guild=True)
 async def shutdown(ctx: commands.Context):
     """Gracefully shut down the bot (manage_guild only)."""
-    await ctx.send("Shutting down...")
+    await send_queued(ctx, "Shutting down...")
     if spotify:
         await spotify.stop()
     if twitch:
@@ -807,176 +868,168 @@ async def shutdown(ctx: commands.Context):
 async def warn(ctx: commands.Context, member: discord.Member, *, reason: str = "No reason provided"):
     """Warn a user with escalation (mods/admins)."""
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
     if not isinstance(ctx.author, discord.Member):
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     count, action, escalation_msg = await warning_system.warn_user_with_escalation(
         member, ctx.author, reason
     )
-    await ctx.send(f"⚠️ {member.mention} has been warned. Total warnings: {count}")
+    await send_queued(ctx, f"⚠️ {member.mention} has been warned. Total warnings: {count}")
     if escalation_msg:
-        await ctx.send(escalation_msg)
+        await send_queued(ctx, escalation_msg)
 
 
 @bot.command(name="warnings")
 async def warnings_cmd(ctx: commands.Context, member: discord.Member):
     """View warnings for a user (mods/admins)."""
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     warns = await warning_system.get_user_warnings(ctx.guild.id, member.id)
     embed = await warning_system.format_warnings_embed(member, warns)
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="clearwarnings")
 async def clearwarnings(ctx: commands.Context, member: discord.Member):
     """Clear all warnings for a user (mods/admins)."""
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     cleared = await warning_system.clear_user_warnings(ctx.guild.id, member.id)
-    await ctx.send(f"✅ Cleared {cleared} warning(s) for {member.mention}")
+    await send_queued(ctx, f"✅ Cleared {cleared} warning(s) for {member.mention}")
 
 
 @bot.command(name="removewarn")
 async def removewarn(ctx: commands.Context, warning_id: int):
     """Remove a specific warning by ID (mods/admins)."""
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
     
     success = await warning_system.remove_warning(warning_id)
     if success:
-        await ctx.send(f"✅ Removed warning #{warning_id}")
+        await send_queued(ctx, f"✅ Removed warning #{warning_id}")
     else:
-        await ctx.send(f"❌ Could not find warning #{warning_id}")
+        await send_queued(ctx, f"❌ Could not find warning #{warning_id}")
 
 
 @bot.command(name="warnleaderboard", aliases=["warnlb"])
 async def warnleaderboard(ctx: commands.Context):
     """Show warning leaderboard (mods/admins)."""
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     leaderboard = await warning_system.get_leaderboard(ctx.guild.id, limit=10)
     embed = await warning_system.format_leaderboard_embed(ctx.guild, leaderboard)
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="mute")
 async def mute(ctx: commands.Context, member: discord.Member, duration: str):
     """Mute (timeout) a user for a duration like 10m or 1h."""
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
     seconds = utils_misc.parse_duration(duration)
-    msg = await mod_mute_user(member, seconds, reason=f"Muted by {ctx.author}")
-    await ctx.send(msg)
+    msg = await mod_mute_user(member, seconds, reason=_audit_reason(ctx, "Muted"))
+    await send_queued(ctx, msg)
 
 
 @bot.command(name="kick")
 async def kick(ctx: commands.Context, member: discord.Member, *, reason: str = "No reason provided"):
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
     msg = await mod_kick_user(member, reason=reason)
-    await ctx.send(msg)
+    await send_queued(ctx, msg)
 
 
 @bot.command(name="ban")
 async def ban(ctx: commands.Context, member: discord.Member, *, reason: str = "No reason provided"):
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
     msg = await mod_ban_user(member, reason=reason)
-    await ctx.send(msg)
+    await send_queued(ctx, msg)
 
 
 @bot.command(name="unban")
+@commands.guild_only()
 async def unban(ctx: commands.Context, user_id: int):
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
-        return
-    if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
-    msg = await mod_unban_user(ctx.guild, user_id, reason=f"Unbanned by {ctx.author}")
-    await ctx.send(msg)
+    msg = await mod_unban_user(ctx.guild, user_id, reason=_audit_reason(ctx, "Unbanned"))
+    await send_queued(ctx, msg)
 
 
 @bot.command(name="purge")
+@_text_channel_only()
 async def purge(ctx: commands.Context, amount: int = 10):
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
-    if not isinstance(ctx.channel, discord.TextChannel):
-        await ctx.send("This command can only be used in a text channel.")
-        return
-    msg = await purge_messages(ctx.channel, amount, reason=f"Purge by {ctx.author}")
-    await ctx.send(msg)
+    msg = await purge_messages(ctx.channel, amount, reason=_audit_reason(ctx, "Purge"))
+    await send_queued(ctx, msg)
 
 
 @bot.command(name="lock")
+@_text_channel_only()
 async def lock(ctx: commands.Context):
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
-        return
-    if not isinstance(ctx.channel, discord.TextChannel):
-        await ctx.send("This command can only be used in a text channel.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
-    msg = await mod_lock_channel(ctx.channel, reason=f"Locked by {ctx.author}")
-    await ctx.send(msg)
+    msg = await mod_lock_channel(ctx.channel, reason=_audit_reason(ctx, "Locked"))
+    await send_queued(ctx, msg)
 
 
 @bot.command(name="unlock")
+@_text_channel_only()
 async def unlock(ctx: commands.Context):
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
-    if not isinstance(ctx.channel, discord.TextChannel):
-        await ctx.send("This command can only be used in a text channel.")
-        return
-    msg = await mod_unlock_channel(ctx.channel, reason=f"Unlocked by {ctx.author}")
-    await ctx.send(msg)
+    msg = await mod_unlock_channel(ctx.channel, reason=_audit_reason(ctx, "Unlocked"))
+    await send_queued(ctx, msg)
 
 
 @bot.command(name="raidmode")
 async def raidmode(ctx: commands.Context, action: str = "status"):
     """Activate or deactivate raid mode (admins). Usage: !raidmode [on|off|status]"""
     if not isinstance(ctx.author, discord.Member) or not is_admin(ctx.author):
-        await ctx.send("You need administrator permissions.")
+        await send_queued(ctx, "You need administrator permissions.")
         return
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     action = action.lower()
     if action == "on":
         result = await automod.activate_raid_mode(ctx.guild, automod_config)
-        await ctx.send(result)
+        await send_queued(ctx, result)
     elif action == "off":
         result = await automod.deactivate_raid_mode(ctx.guild, automod_config)
-        await ctx.send(result)
+        await send_queued(ctx, result)
     else:
         is_active = automod.is_raid_mode(ctx.guild.id)
         status = "🚨 **ACTIVE**" if is_active else "✅ Inactive"
-        await ctx.send(f"Raid mode status: {status}")
+        await send_queued(ctx, f"Raid mode status: {status}")
 
 
 @bot.command(name="setlogchannel")
@@ -984,21 +1037,21 @@ async def raidmode(ctx: commands.Context, action: str = "status"):
 async def setlogchannel(ctx: commands.Context, channel: discord.TextChannel):
     """Set the channel for logging events (admins)."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     logging_system.set_log_channel(ctx.guild.id, channel.id)
-    await ctx.send(f"✅ Log channel set to {channel.mention}")
+    await send_queued(ctx, f"✅ Log channel set to {channel.mention}")
 
 
 @bot.command(name="viewlogs")
 async def viewlogs(ctx: commands.Context, log_type: str = "deleted", limit: int = 10):
     """View message logs (mods/admins). Types: deleted, edited, all"""
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     log_type = log_type.lower()
@@ -1009,10 +1062,10 @@ async def viewlogs(ctx: commands.Context, log_type: str = "deleted", limit: int
         logs = await logging_system.get_edited_messages(ctx.guild.id, limit=limit)
         embed = await logging_system.format_message_log_embed(logs, "Edited Messages")
     else:
-        await ctx.send("Invalid log type. Use: deleted, edited")
+        await send_queued(ctx, "Invalid log type. Use: deleted, edited")
         return
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 # =============================================================================
@@ -1023,34 +1076,34 @@ async def viewlogs(ctx: commands.Context, log_type: str = "deleted", limit: int
 async def rank(ctx: commands.Context, member: discord.Member | None = None):
     """Check your or another user's rank and XP."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     target = member if member else ctx.author
     if not isinstance(target, discord.Member):
-        await ctx.send("User not found.")
+        await send_queued(ctx, "User not found.")
         return
     
     stats = await leveling_system.get_user_stats(ctx.guild.id, target.id)
     if not stats:
-        await ctx.send(f"{target.mention} hasn't earned any XP yet!")
+        await send_queued(ctx, f"{target.mention} hasn't earned any XP yet!")
         return
     
     rank = await leveling_system.get_user_rank(ctx.guild.id, target.id)
     embed = await leveling_system.create_rank_card_embed(target, stats, rank)
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="leaderboard", aliases=["lb", "top"])
 async def leaderboard(ctx: commands.Context):
     """Show the XP leaderboard."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     lb = await leveling_system.get_leaderboard(ctx.guild.id, limit=10)
     embed = await leveling_system.create_leaderboard_embed(ctx.guild, lb)
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="setlevelrole")
@@ -1058,34 +1111,34 @@ async def leaderboard(ctx: commands.Context):
 async def setlevelrole(ctx: commands.Context, level: int, role: discord.Role):
     """Set a role reward for reaching a level (admins)."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     await leveling_system.set_level_role(ctx.guild.id, level, role.id)
-    await ctx.send(f"✅ Set {role.mention} as reward for reaching Level {level}")
+    await send_queued(ctx, f"✅ Set {role.mention} as reward for reaching Level {level}")
 
 
 @bot.command(name="karma", aliases=["rep", "reputation"])
 async def karma(ctx: commands.Context, member: discord.Member | None = None):
     """Check your or another user's karma."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     target = member if member else ctx.author
     if not isinstance(target, discord.Member):
-        await ctx.send("User not found.")
+        await send_queued(ctx, "User not found.")
         return
     
     karma = await community_features.get_karma(ctx.guild.id, target.id)
-    await ctx.send(f"{target.mention} has **{karma}** karma points! ⭐")
+    await send_queued(ctx, f"{target.mention} has **{karma}** karma points! ⭐")
 
 
 @bot.command(name="givekarma", aliases=["+rep", "thanks"])
 async def givekarma(ctx: commands.Context, member: discord.Member, *, reason: str = "Being awesome!"):
     """Give karma to another user."""
     if not ctx.guild or not isinstance(ctx.author, discord.Member):
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     success, message = await community_features.give_karma(
@@ -1093,16 +1146,16 @@ async def givekarma(ctx: commands.Context, member: discord.Member, *, reason: st
     )
     
     if success:
-        await ctx.send(f"✅ {ctx.author.mention} → {member.mention}: +1 karma! {message}")
+        await send_queued(ctx, f"✅ {ctx.author.mention} → {member.mention}: +1 karma! {message}")
     else:
-        await ctx.send(f"❌ {message}")
+        await send_queued(ctx, f"❌ {message}")
 
 
 @bot.command(name="karmaleaderboard", aliases=["karmalb", "toprep"])
 async def karmaleaderboard(ctx: commands.Context):
     """Show the karma leaderboard."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     lb = await community_features.get_karma_leaderboard(ctx.guild.id, limit=10)
@@ -1123,7 +1176,7 @@ async def karmaleaderboard(ctx: commands.Context):
                 description += f"{medal} {member.mention} - **{karma}** karma\n"
         embed.description = description
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="giveaway", aliases=["gstart"])
@@ -1131,7 +1184,7 @@ async def karmaleaderboard(ctx: commands.Context):
 async def giveaway(ctx: commands.Context, duration: str, winners: int, *, prize: str):
     """Start a giveaway. Example: !giveaway 1h 2 Discord Nitro"""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     seconds = utils_misc.parse_duration(duration)
@@ -1142,23 +1195,22 @@ async def giveaway(ctx: commands.Context, duration: str, winners: int, *, prize:
     end_time = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=seconds)
     
     if not isinstance(ctx.author, discord.Member):
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     embed = await community_features.create_giveaway_embed(prize, end_time, ctx.author)
     
-    message = await ctx.send(embed=embed)
+    message = await send_queued(ctx, embed=embed)
     await message.add_reaction("🎉")
     
     # Store message ID
-    from discord_bot.storage_api import database_connect
-    conn = database_connect()
+    conn = storage_api.database_connect()
     cursor = conn.cursor()
     cursor.execute("UPDATE giveaways SET message_id = ? WHERE id = ?", (message.id, giveaway_id))
     conn.commit()
     conn.close()
     
-    await ctx.send(f"✅ Giveaway started! Ends <t:{int(end_time.timestamp())}:R>")
+    await send_queued(ctx, f"✅ Giveaway started! Ends <t:{int(end_time.timestamp())}:R>")
 
 
 @bot.command(name="event", aliases=["createevent"])
@@ -1168,14 +1220,14 @@ async def create_event_cmd(ctx: commands.Context, title: str, start_time: str, *
     Example: !event "Game Night" "2024-01-15 20:00" Fun gaming session!
     """
     if not ctx.guild or not isinstance(ctx.author, discord.Member):
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     try:
         # Parse time (simple format: YYYY-MM-DD HH:MM)
         start_dt = dt.datetime.fromisoformat(start_time).replace(tzinfo=dt.timezone.utc)
     except Exception:
-        await ctx.send("Invalid time format! Use: YYYY-MM-DD HH:MM (e.g., 2024-01-15 20:00)")
+        await send_queued(ctx, "Invalid time format! Use: YYYY-MM-DD HH:MM (e.g., 2024-01-15 20:00)")
         return
     
     event_id = await community_features.create_event(
@@ -1183,17 +1235,17 @@ async def create_event_cmd(ctx: commands.Context, title: str, start_time: str, *
     )
     
     embed = await community_features.create_event_embed(title, start_dt, ctx.author, description or "")
-    message = await ctx.send(embed=embed)
+    message = await send_queued(ctx, embed=embed)
     await message.add_reaction("✅")
     
-    await ctx.send(f"✅ Event created! ID: {event_id}")
+    await send_queued(ctx, f"✅ Event created! ID: {event_id}")
 
 
 @bot.command(name="confess", aliases=["confession"])
 async def confess(ctx: commands.Context, *, content: str):
     """Submit an anonymous confession (via DM for anonymity)."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     # Delete the command message for privacy
@@ -1208,19 +1260,19 @@ async def confess(ctx: commands.Context, *, content: str):
     
     # Post to confession channel (you can configure this)
     embed = await community_features.create_confession_embed(confession_number, content)
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="serverstats", aliases=["serverinfo"])
 async def serverstats(ctx: commands.Context):
     """Show server statistics dashboard."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     stats = await community_features.get_server_stats(ctx.guild.id, days=7)
     embed = await community_features.create_stats_embed(ctx.guild, stats)
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 # =============================================================================
@@ -1232,25 +1284,25 @@ async def roll(ctx: commands.Context, expression: str):
     """Roll dice, e.g., 2d6+1."""
     try:
         total = roll_dice(expression)
-    except Exception as exc:
-        await ctx.send(f"Invalid dice expression: {exc}")
+    except ValueError as exc:
+        await send_queued(ctx, f"Invalid dice expression: {exc}")
         return
-    await ctx.send(f"Result: {total}")
+    await send_queued(ctx, f"Result: {total}")
 
 
 @bot.command(name="coin")
 async def coin(ctx: commands.Context):
-    await ctx.send(f"Flipped: {coin_flip()}")
+    await send_queued(ctx, f"Flipped: {coin_flip()}")
 
 
 @bot.command(name="rps")
 async def rps(ctx: commands.Context, choice: str):
     try:
         result = rps_game(choice)
-    except Exception as exc:
-        await ctx.send(str(exc))
+    except ValueError as exc:
+        await send_queued(ctx, str(exc))
         return
-    await ctx.send(result)
+    await send_queued(ctx, result)
 
 
 @bot.command(name="poll")
@@ -1258,17 +1310,17 @@ async def poll(ctx: commands.Context, *, payload: str):
     """
     Create a quick poll. Format: question | option1 | option2 | ...
     """
-    parts = [part.strip() for part in payload.split("|") if part.strip()]
+    parts = parse_poll_payload(payload)
     if len(parts) < 3:
-        await ctx.send("Provide a question and at least two options, separated by '|'.")
+        await send_queued(ctx, "Provide a question and at least two options, separated by '|'.")
         return
-    question, options = parts[0], parts[1:]
+    question, options = parts[0], list(parts[1:])
     try:
         content = poll_creator(question, options)
-    except Exception as exc:
-        await ctx.send(str(exc))
+    except ValueError as exc:
+        await send_queued(ctx, str(exc))
         return
-    await ctx.send(content)
+    await send_queued(ctx, content)
 
 
 # =============================================================================
@@ -1284,7 +1336,7 @@ async def droll(ctx: commands.Context, *, expression: str):
     try:
         result = gaming_utilities.roll_dice_detailed(expression)
     except Exception as exc:
-        await ctx.send(f"❌ {exc}")
+        await send_queued(ctx, f"❌ {exc}")
         return
     
     embed = discord.Embed(
@@ -1318,7 +1370,7 @@ async def droll(ctx: commands.Context, *, expression: str):
     elif result.get("fumble"):
         embed.add_field(name="💀", value="**FUMBLE!**", inline=True)
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="stats", aliases=["abilities", "abilityscores"])
@@ -1331,7 +1383,7 @@ async def stats(ctx: commands.Context, method: str = "standard"):
     try:
         scores = gaming_utilities.generate_ability_scores(method)
     except Exception as exc:
-        await ctx.send(f"❌ {exc}")
+        await send_queued(ctx, f"❌ {exc}")
         return
     
     embed = discord.Embed(
@@ -1347,7 +1399,7 @@ async def stats(ctx: commands.Context, method: str = "standard"):
     
     embed.set_footer(text="Assign these to STR, DEX, CON, INT, WIS, CHA as desired")
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="loot", aliases=["treasure", "generateloot"])
@@ -1358,7 +1410,7 @@ async def loot(ctx: commands.Context, rarity: str = "common", count: int = 1):
     Example: !loot rare 3
     """
     if count < 1 or count > 10:
-        await ctx.send("Count must be between 1 and 10.")
+        await send_queued(ctx, "Count must be between 1 and 10.")
         return
     
     items = gaming_utilities.generate_loot(rarity, count)
@@ -1372,7 +1424,7 @@ async def loot(ctx: commands.Context, rarity: str = "common", count: int = 1):
     loot_text = "\n".join(f"• {item}" for item in items)
     embed.add_field(name="Items", value=loot_text, inline=False)
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="encounter", aliases=["generateencounter"])
@@ -1382,11 +1434,11 @@ async def encounter(ctx: commands.Context, party_level: int, party_size: int = 4
     Example: !encounter 5 4 (level 5 party of 4)
     """
     if party_level < 1 or party_level > 20:
-        await ctx.send("Party level must be between 1 and 20.")
+        await send_queued(ctx, "Party level must be between 1 and 20.")
         return
     
     if party_size < 1 or party_size > 10:
-        await ctx.send("Party size must be between 1 and 10.")
+        await send_queued(ctx, "Party size must be between 1 and 10.")
         return
     
     enc = gaming_utilities.generate_encounter(party_level, party_size)
@@ -1404,7 +1456,7 @@ async def encounter(ctx: commands.Context, party_level: int, party_size: int = 4
     monsters_text = "\n".join(f"• {monster}" for monster in enc["monsters"])
     embed.add_field(name="Monsters", value=monsters_text, inline=False)
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="initiative", aliases=["init"])
@@ -1419,7 +1471,7 @@ async def initiative(ctx: commands.Context, action: str, name: str = "", initiat
       !initiative clear
     """
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     tracker = gaming_utilities.get_initiative_tracker(ctx.guild.id)
@@ -1427,32 +1479,32 @@ async def initiative(ctx: commands.Context, action: str, name: str = "", initiat
     
     if action == "add":
         if not name:
-            await ctx.send("Usage: !initiative add <name> <initiative>")
+            await send_queued(ctx, "Usage: !initiative add <name> <initiative>")
             return
         tracker.add_combatant(name, initiative)
-        await ctx.send(f"✅ Added **{name}** with initiative **{initiative}**")
+        await send_queued(ctx, f"✅ Added **{name}** with initiative **{initiative}**")
     
     elif action == "remove":
         if not name:
-            await ctx.send("Usage: !initiative remove <name>")
+            await send_queued(ctx, "Usage: !initiative remove <name>")
             return
         if tracker.remove_combatant(name):
-            await ctx.send(f"✅ Removed **{name}** from initiative")
+            await send_queued(ctx, f"✅ Removed **{name}** from initiative")
         else:
-            await ctx.send(f"❌ **{name}** not found in initiative")
+            await send_queued(ctx, f"❌ **{name}** not found in initiative")
     
     elif action == "next":
         combatant = tracker.next_turn()
         if not combatant:
-            await ctx.send("❌ No combatants in initiative. Use `!initiative add` first.")
+            await send_queued(ctx, "❌ No combatants in initiative. Use `!initiative add` first.")
             return
         name, init = combatant
-        await ctx.send(f"🎯 **Round {tracker.round_number}**: {name}'s turn! (Initiative: {init})")
+        await send_queued(ctx, f"🎯 **Round {tracker.round_number}**: {name}'s turn! (Initiative: {init})")
     
     elif action == "show":
         order = tracker.get_order()
         if not order:
-            await ctx.send("❌ No combatants in initiative. Use `!initiative add` first.")
+            await send_queued(ctx, "❌ No combatants in initiative. Use `!initiative add` first.")
             return
         
         embed = discord.Embed(
@@ -1467,14 +1519,14 @@ async def initiative(ctx: commands.Context, action: str, name: str = "", initiat
             order_text += f"{marker} **{name}**: {init}\n"
         
         embed.add_field(name="Turn Order", value=order_text, inline=False)
-        await ctx.send(embed=embed)
+        await send_queued(ctx, embed=embed)
     
     elif action == "clear":
         tracker.clear()
-        await ctx.send("✅ Initiative tracker cleared")
+        await send_queued(ctx, "✅ Initiative tracker cleared")
     
     else:
-        await ctx.send("Invalid action. Use: add, remove, next, show, or clear")
+        await send_queued(ctx, "Invalid action. Use: add, remove, next, show, or clear")
 
 
 @bot.command(name="npc", aliases=["generatenpc", "randomnpc"])
@@ -1490,7 +1542,7 @@ async def npc(ctx: commands.Context):
     embed.add_field(name="Personality", value=npc["personality"], inline=False)
     embed.add_field(name="Quirk", value=npc["quirk"], inline=False)
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="quest", aliases=["questhook", "questidea"])
@@ -1504,18 +1556,17 @@ async def quest(ctx: commands.Context):
         color=discord.Color.orange()
     )
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="name", aliases=["randomname", "fantasyname"])
 async def name(ctx: commands.Context):
     """Generate a random fantasy name."""
-    import random
     first = random.choice(gaming_utilities.FANTASY_FIRST_NAMES)
     last = random.choice(gaming_utilities.FANTASY_LAST_NAMES)
     full_name = f"{first} {last}"
     
-    await ctx.send(f"✨ **{full_name}**")
+    await send_queued(ctx, f"✨ **{full_name}**")
 
 
 @bot.command(name="deck", aliases=["decklist", "mtgdeck"])
@@ -1529,7 +1580,7 @@ async def deck(ctx: commands.Context, *, decklist: str):
     """
     deck_data = await gaming_utilities.parse_decklist(decklist)
     embed = gaming_utilities.create_decklist_embed(deck_data, "Your Deck")
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 # =============================================================================
@@ -1543,7 +1594,7 @@ async def ai_chat(ctx: commands.Context, *, message: str):
     Example: !ai What's the weather like?
     """
     if not ctx.guild or not isinstance(ctx.author, discord.Member):
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     # Check cooldown
@@ -1553,7 +1604,7 @@ async def ai_chat(ctx: commands.Context, *, message: str):
     )
     
     if not can_use:
-        await ctx.send(f"⏱️ Please wait {remaining:.1f} more seconds before using AI chat again.")
+        await send_queued(ctx, f"⏱️ Please wait {remaining:.1f} more seconds before using AI chat again.")
         return
     
     # Show typing indicator
@@ -1565,7 +1616,7 @@ async def ai_chat(ctx: commands.Context, *, message: str):
     # Set cooldown
     ai_integration.ai_chat.set_cooldown(ctx.author.id)
     
-    await ctx.send(response[:2000])
+    await send_queued(ctx, response[:2000])
 
 
 @bot.command(name="remember", aliases=["storemem", "aimemory"])
@@ -1575,13 +1626,13 @@ async def remember(ctx: commands.Context, key: str, *, value: str):
     Example: !remember favoritecolor blue
     """
     if not ctx.guild or not isinstance(ctx.author, discord.Member):
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     await ai_integration.AIMemoryManager.store_user_memory(
         ctx.guild.id, ctx.author.id, key, value
     )
-    await ctx.send(f"✅ Remembered: {key} = {value}")
+    await send_queued(ctx, f"✅ Remembered: {key} = {value}")
 
 
 @bot.command(name="forget", aliases=["forgetmem"])
@@ -1591,7 +1642,7 @@ async def forget_memory(ctx: commands.Context, key: str):
     Example: !forget favoritecolor
     """
     if not ctx.guild or not isinstance(ctx.author, discord.Member):
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     success = await ai_integration.AIMemoryManager.forget_user_memory(
@@ -1599,9 +1650,9 @@ async def forget_memory(ctx: commands.Context, key: str):
     )
     
     if success:
-        await ctx.send(f"✅ Forgot memory: {key}")
+        await send_queued(ctx, f"✅ Forgot memory: {key}")
     else:
-        await ctx.send(f"❌ No memory found with key: {key}")
+        await send_queued(ctx, f"❌ No memory found with key: {key}")
 
 
 @bot.command(name="memories", aliases=["listmem", "mymemories"])
@@ -1611,12 +1662,12 @@ async def list_memories(ctx: commands.Context, member: discord.Member | None = N
     Example: !memories @user
     """
     if not ctx.guild or not isinstance(ctx.author, discord.Member):
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     target = member if member else ctx.author
     if not isinstance(target, discord.Member):
-        await ctx.send("User not found.")
+        await send_queued(ctx, "User not found.")
         return
     
     memories = await ai_integration.AIMemoryManager.get_user_memories(
@@ -1624,7 +1675,7 @@ async def list_memories(ctx: commands.Context, member: discord.Member | None = N
     )
     
     if not memories:
-        await ctx.send(f"No memories stored for {target.mention}")
+        await send_queued(ctx, f"No memories stored for {target.mention}")
         return
     
     embed = discord.Embed(
@@ -1642,20 +1693,20 @@ async def list_memories(ctx: commands.Context, member: discord.Member | None = N
     if len(memories) > 10:
         embed.set_footer(text=f"Showing 10 of {len(memories)} memories")
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="clearmemories", aliases=["clearmem"])
 async def clear_memories(ctx: commands.Context):
     """Clear all memories the AI has about you."""
     if not ctx.guild or not isinstance(ctx.author, discord.Member):
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     count = await ai_integration.AIMemoryManager.clear_user_memories(
         ctx.guild.id, ctx.author.id
     )
-    await ctx.send(f"✅ Cleared {count} memory/memories")
+    await send_queued(ctx, f"✅ Cleared {count} memory/memories")
 
 
 @bot.command(name="lore", aliases=["addlore", "serverlore"])
@@ -1665,47 +1716,47 @@ async def add_lore(ctx: commands.Context, key: str, *, value: str):
     Example: !lore kingdom "The Kingdom of Avalon is ruled by Queen Elara"
     """
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions to add lore.")
+        await send_queued(ctx, "You need moderator permissions to add lore.")
         return
     
     await ai_integration.AIMemoryManager.store_lore(ctx.guild.id, key, value)
-    await ctx.send(f"✅ Added lore: {key}")
+    await send_queued(ctx, f"✅ Added lore: {key}")
 
 
 @bot.command(name="forgetlore", aliases=["removelore"])
 async def forget_lore(ctx: commands.Context, key: str):
     """Remove server-wide lore."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions to remove lore.")
+        await send_queued(ctx, "You need moderator permissions to remove lore.")
         return
     
     success = await ai_integration.AIMemoryManager.forget_lore(ctx.guild.id, key)
     
     if success:
-        await ctx.send(f"✅ Removed lore: {key}")
+        await send_queued(ctx, f"✅ Removed lore: {key}")
     else:
-        await ctx.send(f"❌ No lore found with key: {key}")
+        await send_queued(ctx, f"❌ No lore found with key: {key}")
 
 
 @bot.command(name="listlore", aliases=["showlore", "alllore"])
 async def list_lore(ctx: commands.Context):
     """List all server-wide lore."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     lore = await ai_integration.AIMemoryManager.get_lore(ctx.guild.id, limit=10)
     
     if not lore:
-        await ctx.send("No server lore stored yet.")
+        await send_queued(ctx, "No server lore stored yet.")
         return
     
     embed = discord.Embed(
@@ -1723,7 +1774,7 @@ async def list_lore(ctx: commands.Context):
     if len(lore) >= 10:
         embed.set_footer(text="Showing first 10 entries")
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="persona", aliases=["setpersona", "aipersona"])
@@ -1734,11 +1785,11 @@ async def set_persona(ctx: commands.Context, persona_name: str):
     Example: !persona lorekeeper
     """
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions to change AI persona.")
+        await send_queued(ctx, "You need moderator permissions to change AI persona.")
         return
     
     # Check if persona exists
@@ -1746,18 +1797,18 @@ async def set_persona(ctx: commands.Context, persona_name: str):
     persona_names = [p["name"] for p in personas]
     
     if persona_name not in persona_names:
-        await ctx.send(f"❌ Persona '{persona_name}' not found. Available: {', '.join(persona_names)}")
+        await send_queued(ctx, f"❌ Persona '{persona_name}' not found. Available: {', '.join(persona_names)}")
         return
     
     await ai_integration.AISettings.update_setting(ctx.guild.id, "active_persona", persona_name)
-    await ctx.send(f"✅ AI persona set to: **{persona_name}**")
+    await send_queued(ctx, f"✅ AI persona set to: **{persona_name}**")
 
 
 @bot.command(name="personas", aliases=["listpersonas"])
 async def list_personas(ctx: commands.Context):
     """List all available AI personalities."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     personas = await ai_integration.get_personas(ctx.guild.id)
@@ -1776,7 +1827,7 @@ async def list_personas(ctx: commands.Context):
             inline=False
         )
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="createpersona", aliases=["addpersona"])
@@ -1786,11 +1837,11 @@ async def create_persona(ctx: commands.Context, name: str, *, prompt: str):
     Example: !createpersona pirate "You are a pirate captain. Speak like a pirate."
     """
     if not ctx.guild or not isinstance(ctx.author, discord.Member):
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     if not is_admin(ctx.author):
-        await ctx.send("You need administrator permissions.")
+        await send_queued(ctx, "You need administrator permissions.")
         return
     
     success = await ai_integration.create_persona(
@@ -1798,52 +1849,52 @@ async def create_persona(ctx: commands.Context, name: str, *, prompt: str):
     )
     
     if success:
-        await ctx.send(f"✅ Created custom persona: **{name}**")
+        await send_queued(ctx, f"✅ Created custom persona: **{name}**")
     else:
-        await ctx.send(f"❌ Failed to create persona. It may already exist.")
+        await send_queued(ctx, f"❌ Failed to create persona. It may already exist.")
 
 
 @bot.command(name="deletepersona", aliases=["removepersona"])
 async def delete_persona(ctx: commands.Context, name: str):
     """Delete a custom AI persona (admins only)."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     if not isinstance(ctx.author, discord.Member) or not is_admin(ctx.author):
-        await ctx.send("You need administrator permissions.")
+        await send_queued(ctx, "You need administrator permissions.")
         return
     
     success = await ai_integration.delete_persona(ctx.guild.id, name)
     
     if success:
-        await ctx.send(f"✅ Deleted persona: **{name}**")
+        await send_queued(ctx, f"✅ Deleted persona: **{name}**")
     else:
-        await ctx.send(f"❌ Persona not found or cannot be deleted.")
+        await send_queued(ctx, f"❌ Persona not found or cannot be deleted.")
 
 
 @bot.command(name="clearcontext", aliases=["clearchat", "resetcontext"])
 async def clear_context(ctx: commands.Context):
     """Clear the AI conversation history for this channel."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     if not _mod_check(ctx):
-        await ctx.send("You need moderator permissions.")
+        await send_queued(ctx, "You need moderator permissions.")
         return
     
     count = await ai_integration.ConversationContext.clear_channel_history(
         ctx.guild.id, ctx.channel.id
     )
-    await ctx.send(f"✅ Cleared {count} message(s) from conversation history")
+    await send_queued(ctx, f"✅ Cleared {count} message(s) from conversation history")
 
 
 @bot.command(name="aisettings", aliases=["aiconfig"])
 async def ai_settings(ctx: commands.Context):
     """View current AI settings for this server."""
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     settings = await ai_integration.AISettings.get_settings(ctx.guild.id)
@@ -1860,7 +1911,7 @@ async def ai_settings(ctx: commands.Context):
     embed.add_field(name="Context Messages", value=str(settings["max_context_messages"]), inline=True)
     embed.add_field(name="Roleplay", value="✅ Allowed" if settings["allow_roleplay"] else "❌ Disabled", inline=True)
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="ainsfwfilter", aliases=["togglensfw"])
@@ -1871,12 +1922,12 @@ async def toggle_nsfw_filter(ctx: commands.Context, enabled: bool):
     Example: !ainsfwfilter true
     """
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     await ai_integration.AISettings.update_setting(ctx.guild.id, "nsfw_filter", enabled)
     status = "enabled" if enabled else "disabled"
-    await ctx.send(f"✅ NSFW filter {status}")
+    await send_queued(ctx, f"✅ NSFW filter {status}")
 
 
 @bot.command(name="aicooldown", aliases=["setaicooldown"])
@@ -1887,15 +1938,15 @@ async def set_ai_cooldown(ctx: commands.Context, seconds: int):
     Example: !aicooldown 5
     """
     if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
+        await send_queued(ctx, "This command can only be used in a server.")
         return
     
     if seconds < 0 or seconds > 60:
-        await ctx.send("Cooldown must be between 0 and 60 seconds.")
+        await send_queued(ctx, "Cooldown must be between 0 and 60 seconds.")
         return
     
     await ai_integration.AISettings.update_setting(ctx.guild.id, "cooldown_seconds", seconds)
-    await ctx.send(f"✅ AI cooldown set to {seconds} seconds")
+    await send_queued(ctx, f"✅ AI cooldown set to {seconds} seconds")
 
 
 # =============================================================================
@@ -1911,7 +1962,7 @@ async def mtgcard(ctx: commands.Context, *, card_name: str):
     card = await external_apis.ScryfallAPI.get_card_by_name(card_name)
     
     if not card:
-        await ctx.send(f"❌ Card '{card_name}' not found.")
+        await send_queued(ctx, f"❌ Card '{card_name}' not found.")
         return
     
     embed = discord.Embed(
@@ -1934,7 +1985,7 @@ async def mtgcard(ctx: commands.Context, *, card_name: str):
     if card.get("image_uris", {}).get("normal"):
         embed.set_image(url=card["image_uris"]["normal"])
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="randomcard", aliases=["randommtg"])
@@ -1943,7 +1994,7 @@ async def randomcard(ctx: commands.Context):
     card = await external_apis.ScryfallAPI.get_random_card()
     
     if not card:
-        await ctx.send("❌ Could not fetch random card.")
+        await send_queued(ctx, "❌ Could not fetch random card.")
         return
     
     embed = discord.Embed(
@@ -1956,7 +2007,7 @@ async def randomcard(ctx: commands.Context):
     if card.get("image_uris", {}).get("normal"):
         embed.set_image(url=card["image_uris"]["normal"])
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="dndspell", aliases=["spell", "5espell"])
@@ -1968,7 +2019,7 @@ async def dndspell(ctx: commands.Context, *, spell_name: str):
     spells = await external_apis.Open5eAPI.search_spells(spell_name)
     
     if not spells:
-        await ctx.send(f"❌ No spells found for '{spell_name}'")
+        await send_queued(ctx, f"❌ No spells found for '{spell_name}'")
         return
     
     spell = spells[0]  # Get first result
@@ -1988,7 +2039,7 @@ async def dndspell(ctx: commands.Context, *, spell_name: str):
     if spell.get('components'):
         embed.add_field(name="Components", value=spell['components'], inline=True)
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="dndmonster", aliases=["monster", "5emonster"])
@@ -2000,7 +2051,7 @@ async def dndmonster(ctx: commands.Context, *, monster_name: str):
     monsters = await external_apis.Open5eAPI.search_monsters(monster_name)
     
     if not monsters:
-        await ctx.send(f"❌ No monsters found for '{monster_name}'")
+        await send_queued(ctx, f"❌ No monsters found for '{monster_name}'")
         return
     
     monster = monsters[0]  # Get first result
@@ -2024,7 +2075,7 @@ async def dndmonster(ctx: commands.Context, *, monster_name: str):
     stats += f"**CHA** {monster.get('charisma', 10)}"
     embed.add_field(name="Ability Scores", value=stats, inline=False)
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="github", aliases=["repo", "ghrepo"])
@@ -2036,7 +2087,7 @@ async def github_repo(ctx: commands.Context, owner: str, repo: str):
     repo_info = await external_apis.GitHubAPI.get_repo_info(owner, repo)
     
     if not repo_info:
-        await ctx.send(f"❌ Repository '{owner}/{repo}' not found.")
+        await send_queued(ctx, f"❌ Repository '{owner}/{repo}' not found.")
         return
     
     embed = discord.Embed(
@@ -2058,7 +2109,7 @@ async def github_repo(ctx: commands.Context, owner: str, repo: str):
     
     embed.add_field(name="Open Issues", value=str(repo_info.get("open_issues_count", 0)), inline=True)
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 @bot.command(name="apistatus", aliases=["apis", "checkapis"])
@@ -2096,7 +2147,7 @@ async def apistatus(ctx: commands.Context):
     
     embed.set_footer(text="Configure API keys in .env file to enable more features")
     
-    await ctx.send(embed=embed)
+    await send_queued(ctx, embed=embed)
 
 
 # =============================================================================
@@ -2112,18 +2163,24 @@ async def announce(ctx: commands.Context, *, content: str):
 async def dm(ctx: commands.Context, user_id: int, *, content: str):
     """Send a DM by user id."""
     sent = await notify_user(bot, user_id, content)
-    await ctx.send("DM sent." if sent else "Could not send DM.")
+    await send_queued(ctx, "DM sent." if sent else "Could not send DM.")
 
 
 @bot.command(name="react")
 async def react(ctx: commands.Context, message_id: int, emoji: str):
     try:
-        message = await ctx.channel.fetch_message(message_id)
-    except Exception:
-        await ctx.send("Could not find that message.")
+        # Prefer the gateway message cache; only hit the API on a miss.
+        message = discord.utils.get(
+            bot.cached_messages, id=message_id, channel__id=ctx.channel.id
+        ) or await ctx.channel.fetch_message(message_id)
+    except discord.NotFound:
+        await send_queued(ctx, "Could not find that message.")
+        return
+    except discord.HTTPException as exc:
+        await send_queued(ctx, f"Discord error: {exc}")
         return
     await react_to_message(message, emoji)
-    await ctx.send("Reaction added.")
+    await send_queued(ctx, "Reaction added.")
 
 
 @bot.command(name="tempmsg")
@@ -2140,39 +2197,35 @@ async def tempmsg(ctx: commands.Context, duration: str, *, content: str):
 @bot.command(name="backup")
 @commands.has_permissions(administrator=True)
 async def backup(ctx: commands.Context):
-    dest = maintenance.backup_data()
-    await ctx.send(f"Backup created at {dest}")
+    dest = await maintenance.backup_data_async()
+    await send_queued(ctx, f"Backup created at {dest}")
 
 
 @bot.command(name="restore")
 @commands.has_permissions(administrator=True)
 async def restore(ctx: commands.Context, backup_name: str):
     dest_path = maintenance.BACKUP_DIR / backup_name
-    if not dest_path.exists():
-        await ctx.send("Backup not found.")
+    if not await asyncio.to_thread(dest_path.exists):
+        await send_queued(ctx, "Backup not found.")
         return
-    maintenance.restore_backup(dest_path)
-    await ctx.send(f"Restored backup from {dest_path}")
+    await maintenance.restore_backup_async(dest_path)
+    await send_queued(ctx, f"Restored backup from {dest_path}")
 
 
 @bot.command(name="setwelcome")
+@commands.guild_only()
 @commands.has_permissions(manage_guild=True)
 async def setwelcome(ctx: commands.Context, channel: discord.TextChannel):
-    if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
-        return
     set_guild_config(ctx.guild.id, "welcome_channel_id", channel.id)
-    await ctx.send(f"Welcome channel set to {channel.mention}")
+    await send_queued(ctx, f"Welcome channel set to {channel.mention}")
 
 
 @bot.command(name="setleave")
+@commands.guild_only()
 @commands.has_permissions(manage_guild=True)
 async def setleave(ctx: commands.Context, channel: discord.TextChannel):
-    if not ctx.guild:
-        await ctx.send("This command can only be used in a server.")
-        return
     set_guild_config(ctx.guild.id, "leave_channel_id", channel.id)
-    await ctx.send(f"Leave channel set to {channel.mention}")
+    await send_queued(ctx, f"Leave channel set to {channel.mention}")
 
 
 # =============================================================================
@@ -2183,15 +2236,16 @@ async def setleave(ctx: commands.Context, channel: discord.TextChannel):
 async def fetchjson(ctx: commands.Context, url: str):
     """Fetch JSON from a URL (GET) and show a truncated response."""
     try:
-        data = storage_api.fetch_api_json(url)
-    except Exception as exc:
-        await ctx.send(f"Fetch failed: {exc}")
+        data = await storage_api.fetch_api_json_async(url)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+        await send_queued(ctx, f"Fetch failed: {exc}")
         return
-    text = str(data)
-    await ctx.send(text[:1900])
+    text = storage_api.format_json(data)
+    await send_queued(ctx, text[:1900])
 
 
 def main():
+    _init_integrations()
     bot.run(require_token())
 
 
@@ -4,6 +4,8 @@ This file provides backward compatibility for existing code.
 """
 
 import os
+from typing import Any, Callable, Dict
+
 try:
     from src.api_manager import api_manager
 except ImportError:
@@ -41,48 +43,70 @@ __all__ = [
     "SPOTIFY_REFRESH_TOKEN",
 ]
 
-# Backward compatibility - expose values from api_manager
-DISCORD_TOKEN = api_manager.get_token("discord") or ""
-API_BASE_URL = api_manager.get_base_url("generic") or ""
-API_KEY = api_manager.get_token("generic") or ""
-_generic_config = api_manager.get_api_config("generic")
-API_TIMEOUT = _generic_config.timeout if _generic_config else 10.0
-API_TOKENS_RAW = os.getenv("API_TOKENS", "")
-
-# OpenAI settings
-_openai_config = api_manager.get_api_config("openai")
-OPENAI_API_KEY = _openai_config.api_key if _openai_config else ""
-OPENAI_BASE_URL = _openai_config.base_url if _openai_config else ""
-OPENAI_MODEL = api_manager.get_extra("openai", "model", "gpt-4o-mini")
-OPENAI_IMAGE_MODEL = api_manager.get_extra("openai", "image_model", "dall-e-3")
-
-# Search defaults
-SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "5"))
-
-# Twitch settings
-_twitch_config = api_manager.get_api_config("twitch")
-TWITCH_CLIENT_ID = _twitch_config.client_id if _twitch_config else ""
-TWITCH_CLIENT_SECRET = _twitch_config.client_secret if _twitch_config else ""
-TWITCH_ACCESS_TOKEN = _twitch_config.token if _twitch_config else ""
-TWITCH_REFRESH_TOKEN = api_manager.get_extra("twitch", "refresh_token", "")
-TWITCH_BROADCASTER_ID = api_manager.get_extra("twitch", "broadcaster_id", "")
-TWITCH_CHANNEL_NAME = api_manager.get_extra("twitch", "channel_name", "")
-TWITCH_LIVE_ROLE_ID = api_manager.get_extra("twitch", "live_role_id", 0)
-TWITCH_GUILD_ID = api_manager.get_extra("twitch", "guild_id", 0)
-TWITCH_ANNOUNCE_CHANNEL_ID = api_manager.get_extra("twitch", "announce_channel_id", 0)
-TWITCH_CLIPS_CHANNEL_ID = api_manager.get_extra("twitch", "clips_channel_id", 0)
-TWITCH_REMINDER_CHANNEL_ID = api_manager.get_extra("twitch", "reminder_channel_id", 0)
-TWITCH_MONITOR_INTERVAL = api_manager.get_extra("twitch", "monitor_interval", 60)
-TWITCH_CHAT_ENABLED = api_manager.get_extra("twitch", "chat_enabled", False)
-TWITCH_EVENT_LOG_CHANNEL_ID = api_manager.get_extra("twitch", "event_log_channel_id", 0)
-
-
-# Spotify settings
-_spotify_config = api_manager.get_api_config("spotify")
-SPOTIFY_CLIENT_ID = _spotify_config.client_id if _spotify_config else ""
-SPOTIFY_CLIENT_SECRET = _spotify_config.client_secret if _spotify_config else ""
-SPOTIFY_REDIRECT_URI = api_manager.get_extra("spotify", "redirect_uri", "http://localhost:8888/callback")
-SPOTIFY_REFRESH_TOKEN = api_manager.get_extra("spotify", "refresh_token", "")
+# Backward compatibility - expose values from api_manager.
+# Values are resolved lazily on first access (PEP 562) and then cached as
+# module globals, so importing this module does no config lookups.
+
+
+def _config_attr(service: str, attr: str, default: Any = "") -> Callable[[], Any]:
+    def load() -> Any:
+        config = api_manager.get_api_config(service)
+        return getattr(config, attr) if config else default
+    return load
+
+
+def _extra(service: str, key: str, default: Any) -> Callable[[], Any]:
+    return lambda: api_manager.get_extra(service, key, default)
+
+
+_LOADERS: Dict[str, Callable[[], Any]] = {
+    "DISCORD_TOKEN": lambda: api_manager.get_token("discord") or "",
+    "API_BASE_URL": lambda: api_manager.get_base_url("generic") or "",
+    "API_KEY": lambda: api_manager.get_token("generic") or "",
+    "API_TIMEOUT": _config_attr("generic", "timeout", 10.0),
+    "API_TOKENS_RAW": lambda: os.getenv("API_TOKENS", ""),
+    # OpenAI settings
+    "OPENAI_API_KEY": _config_attr("openai", "api_key"),
+    "OPENAI_BASE_URL": _config_attr("openai", "base_url"),
+    "OPENAI_MODEL": _extra("openai", "model", "gpt-4o-mini"),
+    "OPENAI_IMAGE_MODEL": _extra("openai", "image_model", "dall-e-3"),
+    # Search defaults
+    "SEARCH_MAX_RESULTS": lambda: int(os.getenv("SEARCH_MAX_RESULTS", "5")),
+    # Twitch settings
+    "TWITCH_CLIENT_ID": _config_attr("twitch", "client_id"),
+    "TWITCH_CLIENT_SECRET": _config_attr("twitch", "client_secret"),
+    "TWITCH_ACCESS_TOKEN": _config_attr("twitch", "token"),
+    "TWITCH_REFRESH_TOKEN": _extra("twitch", "refresh_token", ""),
+    "TWITCH_BROADCASTER_ID": _extra("twitch", "broadcaster_id", ""),
+    "TWITCH_CHANNEL_NAME": _extra("twitch", "channel_name", ""),
+    "TWITCH_LIVE_ROLE_ID": _extra("twitch", "live_role_id", 0),
+    "TWITCH_GUILD_ID": _extra("twitch", "guild_id", 0),
+    "TWITCH_ANNOUNCE_CHANNEL_ID": _extra("twitch", "announce_channel_id", 0),
+    "TWITCH_CLIPS_CHANNEL_ID": _extra("twitch", "clips_channel_id", 0),
+    "TWITCH_REMINDER_CHANNEL_ID": _extra("twitch", "reminder_channel_id", 0),
+    "TWITCH_MONITOR_INTERVAL": _extra("twitch", "monitor_interval", 60),
+    "TWITCH_CHAT_ENABLED": _extra("twitch", "chat_enabled", False),
+    "TWITCH_EVENT_LOG_CHANNEL_ID": _extra("twitch", "event_log_channel_id", 0),
+    # Spotify settings
+    "SPOTIFY_CLIENT_ID": _config_attr("spotify", "client_id"),
+    "SPOTIFY_CLIENT_SECRET": _config_attr("spotify", "client_secret"),
+    "SPOTIFY_REDIRECT_URI": _extra("spotify", "redirect_uri", "http://localhost:8888/callback"),
+    "SPOTIFY_REFRESH_TOKEN": _extra("spotify", "refresh_token", ""),
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        loader = _LOADERS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = loader()
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LOADERS))
 
 
 def require_token() -> str:
@@ -5,27 +5,84 @@ Includes role assignment systems, audit log viewing, and more.
 
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
-from typing import Optional, List, Dict
+import logging
+import re
+from typing import Any, Awaitable, Callable, Iterable, Optional, List, Dict, Set, Tuple
 
 import discord
 from discord.ext import commands
 
+from .ratelimit import throttled
+from .security import has_role
+
+log = logging.getLogger(__name__)
+
 
 # =============================
 # Role Assignment Systems
 # =============================
 
-class RoleButton(discord.ui.Button):
-    """Button for role assignment."""
+async def _member_request(member: discord.Member, request: Callable[[], Awaitable[Any]]) -> Any:
+    """Run a member update request through the guild's member route bucket."""
+    return await throttled(f"members:{member.guild.id}", request, rate=10, per=10.0)
+
+
+async def _apply_role_delta(
+    member: discord.Member,
+    add: Iterable[discord.Role] = (),
+    remove: Iterable[discord.Role] = (),
+    *,
+    reason: Optional[str] = None
+) -> bool:
+    """
+    Add and remove several roles with a single Modify Guild Member call.
     
-    def __init__(self, role: discord.Role, label: Optional[str] = None):
-        self.role = role
+    This sends the full role list built from the cached member, so it can
+    undo a concurrent change made elsewhere. Use add_roles/remove_roles for
+    single-role changes; this is only for batched reaction-role updates.
+    
+    Returns:
+        False if the member's roles would not change (no request is made)
+    """
+    current = member.roles[1:]  # roles[0] is @everyone
+    remove = set(remove)
+    new_roles = [r for r in current if r not in remove]
+    new_roles.extend(r for r in set(add) if r not in current and r not in remove)
+    if new_roles == current:
+        return False
+    await _member_request(member, lambda: member.edit(roles=new_roles, reason=reason))
+    return True
+
+
+class RoleButton(discord.ui.DynamicItem[discord.ui.Button], template=r"role_(?P<role_id>\d+)"):
+    """
+    Button for role assignment.
+    
+    The role id lives in the custom_id, so once registered with
+    bot.add_dynamic_items(RoleButton) every role panel keeps working across
+    restarts without a View instance held per message.
+    """
+    
+    def __init__(self, role_id: int, label: str):
         super().__init__(
-            label=label or role.name,
-            style=discord.ButtonStyle.primary,
-            custom_id=f"role_{role.id}"
+            discord.ui.Button(
+                label=label,
+                style=discord.ButtonStyle.primary,
+                custom_id=f"role_{role_id}"
+            )
         )
+        self.role_id = role_id
+    
+    @classmethod
+    async def from_custom_id(
+        cls,
+        interaction: discord.Interaction,
+        item: discord.ui.Button,
+        match: re.Match[str]
+    ) -> "RoleButton":
+        return cls(int(match["role_id"]), item.label or "")
     
     async def callback(self, interaction: discord.Interaction):
         """Toggle role when button is clicked."""
@@ -34,15 +91,20 @@ class RoleButton(discord.ui.Button):
             return
         
         member = interaction.user
-        if self.role in member.roles:
-            await member.remove_roles(self.role, reason="Button role removal")
+        role = member.guild.get_role(self.role_id)
+        if role is None:
+            await interaction.response.send_message("That role no longer exists.", ephemeral=True)
+            return
+        
+        if has_role(member, role.id):
+            await _member_request(member, lambda: member.remove_roles(role, reason="Button role removal"))
             await interaction.response.send_message(
-                f"Removed role: {self.role.name}", ephemeral=True
+                f"Removed role: {role.name}", ephemeral=True
             )
         else:
-            await member.add_roles(self.role, reason="Button role assignment")
+            await _member_request(member, lambda: member.add_roles(role, reason="Button role assignment"))
             await interaction.response.send_message(
-                f"Assigned role: {self.role.name}", ephemeral=True
+                f"Assigned role: {role.name}", ephemeral=True
             )
 
 
@@ -52,7 +114,7 @@ class RoleView(discord.ui.View):
     def __init__(self, roles: List[discord.Role]):
         super().__init__(timeout=None)  # Persistent view
         for role in roles:
-            self.add_item(RoleButton(role))
+            self.add_item(RoleButton(role.id, role.name))
 
 
 async def create_role_button_message(
@@ -91,6 +153,45 @@ async def create_role_button_message(
 # Reaction role storage: message_id -> {emoji: role_id}
 REACTION_ROLES: Dict[int, Dict[str, int]] = {}
 
+# Reaction-role changes waiting to be applied: (guild_id, member_id) -> (add, remove)
+_PENDING_ROLE_DELTAS: Dict[Tuple[int, int], Tuple[Set[discord.Role], Set[discord.Role]]] = {}
+_ROLE_FLUSH_TASKS: Set[asyncio.Task] = set()
+_ROLE_DEBOUNCE_SECONDS = 0.2
+
+
+def _queue_reaction_role(member: discord.Member, role: discord.Role, *, add: bool) -> None:
+    """
+    Queue a reaction-role change so a burst of reactions from one member is
+    applied as a single role edit.
+    """
+    key = (member.guild.id, member.id)
+    pending = _PENDING_ROLE_DELTAS.get(key)
+    if pending is None:
+        pending = _PENDING_ROLE_DELTAS[key] = (set(), set())
+        task = asyncio.create_task(_flush_reaction_roles(member.guild, key))
+        _ROLE_FLUSH_TASKS.add(task)
+        task.add_done_callback(_ROLE_FLUSH_TASKS.discard)
+    to_add, to_remove = pending
+    if add:
+        to_add.add(role)
+        to_remove.discard(role)
+    else:
+        to_remove.add(role)
+        to_add.discard(role)
+
+
+async def _flush_reaction_roles(guild: discord.Guild, key: Tuple[int, int]) -> None:
+    await asyncio.sleep(_ROLE_DEBOUNCE_SECONDS)
+    to_add, to_remove = _PENDING_ROLE_DELTAS.pop(key)
+    member = guild.get_member(key[1])
+    if member is None:
+        return
+    try:
+        await _apply_role_delta(member, to_add, to_remove, reason="Reaction roles")
+    except discord.HTTPException as e:
+        # Missing permissions or role hierarchy; nothing to retry
+        log.warning("Could not update reaction roles for %s in %s: %s", member, guild.name, e)
+
 
 async def setup_reaction_roles(
     message: discord.Message,
@@ -103,36 +204,46 @@ async def setup_reaction_roles(
         message: The message to add reactions to
         role_emoji_map: Dictionary mapping roles to emoji strings
     """
-    REACTION_ROLES[message.id] = {}
+    # Discord allows about one reaction per 0.25 s per channel. The bucket
+    # paces the requests in order; gathering keeps one failure from
+    # aborting the rest.
+    route_key = f"reactions:{message.channel.id}"
+    results = await asyncio.gather(
+        *(
+            throttled(route_key, lambda emoji=emoji: message.add_reaction(emoji), rate=1, per=0.25)
+            for emoji in role_emoji_map.values()
+        ),
+        return_exceptions=True
+    )
     
-    for role, emoji in role_emoji_map.items():
-        await message.add_reaction(emoji)
-        REACTION_ROLES[message.id][str(emoji)] = role.id
+    mapping: Dict[str, int] = {}
+    for (role, emoji), result in zip(role_emoji_map.items(), results):
+        if isinstance(result, BaseException):
+            log.warning("Could not add reaction role %s (%s): %s", emoji, role.name, result)
+            continue
+        mapping[str(emoji)] = role.id
+    REACTION_ROLES[message.id] = mapping
 
 
-async def handle_reaction_role_add(
+def _resolve_reaction_payload(
     payload: discord.RawReactionActionEvent,
     bot: commands.Bot
-) -> Optional[str]:
+) -> Optional[Tuple[discord.Member, discord.Role]]:
     """
-    Handle reaction add for role assignment.
-    
-    Args:
-        payload: The reaction event payload
-        bot: The bot instance
+    Resolve a reaction event on a reaction-role message to (member, role).
     
     Returns:
-        Status message or None
+        None if the reaction is the bot's own, not on a reaction-role
+        message, or the member or role can't be found
     """
     if bot.user and payload.user_id == bot.user.id:
         return None
     
-    if payload.message_id not in REACTION_ROLES:
+    emoji_roles = REACTION_ROLES.get(payload.message_id)
+    if emoji_roles is None:
         return None
     
-    emoji_str = str(payload.emoji)
-    role_id = REACTION_ROLES[payload.message_id].get(emoji_str)
-    
+    role_id = emoji_roles.get(str(payload.emoji))
     if not role_id or not payload.guild_id:
         return None
     
@@ -140,58 +251,65 @@ async def handle_reaction_role_add(
     if not guild:
         return None
     
-    member = guild.get_member(payload.user_id)
+    # Guild reaction adds carry the member, so the member cache is only a fallback.
+    member = payload.member or guild.get_member(payload.user_id)
     role = guild.get_role(role_id)
     
     if not member or not role:
         return None
     
-    if role not in member.roles:
-        await member.add_roles(role, reason="Reaction role assignment")
-        return f"Assigned {role.name} to {member.display_name}"
-    
-    return None
+    return member, role
 
 
-async def handle_reaction_role_remove(
+async def handle_reaction_role_add(
     payload: discord.RawReactionActionEvent,
     bot: commands.Bot
 ) -> Optional[str]:
     """
-    Handle reaction remove for role removal.
+    Handle reaction add for role assignment.
     
     Args:
         payload: The reaction event payload
         bot: The bot instance
     
     Returns:
-        Status message or None
+        Status message for the queued change, or None
     """
-    if bot.user and payload.user_id == bot.user.id:
+    resolved = _resolve_reaction_payload(payload, bot)
+    if resolved is None:
         return None
+    member, role = resolved
     
-    if payload.message_id not in REACTION_ROLES:
-        return None
+    # Always queue: an earlier change for this member may still be pending.
+    _queue_reaction_role(member, role, add=True)
+    if not has_role(member, role.id):
+        return f"Queued {role.name} for {member.display_name}"
     
-    emoji_str = str(payload.emoji)
-    role_id = REACTION_ROLES[payload.message_id].get(emoji_str)
-    
-    if not role_id or not payload.guild_id:
-        return None
-    
-    guild = bot.get_guild(payload.guild_id)
-    if not guild:
-        return None
+    return None
+
+
+async def handle_reaction_role_remove(
+    payload: discord.RawReactionActionEvent,
+    bot: commands.Bot
+) -> Optional[str]:
+    """
+    Handle reaction remove for role removal.
     
-    member = guild.get_member(payload.user_id)
-    role = guild.get_role(role_id)
+    Args:
+        payload: The reaction event payload
+        bot: The bot instance
     
-    if not member or not role:
+    Returns:
+        Status message for the queued change, or None
+    """
+    resolved = _resolve_reaction_payload(payload, bot)
+    if resolved is None:
         return None
+    member, role = resolved
     
-    if role in member.roles:
-        await member.remove_roles(role, reason="Reaction role removal")
-        return f"Removed {role.name} from {member.display_name}"
+    _queue_reaction_role(member, role, add=False)
+    if has_role(member, role.id):
+        return f"Queued removal of {role.name} from {member.display_name}"
     
     return None
 
@@ -229,11 +347,12 @@ async def slash_assign_role(
         await interaction.response.send_message("You cannot assign a role equal to or higher than your highest role.", ephemeral=True)
         return
     
-    if role in member.roles:
+    if has_role(member, role.id):
         await interaction.response.send_message(f"{member.mention} already has the {role.mention} role.", ephemeral=True)
         return
     
-    await member.add_roles(role, reason=reason or f"Assigned by {interaction.user.display_name}")
+    reason = reason or f"Assigned by {interaction.user.display_name}"
+    await _member_request(member, lambda: member.add_roles(role, reason=reason))
     await interaction.response.send_message(f"✅ Assigned {role.mention} to {member.mention}", ephemeral=True)
 
 
@@ -266,11 +385,12 @@ async def slash_remove_role(
         await interaction.response.send_message("You cannot remove a role equal to or higher than your highest role.", ephemeral=True)
         return
     
-    if role not in member.roles:
+    if not has_role(member, role.id):
         await interaction.response.send_message(f"{member.mention} doesn't have the {role.mention} role.", ephemeral=True)
         return
     
-    await member.remove_roles(role, reason=reason or f"Removed by {interaction.user.display_name}")
+    reason = reason or f"Removed by {interaction.user.display_name}"
+    await _member_request(member, lambda: member.remove_roles(role, reason=reason))
     await interaction.response.send_message(f"✅ Removed {role.mention} from {member.mention}", ephemeral=True)
 
 
@@ -278,6 +398,23 @@ async def slash_remove_role(
 # Audit Log Viewer
 # =============================
 
+AUDIT_EMBED_MAX_ENTRIES = 10
+
+# Action type names accepted by view_audit_log
+_ACTION_MAP: Dict[str, discord.AuditLogAction] = {
+    "ban": discord.AuditLogAction.ban,
+    "unban": discord.AuditLogAction.unban,
+    "kick": discord.AuditLogAction.kick,
+    "member_update": discord.AuditLogAction.member_update,
+    "channel_create": discord.AuditLogAction.channel_create,
+    "channel_delete": discord.AuditLogAction.channel_delete,
+    "channel_update": discord.AuditLogAction.channel_update,
+    "role_create": discord.AuditLogAction.role_create,
+    "role_delete": discord.AuditLogAction.role_delete,
+    "role_update": discord.AuditLogAction.role_update,
+    "message_delete": discord.AuditLogAction.message_delete,
+}
+
 async def get_audit_logs(
     guild: discord.Guild,
     *,
@@ -301,16 +438,18 @@ async def get_audit_logs(
     Returns:
         List of audit log entries
     """
-    entries = []
-    async for entry in guild.audit_logs(
-        limit=limit,
-        action=action if action is not None else discord.utils.MISSING,
-        user=user if user is not None else discord.utils.MISSING,
-        before=before if before is not None else discord.utils.MISSING,
-        after=after if after is not None else discord.utils.MISSING
-    ):
-        entries.append(entry)
-    return entries
+    async def fetch() -> List[discord.AuditLogEntry]:
+        return [
+            entry async for entry in guild.audit_logs(
+                limit=limit,
+                action=action if action is not None else discord.utils.MISSING,
+                user=user if user is not None else discord.utils.MISSING,
+                before=before if before is not None else discord.utils.MISSING,
+                after=after if after is not None else discord.utils.MISSING
+            )
+        ]
+    
+    return await throttled(f"audit_logs:{guild.id}", fetch)
 
 
 async def format_audit_log_embed(entries: List[discord.AuditLogEntry]) -> discord.Embed:
@@ -333,7 +472,7 @@ async def format_audit_log_embed(entries: List[discord.AuditLogEntry]) -> discor
         embed.description = "No audit log entries found."
         return embed
     
-    for entry in entries[:10]:  # Limit to 10 entries to avoid embed limits
+    for entry in entries[:AUDIT_EMBED_MAX_ENTRIES]:  # Avoid embed limits
         action_name = entry.action.name.replace("_", " ").title()
         user_mention = entry.user.mention if entry.user else "Unknown"
         target = getattr(entry.target, "name", str(entry.target)) if entry.target else "Unknown"
@@ -384,26 +523,12 @@ async def view_audit_log(
     
     await interaction.response.defer(ephemeral=True)
     
-    # Map action type string to AuditLogAction
-    action = None
-    if action_type:
-        action_type = action_type.lower()
-        action_map = {
-            "ban": discord.AuditLogAction.ban,
-            "unban": discord.AuditLogAction.unban,
-            "kick": discord.AuditLogAction.kick,
-            "member_update": discord.AuditLogAction.member_update,
-            "channel_create": discord.AuditLogAction.channel_create,
-            "channel_delete": discord.AuditLogAction.channel_delete,
-            "channel_update": discord.AuditLogAction.channel_update,
-            "role_create": discord.AuditLogAction.role_create,
-            "role_delete": discord.AuditLogAction.role_delete,
-            "role_update": discord.AuditLogAction.role_update,
-            "message_delete": discord.AuditLogAction.message_delete,
-        }
-        action = action_map.get(action_type)
-    
-    entries = await get_audit_logs(interaction.guild, limit=limit, action=action)
+    action = _ACTION_MAP.get(action_type.lower()) if action_type else None
+    
+    # The embed only shows AUDIT_EMBED_MAX_ENTRIES, so never fetch more than that.
+    entries = await get_audit_logs(
+        interaction.guild, limit=min(limit, AUDIT_EMBED_MAX_ENTRIES), action=action
+    )
     embed = await format_audit_log_embed(entries)
     
     await interaction.followup.send(embed=embed, ephemeral=True)
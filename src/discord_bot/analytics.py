@@ -4,17 +4,36 @@ Simple in-memory + file-backed analytics and logging helpers.
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import io
 import json
+import logging
+import threading
 import traceback
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT_DIR / "data"
 LOG_FILE = DATA_DIR / "events.log"
 STATS_FILE = DATA_DIR / "usage.json"
 
+log = logging.getLogger(__name__)
+
 _USAGE: Dict[str, Any] = {"commands": {}, "events": []}
+_loaded = False
+
+# Write-behind buffer: log lines and usage changes are flushed by a background
+# task at most once per interval, or as soon as a batch fills up.
+_FLUSH_INTERVAL = 1.0
+_FLUSH_BATCH = 100
+_pending_lines: List[str] = []
+_usage_dirty = False
+_writer_task: Optional[asyncio.Task] = None
+_batch_full: Optional[asyncio.Event] = None
+_WRITE_LOCK = threading.Lock()
 
 
 def _ensure_dirs():
@@ -22,6 +41,11 @@ def _ensure_dirs():
 
 
 def _load_usage():
+    """Read STATS_FILE into memory once; afterwards memory is authoritative."""
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
     _ensure_dirs()
     if STATS_FILE.exists():
         try:
@@ -30,36 +54,105 @@ def _load_usage():
             pass
 
 
-def _save_usage():
-    _ensure_dirs()
-    with STATS_FILE.open("w", encoding="utf-8") as fh:
-        json.dump(_USAGE, fh, indent=2, sort_keys=True)
+def _take_pending() -> Tuple[List[str], Optional[str]]:
+    """
+    Swap out the buffered log lines and serialize usage if it changed.
+    Runs on the caller's thread so the worker thread never sees _USAGE mutate.
+    """
+    global _pending_lines, _usage_dirty
+    lines, _pending_lines = _pending_lines, []
+    usage = json.dumps(_USAGE, indent=2) if _usage_dirty else None
+    _usage_dirty = False
+    return lines, usage
+
+
+def _write(lines: List[str], usage: Optional[str]):
+    # Usage first: rewriting it is idempotent, so if the append then fails
+    # both can be retried without duplicating log lines.
+    with _WRITE_LOCK:
+        _ensure_dirs()
+        if usage is not None:
+            STATS_FILE.write_text(usage, encoding="utf-8")
+        if lines:
+            with LOG_FILE.open("a", encoding="utf-8") as fh:
+                fh.writelines(lines)
+
+
+def flush():
+    """
+    Write buffered log lines and usage stats to disk immediately.
+    """
+    lines, usage = _take_pending()
+    try:
+        _write(lines, usage)
+    except Exception:
+        _restore_pending(lines, usage)
+        raise
+
+
+def _restore_pending(lines: List[str], usage: Optional[str]):
+    """Put a failed write back so the next flush retries it."""
+    global _usage_dirty
+    _pending_lines[:0] = lines
+    if usage is not None:
+        # Re-serialized from memory on the retry, picking up later changes too
+        _usage_dirty = True
+
+
+async def _write_behind(batch_full: asyncio.Event):
+    while _pending_lines or _usage_dirty:
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(batch_full.wait(), timeout=_FLUSH_INTERVAL)
+        batch_full.clear()
+        lines, usage = _take_pending()
+        try:
+            await asyncio.to_thread(_write, lines, usage)
+        except Exception:
+            log.exception("Analytics flush failed; retrying in %.1fs", _FLUSH_INTERVAL)
+            _restore_pending(lines, usage)
+
+
+def _schedule_flush():
+    global _writer_task, _batch_full
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # No event loop (scripts, tests): write through.
+        flush()
+        return
+    if _writer_task is None or _writer_task.done():
+        _batch_full = asyncio.Event()
+        _writer_task = asyncio.create_task(_write_behind(_batch_full))
+    if len(_pending_lines) >= _FLUSH_BATCH:
+        _batch_full.set()
 
 
 def log_event(event_type: str, data: Dict[str, Any]):
-    _ensure_dirs()
+    global _usage_dirty
+    _load_usage()
     entry = {"type": event_type, "data": data}
-    try:
-        with LOG_FILE.open("a", encoding="utf-8") as fh:
-            fh.write(json.dumps(entry) + "\n")
-    except Exception:
-        pass
+    _pending_lines.append(json.dumps(entry) + "\n")
     _USAGE.setdefault("events", []).append(entry)
-    _save_usage()
+    _usage_dirty = True
+    _schedule_flush()
 
 
 def log_command_usage(user_id: int, command: str):
+    global _usage_dirty
     _load_usage()
     per_cmd = _USAGE.setdefault("commands", {})
     info = per_cmd.setdefault(command, {"count": 0, "users": {}})
     info["count"] = info.get("count", 0) + 1
     info["users"][str(user_id)] = info["users"].get(str(user_id), 0) + 1
-    _save_usage()
+    _usage_dirty = True
+    _schedule_flush()
 
 
 def log_error(exception: Exception):
-    tb = "".join(traceback.format_exception(type(exception), exception, exception.__traceback__))
-    log_event("error", {"traceback": tb})
+    # Stream the formatted frames into one buffer instead of building a list to join.
+    buf = io.StringIO()
+    buf.writelines(traceback.TracebackException.from_exception(exception).format())
+    log_event("error", {"traceback": buf.getvalue()})
 
 
 def get_usage_stats() -> Dict[str, Any]:
@@ -69,14 +162,19 @@ def get_usage_stats() -> Dict[str, Any]:
 
 def audit_log_lookup(limit: int = 50) -> List[Dict[str, Any]]:
     """
-    Return last `limit` event entries from the log file (if present).
+    Return last `limit` event entries from the log file (if present),
+    including entries not yet flushed to disk.
     """
-    if not LOG_FILE.exists():
+    if limit <= 0:
         return []
-    lines = LOG_FILE.read_text(encoding="utf-8").splitlines()
-    selected = lines[-limit:]
+    # Stream the file through a bounded deque so only the tail is held in memory.
+    tail: deque[str] = deque(maxlen=limit)
+    if LOG_FILE.exists():
+        with LOG_FILE.open("r", encoding="utf-8") as fh:
+            tail.extend(fh)
+    tail.extend(_pending_lines)
     events: List[Dict[str, Any]] = []
-    for line in selected:
+    for line in tail:
         try:
             events.append(json.loads(line))
         except Exception:
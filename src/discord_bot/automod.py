@@ -6,13 +6,28 @@ Includes spam detection, caps lock detection, link filtering, raid protection, a
 from __future__ import annotations
 
 import asyncio
+import difflib
+import functools
 import re
+import string
 import time
-from collections import defaultdict
-from typing import Optional, Dict, List, Tuple
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Iterable, Optional, Dict, List, Set, Tuple
 
 import discord
 
+try:
+    import ahocorasick  # optional: pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from rapidfuzz import fuzz  # optional: C-accelerated string similarity
+except ImportError:
+    fuzz = None
+
+from . import moderation
+
 
 # =============================
 # Configuration
@@ -52,23 +67,69 @@ class AutoModConfig:
 # Tracking Data
 # =============================
 
-# User message tracking: user_id -> [(timestamp, channel_id)]
-_message_tracker: Dict[int, List[Tuple[float, int]]] = defaultdict(list)
+# User message tracking: user_id -> deque of (timestamp, channel_id), oldest first.
+# The cap only needs to exceed MAX_MESSAGES_PER_WINDOW.
+_message_tracker: Dict[int, Deque[Tuple[float, int]]] = defaultdict(lambda: deque(maxlen=64))
+_TRACKER_PRUNE_INTERVAL = 300  # seconds between sweeps of idle users
+_last_tracker_prune = 0.0
+
+class _WindowCounter:
+    """
+    Sliding-window counter: approximates the number of events in the last
+    `window` seconds from the counts of the current and previous fixed
+    windows, weighting the previous one by how much of it still overlaps.
+    """
+    
+    __slots__ = ("window", "start", "current", "previous")
+    
+    def __init__(self, window: float):
+        self.window = window
+        self.start = time.monotonic()
+        self.current = 0
+        self.previous = 0
+    
+    def hit(self, now: float) -> float:
+        """Record one event at `now` and return the estimated count in the window."""
+        elapsed = now - self.start
+        if elapsed >= self.window:
+            # Roll forward; after a gap of two or more windows nothing overlaps.
+            self.previous = self.current if elapsed < 2 * self.window else 0
+            self.current = 0
+            self.start += self.window * (elapsed // self.window)
+            elapsed = now - self.start
+        self.current += 1
+        return self.previous * (1 - elapsed / self.window) + self.current
+
 
-# Channel message rate tracking: channel_id -> [(timestamp)]
-_channel_activity: Dict[int, List[float]] = defaultdict(list)
+# Channel message rate tracking: channel_id -> messages in the last minute
+_channel_activity: Dict[int, _WindowCounter] = defaultdict(lambda: _WindowCounter(60))
 
-# Join tracking: guild_id -> [timestamps]
-_join_tracker: Dict[int, List[float]] = defaultdict(list)
+# Join tracking: guild_id -> joins inside the detection window. Each join
+# schedules its own expiry, so the count never has to be filtered.
+_join_counts: Dict[int, int] = defaultdict(int)
 
-# Raid mode: guild_id -> is_in_raid
-_raid_mode: Dict[int, bool] = {}
+# Raid mode: ids of guilds currently in raid mode
+_raid_mode: Set[int] = set()
 
 
 # =============================
 # Spam Detection
 # =============================
 
+def _prune_message_tracker(current_time: float, window: float) -> None:
+    """Drop users with no messages inside the window, at most once per interval."""
+    global _last_tracker_prune
+    if current_time - _last_tracker_prune < _TRACKER_PRUNE_INTERVAL:
+        return
+    _last_tracker_prune = current_time
+    idle = [
+        user_id for user_id, history in _message_tracker.items()
+        if not history or current_time - history[-1][0] >= window
+    ]
+    for user_id in idle:
+        del _message_tracker[user_id]
+
+
 async def check_spam(message: discord.Message, config: Optional[AutoModConfig] = None) -> Tuple[bool, str]:
     """
     Check if a message is spam.
@@ -95,22 +156,20 @@ async def check_spam(message: discord.Message, config: Optional[AutoModConfig] =
     
     user_id = message.author.id
     channel_id = message.channel.id
-    current_time = time.time()
+    current_time = time.monotonic()
     
-    # Clean up old messages
-    _message_tracker[user_id] = [
-        (ts, ch_id) for ts, ch_id in _message_tracker[user_id]
-        if current_time - ts < config.SPAM_WINDOW_SECONDS
-    ]
+    _prune_message_tracker(current_time, config.SPAM_WINDOW_SECONDS)
+    
+    # Expire old messages from the front
+    history = _message_tracker[user_id]
+    while history and current_time - history[0][0] >= config.SPAM_WINDOW_SECONDS:
+        history.popleft()
     
     # Add current message
-    _message_tracker[user_id].append((current_time, channel_id))
+    history.append((current_time, channel_id))
     
     # Count recent messages in the same channel
-    recent_messages = sum(
-        1 for ts, ch_id in _message_tracker[user_id]
-        if ch_id == channel_id
-    )
+    recent_messages = sum(1 for _, ch_id in history if ch_id == channel_id)
     
     if recent_messages > config.MAX_MESSAGES_PER_WINDOW:
         return True, f"Spam detected: {recent_messages} messages in {config.SPAM_WINDOW_SECONDS}s"
@@ -150,7 +209,6 @@ async def handle_spam(
     action_taken = ""
     if config.SPAM_ACTION == "timeout":
         try:
-            from . import moderation
             await moderation.timeout_user(
                 message.author,
                 config.SPAM_TIMEOUT_DURATION,
@@ -162,7 +220,6 @@ async def handle_spam(
     
     elif config.SPAM_ACTION == "kick":
         try:
-            from . import moderation
             await moderation.kick_user(message.author, reason=reason)
             action_taken = f"Kicked {message.author.mention} for spam"
         except Exception as e:
@@ -170,7 +227,6 @@ async def handle_spam(
     
     elif config.SPAM_ACTION == "ban":
         try:
-            from . import moderation
             await moderation.ban_user(message.author, reason=reason)
             action_taken = f"Banned {message.author.mention} for spam"
         except Exception as e:
@@ -178,7 +234,6 @@ async def handle_spam(
     
     elif config.SPAM_ACTION == "warn":
         try:
-            from . import moderation
             await moderation.warn_user(message.author, reason)
             action_taken = f"Warned {message.author.mention} for spam"
         except Exception as e:
@@ -191,6 +246,12 @@ async def handle_spam(
 # Caps Lock Detection
 # =============================
 
+# Byte tables for bytes.translate(None, delete): strip everything but ASCII
+# letters, then strip the uppercase ones to count them.
+_NON_LETTER_BYTES = bytes(b for b in range(128) if chr(b) not in string.ascii_letters)
+_UPPER_BYTES = string.ascii_uppercase.encode()
+
+
 def check_excessive_caps(content: str, config: Optional[AutoModConfig] = None) -> Tuple[bool, str]:
     """
     Check if message has excessive caps lock.
@@ -205,14 +266,15 @@ def check_excessive_caps(content: str, config: Optional[AutoModConfig] = None) -
     if not config:
         config = AutoModConfig()
     
-    # Remove spaces and special characters for accurate counting
-    letters_only = re.sub(r'[^a-zA-Z]', '', content)
+    # Keep only ASCII letters for accurate counting
+    letters_only = content.encode("ascii", "ignore").translate(None, _NON_LETTER_BYTES)
+    letter_count = len(letters_only)
     
-    if len(letters_only) < config.MIN_MESSAGE_LENGTH_FOR_CAPS:
+    if letter_count < config.MIN_MESSAGE_LENGTH_FOR_CAPS:
         return False, ""
     
-    uppercase_count = sum(1 for c in letters_only if c.isupper())
-    caps_percentage = (uppercase_count / len(letters_only)) * 100
+    uppercase_count = letter_count - len(letters_only.translate(None, _UPPER_BYTES))
+    caps_percentage = (uppercase_count / letter_count) * 100
     
     if caps_percentage > config.MAX_CAPS_PERCENTAGE:
         return True, f"Excessive caps: {caps_percentage:.1f}% uppercase"
@@ -232,11 +294,40 @@ INVITE_REGEX = re.compile(
     re.IGNORECASE
 )
 
+# One character class instead of an alternation of overlapping classes, so a
+# failed match cannot backtrack through every way of splitting the URL.
+# Note that "$-_" is a range (0x24-0x5F): it covers "/", ":", "?", "=" and "%".
 URL_REGEX = re.compile(
-    r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',
+    r'https?://[a-zA-Z0-9$-_@.&+!*(),]+',
     re.IGNORECASE
 )
 
+# Shortest content either pattern can match ("http://x"); anything shorter
+# cannot contain a link.
+MIN_LINK_SCAN_LENGTH = 8
+
+
+@functools.lru_cache(maxsize=16)
+def _allowed_domain_matcher(domains: Tuple[str, ...]) -> Callable[[str], bool]:
+    """
+    Build a predicate telling whether a lowercased URL contains any of the
+    (lowercased) allowed domains. Uses a single Aho-Corasick pass when
+    pyahocorasick is installed, otherwise one precompiled alternation.
+    """
+    if not domains:
+        return lambda url: False
+    if "" in domains:
+        return lambda url: True
+    if ahocorasick is None:
+        # Longest first so overlapping domains prefer the most specific match.
+        pattern = re.compile("|".join(map(re.escape, sorted(domains, key=len, reverse=True))))
+        return lambda url: pattern.search(url) is not None
+    automaton = ahocorasick.Automaton()
+    for domain in domains:
+        automaton.add_word(domain, domain)
+    automaton.make_automaton()
+    return lambda url: next(automaton.iter(url), None) is not None
+
 
 def check_links(content: str, config: Optional[AutoModConfig] = None) -> Tuple[bool, str]:
     """
@@ -252,23 +343,22 @@ def check_links(content: str, config: Optional[AutoModConfig] = None) -> Tuple[b
     if not config:
         config = AutoModConfig()
     
+    # Lowercase once; both patterns are case-insensitive anyway.
+    lowered = content.lower()
+    
+    # Plain substring checks first: most messages contain neither, and those
+    # skip the regex engine entirely.
     # Check for Discord invites
-    if config.BLOCK_INVITES:
-        if INVITE_REGEX.search(content):
+    if config.BLOCK_INVITES and "discord" in lowered:
+        if INVITE_REGEX.search(lowered):
             return True, "Discord invite link detected"
     
     # Check for other links
-    if config.BLOCK_LINKS:
-        urls = URL_REGEX.findall(content)
-        for url in urls:
-            # Check if domain is whitelisted
-            is_allowed = False
-            for allowed_domain in config.ALLOWED_DOMAINS:
-                if allowed_domain.lower() in url.lower():
-                    is_allowed = True
-                    break
-            
-            if not is_allowed:
+    if config.BLOCK_LINKS and "://" in lowered:
+        # Check if domain is whitelisted
+        is_allowed = _allowed_domain_matcher(tuple(d.lower() for d in config.ALLOWED_DOMAINS))
+        for url in URL_REGEX.findall(lowered):
+            if not is_allowed(url):
                 return True, "Unauthorized link detected"
     
     return False, ""
@@ -278,6 +368,14 @@ def check_links(content: str, config: Optional[AutoModConfig] = None) -> Tuple[b
 # Raid Protection
 # =============================
 
+def _expire_join(guild_id: int) -> None:
+    remaining = _join_counts[guild_id] - 1
+    if remaining > 0:
+        _join_counts[guild_id] = remaining
+    else:
+        _join_counts.pop(guild_id, None)
+
+
 async def check_raid(member: discord.Member, config: Optional[AutoModConfig] = None) -> Tuple[bool, str]:
     """
     Check if a member join is part of a raid.
@@ -293,19 +391,13 @@ async def check_raid(member: discord.Member, config: Optional[AutoModConfig] = N
         config = AutoModConfig()
     
     guild_id = member.guild.id
-    current_time = time.time()
     
-    # Clean up old join timestamps
-    _join_tracker[guild_id] = [
-        ts for ts in _join_tracker[guild_id]
-        if current_time - ts < config.RAID_DETECTION_WINDOW
-    ]
-    
-    # Add current join
-    _join_tracker[guild_id].append(current_time)
+    # Count the current join and schedule it to leave the window
+    _join_counts[guild_id] += 1
+    asyncio.get_running_loop().call_later(config.RAID_DETECTION_WINDOW, _expire_join, guild_id)
     
     # Count recent joins
-    recent_joins = len(_join_tracker[guild_id])
+    recent_joins = _join_counts[guild_id]
     joins_per_minute = (recent_joins / config.RAID_DETECTION_WINDOW) * 60
     
     if joins_per_minute > config.MAX_JOINS_PER_MINUTE:
@@ -314,6 +406,36 @@ async def check_raid(member: discord.Member, config: Optional[AutoModConfig] = N
     return False, ""
 
 
+# Channel permission edits in flight at once during a raid lockdown
+_LOCKDOWN_CONCURRENCY = 10
+
+
+async def _for_all_text_channels(
+    guild: discord.Guild,
+    action: Callable[..., Awaitable[Any]],
+    reason: str,
+    done_verb: str,
+    failed_verb: str
+) -> List[str]:
+    """
+    Apply a channel action to every text channel concurrently (bounded by
+    _LOCKDOWN_CONCURRENCY) and return one status line per channel, in order.
+    """
+    semaphore = asyncio.Semaphore(_LOCKDOWN_CONCURRENCY)
+    
+    async def run(channel: discord.TextChannel) -> Any:
+        async with semaphore:
+            return await action(channel, reason=reason)
+    
+    channels = guild.text_channels
+    results = await asyncio.gather(*(run(c) for c in channels), return_exceptions=True)
+    return [
+        f"Failed to {failed_verb} {channel.name}: {result}"
+        if isinstance(result, BaseException) else f"{done_verb} {channel.name}"
+        for channel, result in zip(channels, results)
+    ]
+
+
 async def activate_raid_mode(guild: discord.Guild, config: Optional[AutoModConfig] = None) -> str:
     """
     Activate raid mode for a guild.
@@ -328,19 +450,15 @@ async def activate_raid_mode(guild: discord.Guild, config: Optional[AutoModConfi
     if not config:
         config = AutoModConfig()
     
-    _raid_mode[guild.id] = True
+    _raid_mode.add(guild.id)
     
     actions = []
     
     # Lock all text channels
     if config.AUTO_LOCKDOWN_ON_RAID:
-        from . import moderation
-        for channel in guild.text_channels:
-            try:
-                await moderation.lock_channel(channel, reason="Raid protection activated")
-                actions.append(f"Locked {channel.name}")
-            except Exception as e:
-                actions.append(f"Failed to lock {channel.name}: {e}")
+        actions = await _for_all_text_channels(
+            guild, moderation.lock_channel, "Raid protection activated", "Locked", "lock"
+        )
     
     return f"🚨 Raid mode activated!\n" + "\n".join(actions)
 
@@ -359,26 +477,22 @@ async def deactivate_raid_mode(guild: discord.Guild, config: Optional[AutoModCon
     if not config:
         config = AutoModConfig()
     
-    _raid_mode[guild.id] = False
+    _raid_mode.discard(guild.id)
     
     actions = []
     
     # Unlock all text channels
     if config.AUTO_LOCKDOWN_ON_RAID:
-        from . import moderation
-        for channel in guild.text_channels:
-            try:
-                await moderation.unlock_channel(channel, reason="Raid protection deactivated")
-                actions.append(f"Unlocked {channel.name}")
-            except Exception as e:
-                actions.append(f"Failed to unlock {channel.name}: {e}")
+        actions = await _for_all_text_channels(
+            guild, moderation.unlock_channel, "Raid protection deactivated", "Unlocked", "unlock"
+        )
     
     return f"✅ Raid mode deactivated!\n" + "\n".join(actions)
 
 
 def is_raid_mode(guild_id: int) -> bool:
     """Check if a guild is in raid mode."""
-    return _raid_mode.get(guild_id, False)
+    return guild_id in _raid_mode
 
 
 # =============================
@@ -403,19 +517,10 @@ async def check_auto_slowmode(
         return None
     
     channel_id = channel.id
-    current_time = time.time()
-    
-    # Clean up old activity
-    _channel_activity[channel_id] = [
-        ts for ts in _channel_activity[channel_id]
-        if current_time - ts < 60  # Track last minute
-    ]
-    
-    # Add current message
-    _channel_activity[channel_id].append(current_time)
+    current_time = time.monotonic()
     
-    # Calculate messages per minute
-    messages_per_minute = len(_channel_activity[channel_id])
+    # Count the current message and estimate messages per minute
+    messages_per_minute = _channel_activity[channel_id].hit(current_time)
     
     # Activate slowmode if threshold exceeded
     if messages_per_minute > config.SLOWMODE_THRESHOLD:
@@ -460,6 +565,111 @@ async def apply_auto_slowmode(
 # Alt Account Detection
 # =============================
 
+# Similar-name index, built lazily per guild and kept current by the member
+# events: guild_id -> trigram -> member ids. Names shorter than a trigram are
+# filed under "" so they are always candidates.
+_name_trigrams: Dict[int, Dict[str, Set[int]]] = {}
+# guild_id -> member_id -> lowercased name as indexed
+_indexed_names: Dict[int, Dict[int, str]] = {}
+
+
+def _trigrams(name: str) -> Set[str]:
+    return {name[i:i + 3] for i in range(len(name) - 2)} or {""}
+
+
+def _index_add(guild_id: int, member_id: int, name: str) -> None:
+    index = _name_trigrams[guild_id]
+    for gram in _trigrams(name):
+        index[gram].add(member_id)
+    _indexed_names[guild_id][member_id] = name
+
+
+def _index_remove(guild_id: int, member_id: int) -> None:
+    name = _indexed_names[guild_id].pop(member_id, None)
+    if name is None:
+        return
+    index = _name_trigrams[guild_id]
+    for gram in _trigrams(name):
+        postings = index.get(gram)
+        if postings is not None:
+            postings.discard(member_id)
+            if not postings:
+                del index[gram]
+
+
+def _guild_name_index(guild: discord.Guild) -> Dict[str, Set[int]]:
+    index = _name_trigrams.get(guild.id)
+    if index is None:
+        index = _name_trigrams[guild.id] = defaultdict(set)
+        _indexed_names[guild.id] = {}
+        for m in guild.members:
+            _index_add(guild.id, m.id, m.name.lower())
+    return index
+
+
+def index_member_name(member: discord.Member) -> None:
+    """Add or refresh a member in the similar-name index (on join or rename)."""
+    guild_id = member.guild.id
+    if guild_id in _name_trigrams:
+        _index_remove(guild_id, member.id)
+        _index_add(guild_id, member.id, member.name.lower())
+
+
+def unindex_member_name(member: discord.Member) -> None:
+    """Drop a member from the similar-name index (on leave)."""
+    if member.guild.id in _name_trigrams:
+        _index_remove(member.guild.id, member.id)
+
+
+# Minimum similarity (0-100) for two names to count as "similar"
+NAME_SIMILARITY_CUTOFF = 85
+# Stop counting similar names once this many are found
+SIMILAR_NAME_LIMIT = 5
+
+_NON_DIGIT_RE = re.compile(r"\D+")
+
+
+def _names_similar(a: str, b: str) -> bool:
+    """
+    Containment either way, or a normalized edit similarity of at least
+    NAME_SIMILARITY_CUTOFF (rapidfuzz when installed, difflib otherwise).
+    """
+    if a in b or b in a:
+        return True
+    if fuzz is not None:
+        return fuzz.ratio(a, b, score_cutoff=NAME_SIMILARITY_CUTOFF) > 0
+    cutoff = NAME_SIMILARITY_CUTOFF / 100
+    matcher = difflib.SequenceMatcher(None, a, b)
+    # The quick ratios are cheap upper bounds; only compute the real one if they pass.
+    return (
+        matcher.real_quick_ratio() >= cutoff
+        and matcher.quick_ratio() >= cutoff
+        and matcher.ratio() >= cutoff
+    )
+
+
+def _similar_name_candidates(guild: discord.Guild, name: str) -> Iterable[discord.Member]:
+    """
+    Members whose name could contain, or be contained in, `name`. Either way
+    the shorter name's trigrams are all trigrams of the longer one, so the
+    union of `name`'s posting lists (plus the short names) covers every
+    containment match. Fuzzy matches are only scored among these candidates.
+    """
+    if len(name) < 3:
+        return guild.members
+    index = _guild_name_index(guild)
+    ids: Set[int] = set(index.get("", ()))
+    for gram in _trigrams(name):
+        ids.update(index.get(gram, ()))
+    return [m for m in map(guild.get_member, ids) if m is not None]
+
+
+def _account_age_days(snowflake: int) -> int:
+    """Whole days since a snowflake was created, read from its embedded timestamp."""
+    created_ms = (snowflake >> 22) + discord.utils.DISCORD_EPOCH
+    return int(time.time() * 1000 - created_ms) // 86_400_000
+
+
 async def detect_alt_account(member: discord.Member) -> Tuple[bool, str]:
     """
     Detect potential alt accounts based on join date and behavior heuristics.
@@ -473,7 +683,7 @@ async def detect_alt_account(member: discord.Member) -> Tuple[bool, str]:
     reasons = []
     
     # Check account age (less than 7 days old)
-    account_age = (discord.utils.utcnow() - member.created_at).days
+    account_age = _account_age_days(member.id)
     if account_age < 7:
         reasons.append(f"Account created {account_age} days ago")
     
@@ -482,19 +692,23 @@ async def detect_alt_account(member: discord.Member) -> Tuple[bool, str]:
         reasons.append("Using default avatar")
     
     # Check if username looks suspicious (lots of numbers)
-    username_numbers = sum(1 for c in member.name if c.isdigit())
+    username_numbers = len(_NON_DIGIT_RE.sub("", member.name))
     if username_numbers > len(member.name) * 0.5:
         reasons.append("Username contains many numbers")
     
     # Check for similar names in server
     if member.guild:
-        similar_names = [
-            m for m in member.guild.members
-            if m.id != member.id and
-            (m.name.lower() in member.name.lower() or member.name.lower() in m.name.lower())
-        ]
-        if similar_names:
-            reasons.append(f"Similar name to {len(similar_names)} existing member(s)")
+        name = member.name.lower()
+        similar_count = 0
+        for m in _similar_name_candidates(member.guild, name):
+            if m.id != member.id and _names_similar(name, m.name.lower()):
+                similar_count += 1
+                if similar_count >= SIMILAR_NAME_LIMIT:
+                    break
+        if similar_count >= SIMILAR_NAME_LIMIT:
+            reasons.append(f"Similar name to {similar_count}+ existing members")
+        elif similar_count:
+            reasons.append(f"Similar name to {similar_count} existing member(s)")
     
     is_suspicious = len(reasons) >= 2
     reason_text = "; ".join(reasons) if reasons else "No suspicious indicators"
@@ -534,8 +748,13 @@ async def process_message(
     if is_spam:
         return await handle_spam(message, spam_reason, config)
     
+    # Short messages cannot trip the content checks, so skip straight to slowmode
+    content = message.content
+    scan_caps = len(content) >= config.MIN_MESSAGE_LENGTH_FOR_CAPS
+    scan_links = len(content) >= MIN_LINK_SCAN_LENGTH
+    
     # Check caps
-    has_caps, caps_reason = check_excessive_caps(message.content, config)
+    has_caps, caps_reason = check_excessive_caps(content, config) if scan_caps else (False, "")
     if has_caps:
         try:
             await message.delete()
@@ -548,7 +767,7 @@ async def process_message(
             pass
     
     # Check links
-    has_blocked_links, link_reason = check_links(message.content, config)
+    has_blocked_links, link_reason = check_links(content, config) if scan_links else (False, "")
     if has_blocked_links:
         try:
             await message.delete()
@@ -4,11 +4,15 @@ Centralized command handling utilities for prefix, slash, and context menu flows
 
 from __future__ import annotations
 
+import sys
+import time
 from typing import Awaitable, Callable, Dict, Iterable
 
 import discord
 from discord.ext import commands
 
+from .storage_api import TTLCache
+
 # Registries
 PrefixHandler = Callable[[commands.Context], Awaitable[None]]
 SlashHandler = Callable[[discord.Interaction], Awaitable[None]]
@@ -20,8 +24,11 @@ SLASH_COMMANDS: Dict[str, SlashHandler] = {}
 CONTEXT_COMMANDS: Dict[str, ContextHandler] = {}
 AUTOCOMPLETE: Dict[str, AutocompleteHandler] = {}
 
-# Cooldown tracking: command -> user_id -> next_allowed_ts
-COOLDOWNS: Dict[str, Dict[int, float]] = {}
+# Cooldown tracking: command -> user_id -> (tokens, last_refill). A bucket that
+# has been idle long enough to refill expires on its own, and each command
+# keeps at most COOLDOWN_MAX_USERS of them.
+COOLDOWNS: Dict[str, TTLCache] = {}
+COOLDOWN_MAX_USERS = 100_000
 
 
 def register_commands(
@@ -30,7 +37,13 @@ def register_commands(
     context_cmds: Dict[str, ContextHandler] | None = None,
     autocomplete_cmds: Dict[str, AutocompleteHandler] | None = None,
 ) -> None:
-    """Register handlers into in-memory registries."""
+    """
+    Register handlers into in-memory registries.
+
+    Keys are lowercased here. Slash command names are always lowercase in
+    discord.py, so they are looked up directly; prefix and context menu names
+    (which may be mixed case, e.g. "Report Message") are folded at dispatch.
+    """
     if prefix_cmds:
         PREFIX_COMMANDS.update({k.lower(): v for k, v in prefix_cmds.items()})
     if slash_cmds:
@@ -43,7 +56,7 @@ def register_commands(
 
 async def handle_prefix_command(ctx: commands.Context):
     """Dispatch prefix command from the registry after permission/cooldown checks."""
-    name = (ctx.command.name if ctx.command else "").lower()
+    name = sys.intern(ctx.command.name.lower()) if ctx.command else ""
     handler = PREFIX_COMMANDS.get(name)
     if not handler:
         return
@@ -60,7 +73,7 @@ async def handle_prefix_command(ctx: commands.Context):
 
 async def handle_slash_command(interaction: discord.Interaction):
     """Dispatch slash command from the registry."""
-    name = (interaction.command.name if interaction.command else "").lower()
+    name = interaction.command.name if interaction.command else ""
     handler = SLASH_COMMANDS.get(name)
     if not handler:
         return
@@ -76,7 +89,7 @@ async def handle_slash_command(interaction: discord.Interaction):
 
 async def handle_context_menu(interaction: discord.Interaction):
     """Dispatch context menu command from the registry."""
-    name = (interaction.command.name if interaction.command else "").lower()
+    name = interaction.command.name.lower() if interaction.command else ""
     handler = CONTEXT_COMMANDS.get(name)
     if not handler:
         return
@@ -112,18 +125,27 @@ def validate_command_permissions(target) -> bool:
     return False
 
 
-def cooldown_check(user_id: int, command: str, *, cooldown_seconds: int = 3) -> bool:
+def cooldown_check(
+    user_id: int, command: str, *, cooldown_seconds: float = 3, rate: int = 1
+) -> bool:
     """
-    Return True if allowed; records the next allowed timestamp.
+    Token-bucket cooldown: allow up to `rate` uses of a command per
+    `cooldown_seconds`, refilling continuously. Return True and spend a token
+    if one is available. A command's window is fixed by its first check.
     """
-    import time
-
-    now = time.time()
-    per_user = COOLDOWNS.setdefault(command, {})
-    next_allowed = per_user.get(user_id, 0)
-    if now < next_allowed:
+    per_user = COOLDOWNS.get(command)
+    if per_user is None:
+        per_user = COOLDOWNS[command] = TTLCache(maxsize=COOLDOWN_MAX_USERS, ttl=cooldown_seconds)
+    now = time.monotonic()
+    state = per_user.get(user_id)
+    if state is None:
+        tokens = float(rate)
+    else:
+        tokens, last_refill = state
+        tokens = min(float(rate), tokens + (now - last_refill) * rate / per_user.ttl)
+    if tokens < 1:
         return False
-    per_user[user_id] = now + cooldown_seconds
+    per_user[user_id] = (tokens - 1, now)
     return True
 
 
@@ -131,7 +153,7 @@ async def autocomplete_handler(interaction: discord.Interaction, value: str):
     """
     Dispatch to a registered autocomplete handler.
     """
-    name = (interaction.command.name if interaction.command else "").lower()
+    name = interaction.command.name if interaction.command else ""
     handler = AUTOCOMPLETE.get(name)
     if not handler:
         return []
@@ -6,13 +6,28 @@ from __future__ import annotations
 
 import asyncio
 import datetime as dt
-import random
-from typing import Optional, List, Dict, Tuple
+import time
+from typing import NamedTuple, Optional, List, Dict, Tuple
 from zoneinfo import ZoneInfo
 
 import discord
 
-from .storage_api import database_connect
+from .storage_api import WriteBehind, bulk_upsert, shared_connection, transaction
+
+# Fixed parts of the announcement embeds; each build copies one and adds its fields.
+_GIVEAWAY_SKELETON = {
+    "title": "🎉 GIVEAWAY 🎉",
+    "color": discord.Color.green().value,
+    "footer": {"text": "React with 🎉 to enter!"},
+}
+_EVENT_SKELETON = {
+    "color": discord.Color.blue().value,
+    "footer": {"text": "React with ✅ to RSVP!"},
+}
+_CONFESSION_SKELETON = {
+    "color": discord.Color.purple().value,
+    "footer": {"text": "All confessions are anonymous"},
+}
 
 
 # =============================
@@ -21,116 +36,139 @@ from .storage_api import database_connect
 
 def init_community_database() -> None:
     """Initialize community features database tables."""
-    conn = database_connect()
-    cursor = conn.cursor()
-    
-    # Reputation system
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS reputation (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            karma INTEGER DEFAULT 0,
-            given_today INTEGER DEFAULT 0,
-            last_reset_date TEXT,
-            UNIQUE(guild_id, user_id)
-        )
-    """)
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS reputation_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id INTEGER NOT NULL,
-            from_user_id INTEGER NOT NULL,
-            to_user_id INTEGER NOT NULL,
-            amount INTEGER NOT NULL,
-            reason TEXT,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Giveaways
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS giveaways (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id INTEGER NOT NULL,
-            channel_id INTEGER NOT NULL,
-            message_id INTEGER,
-            prize TEXT NOT NULL,
-            winner_count INTEGER DEFAULT 1,
-            end_time TIMESTAMP NOT NULL,
-            host_id INTEGER NOT NULL,
-            ended BOOLEAN DEFAULT 0,
-            winner_ids TEXT
-        )
-    """)
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS giveaway_entries (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            giveaway_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            UNIQUE(giveaway_id, user_id),
-            FOREIGN KEY(giveaway_id) REFERENCES giveaways(id)
-        )
-    """)
-    
-    # Events
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS events (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id INTEGER NOT NULL,
-            title TEXT NOT NULL,
-            description TEXT,
-            start_time TIMESTAMP NOT NULL,
-            end_time TIMESTAMP,
-            timezone TEXT DEFAULT 'UTC',
-            host_id INTEGER NOT NULL,
-            channel_id INTEGER,
-            max_attendees INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+    with transaction() as conn:
+        cursor = conn.cursor()
+
+        # Reputation system
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS reputation (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                karma INTEGER DEFAULT 0,
+                given_today INTEGER DEFAULT 0,
+                last_reset_date TEXT,
+                UNIQUE(guild_id, user_id)
+            )
+        """)
+
+        # Covers the karma leaderboard; the UNIQUE constraints on the other
+        # tables already index their lookup columns.
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_rep_guild_karma
+            ON reputation(guild_id, karma DESC, user_id)
+        """)
     
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS event_attendees (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            event_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            UNIQUE(event_id, user_id),
-            FOREIGN KEY(event_id) REFERENCES events(id)
-        )
-    """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS reputation_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                from_user_id INTEGER NOT NULL,
+                to_user_id INTEGER NOT NULL,
+                amount INTEGER NOT NULL,
+                reason TEXT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    
+        # Giveaways
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS giveaways (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                channel_id INTEGER NOT NULL,
+                message_id INTEGER,
+                prize TEXT NOT NULL,
+                winner_count INTEGER DEFAULT 1,
+                end_time TIMESTAMP NOT NULL,
+                host_id INTEGER NOT NULL,
+                ended BOOLEAN DEFAULT 0,
+                winner_ids TEXT
+            )
+        """)
     
-    # Confessions
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS confessions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id INTEGER NOT NULL,
-            confession_number INTEGER NOT NULL,
-            content TEXT NOT NULL,
-            user_id INTEGER NOT NULL,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(guild_id, confession_number)
-        )
-    """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS giveaway_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                giveaway_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                UNIQUE(giveaway_id, user_id),
+                FOREIGN KEY(giveaway_id) REFERENCES giveaways(id)
+            )
+        """)
+    
+        # Events
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT,
+                start_time TIMESTAMP NOT NULL,
+                end_time TIMESTAMP,
+                timezone TEXT DEFAULT 'UTC',
+                host_id INTEGER NOT NULL,
+                channel_id INTEGER,
+                max_attendees INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
     
-    # Server stats tracking
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS server_stats (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id INTEGER NOT NULL,
-            date TEXT NOT NULL,
-            total_members INTEGER DEFAULT 0,
-            messages_sent INTEGER DEFAULT 0,
-            members_joined INTEGER DEFAULT 0,
-            members_left INTEGER DEFAULT 0,
-            UNIQUE(guild_id, date)
-        )
-    """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS event_attendees (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                UNIQUE(event_id, user_id),
+                FOREIGN KEY(event_id) REFERENCES events(id)
+            )
+        """)
+    
+        # Confessions
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS confessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                confession_number INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(guild_id, confession_number)
+            )
+        """)
+
+        # Last confession number handed out per guild
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS confession_counters (
+                guild_id INTEGER PRIMARY KEY,
+                n INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+        # Seed counters for guilds whose confessions predate the table
+        cursor.execute("""
+            INSERT OR IGNORE INTO confession_counters (guild_id, n)
+            SELECT guild_id, MAX(confession_number) FROM confessions GROUP BY guild_id
+        """)
     
-    conn.commit()
-    conn.close()
+        # Server stats tracking
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS server_stats (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                total_members INTEGER DEFAULT 0,
+                messages_sent INTEGER DEFAULT 0,
+                members_joined INTEGER DEFAULT 0,
+                members_left INTEGER DEFAULT 0,
+                UNIQUE(guild_id, date)
+            )
+        """)
+
+        # Gather planner statistics once for a fresh database
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            cursor.execute("ANALYZE")
 
 
 # =============================
@@ -153,65 +191,49 @@ async def give_karma(
     if from_user_id == to_user_id:
         return False, "You cannot give karma to yourself!"
     
-    conn = database_connect()
-    cursor = conn.cursor()
-    
-    # Check daily limit
     today = dt.date.today().isoformat()
-    cursor.execute("""
-        SELECT given_today, last_reset_date FROM reputation
-        WHERE guild_id = ? AND user_id = ?
-    """, (guild_id, from_user_id))
-    
-    result = cursor.fetchone()
-    given_today = 0
-    
-    if result:
-        given_today, last_reset = result
-        if last_reset != today:
-            # Reset daily counter
-            given_today = 0
-            cursor.execute("""
-                UPDATE reputation
-                SET given_today = 0, last_reset_date = ?
-                WHERE guild_id = ? AND user_id = ?
-            """, (today, guild_id, from_user_id))
-    
-    # Check limit (default 3 per day)
-    if given_today >= 3:
-        return False, "You've reached your daily karma limit! (3/day)"
-    
-    # Add karma to recipient
-    cursor.execute("""
-        INSERT INTO reputation (guild_id, user_id, karma)
-        VALUES (?, ?, ?)
-        ON CONFLICT(guild_id, user_id) DO UPDATE SET karma = karma + ?
-    """, (guild_id, to_user_id, amount, amount))
-    
-    # Update giver's daily count
-    cursor.execute("""
-        INSERT INTO reputation (guild_id, user_id, given_today, last_reset_date)
-        VALUES (?, ?, 1, ?)
-        ON CONFLICT(guild_id, user_id) DO UPDATE SET
-            given_today = given_today + 1,
-            last_reset_date = ?
-    """, (guild_id, from_user_id, today, today))
-    
-    # Log the transaction
-    cursor.execute("""
-        INSERT INTO reputation_log (guild_id, from_user_id, to_user_id, amount, reason)
-        VALUES (?, ?, ?, ?, ?)
-    """, (guild_id, from_user_id, to_user_id, amount, reason))
-    
-    conn.commit()
-    conn.close()
-    
-    return True, f"Gave {amount} karma! ({given_today + 1}/3 today)"
+    with transaction() as conn:
+        cursor = conn.cursor()
+
+        # Count this gift against the giver's daily limit, resetting the counter
+        # on a new day; no row comes back once the limit is reached.
+        cursor.execute("""
+            INSERT INTO reputation (guild_id, user_id, given_today, last_reset_date)
+            VALUES (?, ?, 1, ?)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET
+                given_today = CASE
+                    WHEN last_reset_date = excluded.last_reset_date THEN given_today + 1
+                    ELSE 1
+                END,
+                last_reset_date = excluded.last_reset_date
+            WHERE last_reset_date IS NOT excluded.last_reset_date OR given_today < 3
+            RETURNING given_today
+        """, (guild_id, from_user_id, today))
+
+        result = cursor.fetchone()
+        if result is None:
+            return False, "You've reached your daily karma limit! (3/day)"
+        given_today = result[0]
+
+        # Add karma to recipient
+        cursor.execute("""
+            INSERT INTO reputation (guild_id, user_id, karma)
+            VALUES (?, ?, ?)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET karma = karma + ?
+        """, (guild_id, to_user_id, amount, amount))
+
+        # Log the transaction
+        cursor.execute("""
+            INSERT INTO reputation_log (guild_id, from_user_id, to_user_id, amount, reason)
+            VALUES (?, ?, ?, ?, ?)
+        """, (guild_id, from_user_id, to_user_id, amount, reason))
+
+    return True, f"Gave {amount} karma! ({given_today}/3 today)"
 
 
 async def get_karma(guild_id: int, user_id: int) -> int:
     """Get user's karma score."""
-    conn = database_connect()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -220,14 +242,13 @@ async def get_karma(guild_id: int, user_id: int) -> int:
     """, (guild_id, user_id))
     
     result = cursor.fetchone()
-    conn.close()
     
     return result[0] if result else 0
 
 
 async def get_karma_leaderboard(guild_id: int, limit: int = 10) -> List[Tuple[int, int]]:
     """Get karma leaderboard."""
-    conn = database_connect()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -238,7 +259,6 @@ async def get_karma_leaderboard(guild_id: int, limit: int = 10) -> List[Tuple[in
     """, (guild_id, limit))
     
     rows = cursor.fetchall()
-    conn.close()
     
     return rows
 
@@ -256,7 +276,7 @@ async def create_giveaway(
     winner_count: int = 1
 ) -> int:
     """Create a new giveaway."""
-    conn = database_connect()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     end_time = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=duration_seconds)
@@ -267,8 +287,6 @@ async def create_giveaway(
     """, (guild_id, channel_id, prize, winner_count, end_time.isoformat(), host_id))
     
     giveaway_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
     
     assert giveaway_id is not None, "Failed to create giveaway: lastrowid is None"
     return giveaway_id
@@ -276,25 +294,21 @@ async def create_giveaway(
 
 async def enter_giveaway(giveaway_id: int, user_id: int) -> Tuple[bool, str]:
     """Enter a user into a giveaway."""
-    conn = database_connect()
-    cursor = conn.cursor()
+    conn = shared_connection()
     
     try:
-        cursor.execute("""
+        conn.execute("""
             INSERT INTO giveaway_entries (giveaway_id, user_id)
             VALUES (?, ?)
         """, (giveaway_id, user_id))
-        conn.commit()
         return True, "You're entered in the giveaway!"
     except Exception:
         return False, "You're already entered!"
-    finally:
-        conn.close()
 
 
 async def get_giveaway_entries(giveaway_id: int) -> List[int]:
     """Get all user IDs entered in a giveaway."""
-    conn = database_connect()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -303,14 +317,13 @@ async def get_giveaway_entries(giveaway_id: int) -> List[int]:
     """, (giveaway_id,))
     
     rows = cursor.fetchall()
-    conn.close()
     
     return [row[0] for row in rows]
 
 
 async def end_giveaway(giveaway_id: int) -> Optional[Dict]:
     """End a giveaway and select winners."""
-    conn = database_connect()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     # Get giveaway info
@@ -321,23 +334,29 @@ async def end_giveaway(giveaway_id: int) -> Optional[Dict]:
     
     result = cursor.fetchone()
     if not result or result[2]:  # Already ended
-        conn.close()
         return None
     
     prize, winner_count, _ = result
     
-    # Get entries
-    entries = await get_giveaway_entries(giveaway_id)
-    if not entries:
+    # Count entries
+    cursor.execute("""
+        SELECT COUNT(*) FROM giveaway_entries WHERE giveaway_id = ?
+    """, (giveaway_id,))
+    total_entries = cursor.fetchone()[0]
+    if not total_entries:
         cursor.execute("""
             UPDATE giveaways SET ended = 1 WHERE id = ?
         """, (giveaway_id,))
-        conn.commit()
-        conn.close()
         return {"prize": prize, "winners": []}
     
-    # Select winners
-    winners = random.sample(entries, min(winner_count, len(entries)))
+    # Select winners without loading every entry
+    cursor.execute("""
+        SELECT user_id FROM giveaway_entries
+        WHERE giveaway_id = ?
+        ORDER BY RANDOM()
+        LIMIT ?
+    """, (giveaway_id, winner_count))
+    winners = [row[0] for row in cursor.fetchall()]
     
     # Update giveaway
     cursor.execute("""
@@ -346,26 +365,20 @@ async def end_giveaway(giveaway_id: int) -> Optional[Dict]:
         WHERE id = ?
     """, (",".join(map(str, winners)), giveaway_id))
     
-    conn.commit()
-    conn.close()
-    
-    return {"prize": prize, "winners": winners, "total_entries": len(entries)}
+    return {"prize": prize, "winners": winners, "total_entries": total_entries}
 
 
 async def create_giveaway_embed(prize: str, end_time: dt.datetime, host: discord.Member, entries: int = 0) -> discord.Embed:
     """Create giveaway announcement embed."""
-    embed = discord.Embed(
-        title="🎉 GIVEAWAY 🎉",
-        description=f"**Prize:** {prize}",
-        color=discord.Color.green()
-    )
-    
-    embed.add_field(name="Hosted by", value=host.mention, inline=True)
-    embed.add_field(name="Entries", value=str(entries), inline=True)
-    embed.add_field(name="Ends", value=f"<t:{int(end_time.timestamp())}:R>", inline=False)
-    embed.set_footer(text="React with 🎉 to enter!")
+    data = dict(_GIVEAWAY_SKELETON)
+    data["description"] = f"**Prize:** {prize}"
+    data["fields"] = [
+        {"name": "Hosted by", "value": host.mention, "inline": True},
+        {"name": "Entries", "value": str(entries), "inline": True},
+        {"name": "Ends", "value": f"<t:{int(end_time.timestamp())}:R>", "inline": False},
+    ]
     
-    return embed
+    return discord.Embed.from_dict(data)
 
 
 # =============================
@@ -384,7 +397,7 @@ async def create_event(
     max_attendees: Optional[int] = None
 ) -> int:
     """Create a scheduled event."""
-    conn = database_connect()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -394,8 +407,6 @@ async def create_event(
           end_time.isoformat() if end_time else None, timezone, host_id, channel_id, max_attendees))
     
     event_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
     
     assert event_id is not None, "Failed to create event: lastrowid is None"
     return event_id
@@ -403,48 +414,43 @@ async def create_event(
 
 async def rsvp_event(event_id: int, user_id: int) -> Tuple[bool, str]:
     """RSVP to an event."""
-    conn = database_connect()
-    cursor = conn.cursor()
-    
-    # Check max attendees
-    cursor.execute("""
-        SELECT max_attendees FROM events WHERE id = ?
-    """, (event_id,))
-    
-    result = cursor.fetchone()
-    if not result:
-        conn.close()
-        return False, "Event not found!"
-    
-    max_attendees = result[0]
-    
-    if max_attendees:
-        cursor.execute("""
-            SELECT COUNT(*) FROM event_attendees WHERE event_id = ?
-        """, (event_id,))
-        result = cursor.fetchone()
-        current = result[0] if result else 0
-        
-        if current >= max_attendees:
-            conn.close()
-            return False, "Event is full!"
-    
     try:
-        cursor.execute("""
-            INSERT INTO event_attendees (event_id, user_id)
-            VALUES (?, ?)
-        """, (event_id, user_id))
-        conn.commit()
+        with transaction() as conn:
+            cursor = conn.cursor()
+
+            # Check max attendees
+            cursor.execute("""
+                SELECT max_attendees FROM events WHERE id = ?
+            """, (event_id,))
+
+            result = cursor.fetchone()
+            if not result:
+                return False, "Event not found!"
+
+            max_attendees = result[0]
+
+            if max_attendees:
+                cursor.execute("""
+                    SELECT COUNT(*) FROM event_attendees WHERE event_id = ?
+                """, (event_id,))
+                result = cursor.fetchone()
+                current = result[0] if result else 0
+
+                if current >= max_attendees:
+                    return False, "Event is full!"
+
+            cursor.execute("""
+                INSERT INTO event_attendees (event_id, user_id)
+                VALUES (?, ?)
+            """, (event_id, user_id))
         return True, "✅ RSVP confirmed!"
     except Exception:
         return False, "You're already registered!"
-    finally:
-        conn.close()
 
 
 async def get_event_attendees(event_id: int) -> List[int]:
     """Get all user IDs attending an event."""
-    conn = database_connect()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -452,7 +458,6 @@ async def get_event_attendees(event_id: int) -> List[int]:
     """, (event_id,))
     
     rows = cursor.fetchall()
-    conn.close()
     
     return [row[0] for row in rows]
 
@@ -467,26 +472,25 @@ async def create_event_embed(
     max_attendees: Optional[int] = None
 ) -> discord.Embed:
     """Create event announcement embed."""
-    embed = discord.Embed(
-        title=f"📅 {title}",
-        description=description or "Join us for this event!",
-        color=discord.Color.blue()
-    )
-    
-    embed.add_field(name="Host", value=host.mention, inline=True)
-    embed.add_field(name="Start Time", value=f"<t:{int(start_time.timestamp())}:F>", inline=False)
+    fields = [
+        {"name": "Host", "value": host.mention, "inline": True},
+        {"name": "Start Time", "value": f"<t:{int(start_time.timestamp())}:F>", "inline": False},
+    ]
     
     if end_time:
-        embed.add_field(name="End Time", value=f"<t:{int(end_time.timestamp())}:F>", inline=False)
+        fields.append({"name": "End Time", "value": f"<t:{int(end_time.timestamp())}:F>", "inline": False})
     
     attendee_text = f"{attendees}"
     if max_attendees:
         attendee_text += f"/{max_attendees}"
-    embed.add_field(name="Attendees", value=attendee_text, inline=True)
+    fields.append({"name": "Attendees", "value": attendee_text, "inline": True})
     
-    embed.set_footer(text="React with ✅ to RSVP!")
+    data = dict(_EVENT_SKELETON)
+    data["title"] = f"📅 {title}"
+    data["description"] = description or "Join us for this event!"
+    data["fields"] = fields
     
-    return embed
+    return discord.Embed.from_dict(data)
 
 
 # =============================
@@ -495,38 +499,34 @@ async def create_event_embed(
 
 async def submit_confession(guild_id: int, user_id: int, content: str) -> int:
     """Submit an anonymous confession."""
-    conn = database_connect()
-    cursor = conn.cursor()
-    
-    # Get next confession number for guild
-    cursor.execute("""
-        SELECT MAX(confession_number) FROM confessions WHERE guild_id = ?
-    """, (guild_id,))
-    
-    result = cursor.fetchone()
-    next_number = (result[0] if result and result[0] else 0) + 1
-    
-    cursor.execute("""
-        INSERT INTO confessions (guild_id, confession_number, content, user_id)
-        VALUES (?, ?, ?, ?)
-    """, (guild_id, next_number, content, user_id))
-    
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.cursor()
+
+        # Claim the next confession number for guild
+        cursor.execute("""
+            INSERT INTO confession_counters (guild_id, n) VALUES (?, 1)
+            ON CONFLICT(guild_id) DO UPDATE SET n = n + 1
+            RETURNING n
+        """, (guild_id,))
+
+        next_number = cursor.fetchone()[0]
+
+        cursor.execute("""
+            INSERT INTO confessions (guild_id, confession_number, content, user_id)
+            VALUES (?, ?, ?, ?)
+        """, (guild_id, next_number, content, user_id))
     
     return next_number
 
 
 async def create_confession_embed(confession_number: int, content: str) -> discord.Embed:
     """Create confession embed."""
-    embed = discord.Embed(
-        title=f"🤫 Anonymous Confession #{confession_number}",
-        description=content,
-        color=discord.Color.purple(),
-        timestamp=dt.datetime.now(dt.timezone.utc)
-    )
+    data = dict(_CONFESSION_SKELETON)
+    data["title"] = f"🤫 Anonymous Confession #{confession_number}"
+    data["description"] = content
     
-    embed.set_footer(text="All confessions are anonymous")
+    embed = discord.Embed.from_dict(data)
+    embed.timestamp = dt.datetime.now(dt.timezone.utc)
     
     return embed
 
@@ -535,6 +535,65 @@ async def create_confession_embed(confession_number: int, content: str) -> disco
 # Server Stats Dashboard
 # =============================
 
+class StatRow(NamedTuple):
+    """One day of server stats."""
+    date: str
+    total_members: int
+    messages_sent: int
+    members_joined: int
+    members_left: int
+
+
+# Today's ISO date and the epoch time at which it stops being today
+_today: Tuple[float, str] = (0.0, "")
+
+
+def _today_iso() -> str:
+    """Return today's local date as ISO text, rebuilt only after midnight."""
+    global _today
+    if time.time() >= _today[0]:
+        today = dt.date.today()
+        midnight = dt.datetime.combine(today + dt.timedelta(days=1), dt.time.min)
+        _today = (midnight.timestamp(), today.isoformat())
+    return _today[1]
+
+
+# Write-behind buffer: (guild_id, date) -> [members_joined, members_left, messages_sent]
+# increments not yet written; readers flush first.
+_stats_pending: Dict[Tuple[int, str], List[int]] = {}
+
+
+def flush_server_stats() -> None:
+    """Write buffered server stat increments to the database immediately."""
+    global _stats_pending
+    if not _stats_pending:
+        return
+    pending, _stats_pending = _stats_pending, {}
+    try:
+        bulk_upsert("""
+            INSERT INTO server_stats (guild_id, date, members_joined, members_left, messages_sent)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(guild_id, date) DO UPDATE SET
+                members_joined = members_joined + excluded.members_joined,
+                members_left = members_left + excluded.members_left,
+                messages_sent = messages_sent + excluded.messages_sent
+        """, (
+            (guild_id, date, joined, left, sent)
+            for (guild_id, date), (joined, left, sent) in pending.items()
+        ))
+    except Exception:
+        # Merge the increments back so the next flush retries them
+        for key, counts in _stats_pending.items():
+            merged = pending.setdefault(key, [0, 0, 0])
+            for i, n in enumerate(counts):
+                merged[i] += n
+        _stats_pending = pending
+        raise
+
+
+_stats_writer = WriteBehind(flush_server_stats, lambda: len(_stats_pending))
+
+
 async def update_server_stats(
     guild_id: int,
     members_joined: int = 0,
@@ -542,28 +601,21 @@ async def update_server_stats(
     messages_sent: int = 0
 ) -> None:
     """Update daily server statistics."""
-    conn = database_connect()
-    cursor = conn.cursor()
-    
-    today = dt.date.today().isoformat()
+    today = _today_iso()
     
-    cursor.execute("""
-        INSERT INTO server_stats (guild_id, date, members_joined, members_left, messages_sent)
-        VALUES (?, ?, ?, ?, ?)
-        ON CONFLICT(guild_id, date) DO UPDATE SET
-            members_joined = members_joined + ?,
-            members_left = members_left + ?,
-            messages_sent = messages_sent + ?
-    """, (guild_id, today, members_joined, members_left, messages_sent,
-          members_joined, members_left, messages_sent))
-    
-    conn.commit()
-    conn.close()
+    counts = _stats_pending.get((guild_id, today))
+    if counts is None:
+        counts = _stats_pending[(guild_id, today)] = [0, 0, 0]
+    counts[0] += members_joined
+    counts[1] += members_left
+    counts[2] += messages_sent
+    _stats_writer.schedule()
 
 
-async def get_server_stats(guild_id: int, days: int = 7) -> List[Dict]:
+async def get_server_stats(guild_id: int, days: int = 7) -> List[StatRow]:
     """Get server stats for the past N days."""
-    conn = database_connect()
+    flush_server_stats()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -574,22 +626,52 @@ async def get_server_stats(guild_id: int, days: int = 7) -> List[Dict]:
         LIMIT ?
     """, (guild_id, days))
     
+    return [StatRow._make(row) for row in cursor.fetchall()]
+
+
+async def get_rolling_activity(guild_id: int, window_days: int = 7, days: int = 30) -> List[Dict]:
+    """
+    Get per-day activity for the past N days, each with totals over the
+    trailing `window_days` calendar days, summed by SQLite in one query.
+    """
+    flush_server_stats()
+    conn = shared_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        WITH rolling AS (
+            SELECT
+                date,
+                SUM(messages_sent) OVER win AS messages_sent,
+                SUM(members_joined) OVER win AS members_joined,
+                SUM(members_left) OVER win AS members_left
+            FROM server_stats
+            WHERE guild_id = ?
+            WINDOW win AS (
+                ORDER BY julianday(date)
+                RANGE BETWEEN ? PRECEDING AND CURRENT ROW
+            )
+        )
+        SELECT date, messages_sent, members_joined, members_left
+        FROM rolling
+        ORDER BY date DESC
+        LIMIT ?
+    """, (guild_id, window_days - 1, days))
+    
     rows = cursor.fetchall()
-    conn.close()
     
     return [
         {
             "date": row[0],
-            "total_members": row[1],
-            "messages_sent": row[2],
-            "members_joined": row[3],
-            "members_left": row[4]
+            "messages_sent": row[1],
+            "members_joined": row[2],
+            "members_left": row[3]
         }
         for row in rows
     ]
 
 
-async def create_stats_embed(guild: discord.Guild, stats: List[Dict]) -> discord.Embed:
+async def create_stats_embed(guild: discord.Guild, stats: List[StatRow]) -> discord.Embed:
     """Create server stats dashboard embed."""
     embed = discord.Embed(
         title=f"📊 {guild.name} - Server Statistics",
@@ -607,24 +689,26 @@ async def create_stats_embed(guild: discord.Guild, stats: List[Dict]) -> discord
         recent = stats[0]
         embed.add_field(
             name="📨 Messages (Today)",
-            value=f"{recent['messages_sent']:,}",
+            value=f"{recent.messages_sent:,}",
             inline=True
         )
         embed.add_field(
             name="➕ Joined (Today)",
-            value=f"{recent['members_joined']}",
+            value=f"{recent.members_joined}",
             inline=True
         )
         embed.add_field(
             name="➖ Left (Today)",
-            value=f"{recent['members_left']}",
+            value=f"{recent.members_left}",
             inline=True
         )
         
         # Weekly totals
-        total_messages = sum(s['messages_sent'] for s in stats)
-        total_joined = sum(s['members_joined'] for s in stats)
-        total_left = sum(s['members_left'] for s in stats)
+        total_messages = total_joined = total_left = 0
+        for s in stats:
+            total_messages += s.messages_sent
+            total_joined += s.members_joined
+            total_left += s.members_left
         
         embed.add_field(
             name=f"📈 Past {len(stats)} Days",
@@ -4,48 +4,140 @@ Lightweight JSON-backed configuration store for guild/user settings.
 
 from __future__ import annotations
 
+import asyncio
+import atexit
 import json
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT_DIR / "data"
 DEFAULT_CONFIG_PATH = DATA_DIR / "config.json"
 CURRENT_VERSION = 1
 
+# Raw config bytes keyed by path, tagged with the file's mtime when cached.
+# Keeping bytes rather than parsed dicts means every load parses its own fresh
+# copy, which is cheaper than deep-copying a cached dict.
+_CACHE: Dict[Path, Tuple[int, bytes]] = {}
+_CACHE_LOCK = threading.Lock()
+
+# Debounced saves: the newest unsaved config per path, already serialized,
+# written once the burst of set_* calls settles for _SAVE_DELAY seconds.
+_SAVE_DELAY = 0.5
+_PENDING_SAVES: Dict[Path, bytes] = {}
+_save_handle: Optional[asyncio.TimerHandle] = None
+
 
 def _ensure_data_dir():
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _default_config() -> Dict[str, Any]:
+    return {"version": CURRENT_VERSION, "guilds": {}, "users": {}}
+
+
+def _dumps(config: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+    return json.dumps(config, indent=2, sort_keys=True).encode("utf-8")
+
+
+def _loads(raw: bytes) -> Dict[str, Any]:
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    if "version" not in data:
+        data["version"] = CURRENT_VERSION
+    data.setdefault("guilds", {})
+    data.setdefault("users", {})
+    return data
+
+
 def load_config(path: Path = DEFAULT_CONFIG_PATH) -> Dict[str, Any]:
     """
     Load the config file or return defaults if missing/broken.
+
+    The file is only re-read when its mtime changes; each call parses a fresh
+    dict, so mutating the result never touches the cache.
     """
     _ensure_data_dir()
-    if not path.exists():
-        return {"version": CURRENT_VERSION, "guilds": {}, "users": {}}
+    with _CACHE_LOCK:
+        pending = _PENDING_SAVES.get(path)
+    if pending is not None:
+        return _loads(pending)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return _default_config()
+    with _CACHE_LOCK:
+        cached = _CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return _loads(cached[1])
     try:
-        with path.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
+        raw = path.read_bytes()
+        data = _loads(raw)
     except Exception:
-        return {"version": CURRENT_VERSION, "guilds": {}, "users": {}}
-    if "version" not in data:
-        data["version"] = CURRENT_VERSION
-    data.setdefault("guilds", {})
-    data.setdefault("users", {})
+        return _default_config()
+    with _CACHE_LOCK:
+        _CACHE[path] = (mtime, raw)
     return data
 
 
+def _write(path: Path, raw: bytes) -> None:
+    _ensure_data_dir()
+    temp = path.with_suffix(".tmp")
+    temp.write_bytes(raw)
+    temp.replace(path)
+    # Cache what was just written so the next load skips reading it back; it
+    # also supersedes any debounced save still waiting for this path.
+    with _CACHE_LOCK:
+        _PENDING_SAVES.pop(path, None)
+        _CACHE[path] = (path.stat().st_mtime_ns, raw)
+
+
 def save_config(config: Dict[str, Any], path: Path = DEFAULT_CONFIG_PATH) -> None:
     """
     Persist the config atomically.
     """
-    _ensure_data_dir()
-    temp = path.with_suffix(".tmp")
-    with temp.open("w", encoding="utf-8") as fh:
-        json.dump(config, fh, indent=2, sort_keys=True)
-    temp.replace(path)
+    _write(path, _dumps(config))
+
+
+def flush_config() -> None:
+    """Write any debounced config saves to disk immediately."""
+    global _save_handle
+    if _save_handle is not None:
+        _save_handle.cancel()
+        _save_handle = None
+    with _CACHE_LOCK:
+        pending = list(_PENDING_SAVES.items())
+        _PENDING_SAVES.clear()
+    for path, raw in pending:
+        _write(path, raw)
+
+
+atexit.register(flush_config)
+
+
+def _schedule_save(config: Dict[str, Any], path: Path = DEFAULT_CONFIG_PATH) -> None:
+    """Save `config` after a short delay, coalescing saves made in the meantime."""
+    global _save_handle
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # No event loop (scripts, tests): write through.
+        save_config(config, path)
+        return
+    # Serializing now snapshots the config, so later edits by the caller
+    # don't leak into the pending save.
+    raw = _dumps(config)
+    with _CACHE_LOCK:
+        _PENDING_SAVES[path] = raw
+    if _save_handle is None:
+        _save_handle = loop.call_later(_SAVE_DELAY, flush_config)
 
 
 def get_guild_config(guild_id: int, *, config: Dict[str, Any] | None = None) -> Dict[str, Any]:
@@ -58,7 +150,7 @@ def set_guild_config(guild_id: int, key: str, value: Any, *, config: Dict[str, A
     cfg = config or load_config()
     guild_cfg = get_guild_config(guild_id, config=cfg)
     guild_cfg[key] = value
-    save_config(cfg)
+    _schedule_save(cfg)
     return guild_cfg
 
 
@@ -72,7 +164,7 @@ def set_user_config(user_id: int, key: str, value: Any, *, config: Dict[str, Any
     cfg = config or load_config()
     user_cfg = get_user_config(user_id, config=cfg)
     user_cfg[key] = value
-    save_config(cfg)
+    _schedule_save(cfg)
     return user_cfg
 
 
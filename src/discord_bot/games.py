@@ -4,16 +4,24 @@ Lightweight games and fun utilities.
 
 from __future__ import annotations
 
+import functools
 import random
 import re
-from typing import Iterable, List
+from collections.abc import Sequence
+from typing import Iterable, List, Tuple
 
+_DICE_RE = re.compile(r"(\d+)d(\d+)([+-]\d+)?")
+_POLL_SPLIT = re.compile(r"\s*\|\s*")
+# Dedicated generator for game rolls, bound once at import
+_rng = random.Random()
 
-def roll_dice(expression: str) -> int:
+
+@functools.lru_cache(maxsize=256)
+def _parse_dice(expression: str) -> Tuple[int, int, int]:
     """
-    Parse expressions like '2d6+3' or '1d20'. Returns the total.
+    Parse a dice expression into (count, sides, modifier).
     """
-    match = re.fullmatch(r"(\d+)d(\d+)([+-]\d+)?", expression.replace(" ", ""))
+    match = _DICE_RE.fullmatch(expression.replace(" ", ""))
     if not match:
         raise ValueError("Invalid dice expression")
     count = int(match.group(1))
@@ -21,19 +29,27 @@ def roll_dice(expression: str) -> int:
     mod = int(match.group(3)) if match.group(3) else 0
     if count <= 0 or sides <= 0:
         raise ValueError("Dice count and sides must be positive")
-    rolls = [random.randint(1, sides) for _ in range(count)]
+    return count, sides, mod
+
+
+def roll_dice(expression: str) -> int:
+    """
+    Parse expressions like '2d6+3' or '1d20'. Returns the total.
+    """
+    count, sides, mod = _parse_dice(expression)
+    rolls = _rng.choices(range(1, sides + 1), k=count)
     return sum(rolls) + mod
 
 
 def random_choice(options: Iterable[str]) -> str:
-    opts = list(options)
+    opts = options if isinstance(options, Sequence) else list(options)
     if not opts:
         raise ValueError("No options provided")
-    return random.choice(opts)
+    return _rng.choice(opts)
 
 
 def coin_flip() -> str:
-    return random.choice(["heads", "tails"])
+    return _rng.choice(["heads", "tails"])
 
 
 def rps_game(user_choice: str) -> str:
@@ -41,7 +57,7 @@ def rps_game(user_choice: str) -> str:
     user = user_choice.lower()
     if user not in choices:
         raise ValueError("Invalid choice")
-    bot = random.choice(choices)
+    bot = _rng.choice(choices)
     outcome = "draw"
     if (user == "rock" and bot == "scissors") or (user == "paper" and bot == "rock") or (user == "scissors" and bot == "paper"):
         outcome = "win"
@@ -50,6 +66,14 @@ def rps_game(user_choice: str) -> str:
     return f"You chose {user}, I chose {bot}. Result: {outcome}."
 
 
+@functools.lru_cache(maxsize=256)
+def parse_poll_payload(payload: str) -> Tuple[str, ...]:
+    """
+    Split 'question | option1 | option2' into its non-empty, stripped parts.
+    """
+    return tuple(part for part in _POLL_SPLIT.split(payload.strip()) if part)
+
+
 def poll_creator(question: str, options: List[str]) -> str:
     if not question or not options:
         raise ValueError("Question and options are required")
@@ -4,18 +4,28 @@ Gaming & Nerd Utilities: DnD, MTG, Warhammer, and more.
 
 from __future__ import annotations
 
+import bisect
 import random
 import re
+from collections import defaultdict
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 
 import discord
 
+# Dedicated generator for game rolls, bound once at import
+_rng = random.Random()
+
 
 # =============================
 # Advanced Dice Rolling
 # =============================
 
+_DICE_RE = re.compile(r"(\d+)d(\d+)([+-]\d+)?")
+# Advantage/disadvantage keywords (long forms included) and whitespace, stripped in one pass
+_ROLL_NOISE_RE = re.compile(r"dis(?:advantage)?|adv(?:antage)?|\s+")
+_DECK_LINE_RE = re.compile(r"(\d+)x?\s+(.+)")
+
 def roll_dice_detailed(expression: str) -> Dict:
     """
     Advanced dice roller with detailed results.
@@ -26,10 +36,10 @@ def roll_dice_detailed(expression: str) -> Dict:
     # Check for advantage/disadvantage
     advantage = "adv" in expression or "advantage" in expression
     disadvantage = "dis" in expression or "disadvantage" in expression
-    expression = expression.replace("adv", "").replace("advantage", "").replace("dis", "").replace("disadvantage", "")
+    expression = _ROLL_NOISE_RE.sub("", expression)
     
     # Parse dice expression
-    match = re.fullmatch(r"(\d+)d(\d+)([+-]\d+)?", expression.replace(" ", ""))
+    match = _DICE_RE.fullmatch(expression)
     if not match:
         raise ValueError("Invalid dice expression. Use format: 2d20, 3d6+5, etc.")
     
@@ -43,11 +53,11 @@ def roll_dice_detailed(expression: str) -> Dict:
         raise ValueError("Maximum 100 dice at once")
     
     # Roll dice
-    rolls = [random.randint(1, sides) for _ in range(count)]
+    rolls = _rng.choices(range(1, sides + 1), k=count)
     
     # Handle advantage/disadvantage for d20
     if (advantage or disadvantage) and sides == 20 and count == 1:
-        second_roll = random.randint(1, sides)
+        second_roll = _rng.randint(1, sides)
         rolls.append(second_roll)
         if advantage:
             result_roll = max(rolls)
@@ -79,7 +89,7 @@ def roll_custom_table(table: List[str]) -> str:
     """Roll on a custom table."""
     if not table:
         raise ValueError("Table is empty")
-    return random.choice(table)
+    return _rng.choice(table)
 
 
 # =============================
@@ -127,16 +137,19 @@ class CharacterStats:
         return embed
 
 
+_D6 = range(1, 7)
+
+
 def generate_ability_scores(method: str = "standard") -> List[int]:
     """
     Generate ability scores.
     Methods: standard (4d6 drop lowest), point_buy, array
     """
     if method == "standard" or method == "4d6":
-        scores = []
-        for _ in range(6):
-            rolls = sorted([random.randint(1, 6) for _ in range(4)])
-            scores.append(sum(rolls[1:]))  # Drop lowest
+        # All 24 dice in one call, then 4d6 drop lowest per group of four
+        rolls = _rng.choices(_D6, k=24)
+        groups = zip(*[iter(rolls)] * 4)
+        scores = [sum(group) - min(group) for group in groups]
         return sorted(scores, reverse=True)
     
     elif method == "point_buy":
@@ -156,24 +169,24 @@ def generate_ability_scores(method: str = "standard") -> List[int]:
 # =============================
 
 LOOT_TABLES = {
-    "common": [
+    "common": (
         "10 gold pieces", "A rusty dagger", "A health potion", "A worn leather bag",
         "A piece of chalk", "A tinderbox", "10 feet of rope", "A waterskin"
-    ],
-    "uncommon": [
+    ),
+    "uncommon": (
         "50 gold pieces", "A +1 dagger", "2 health potions", "A bag of holding (small)",
         "Boots of striding", "A spell scroll (1st level)", "A potion of climbing",
         "Goggles of night"
-    ],
-    "rare": [
+    ),
+    "rare": (
         "200 gold pieces", "A +1 longsword", "A ring of protection", "Cloak of protection",
         "A wand of magic missiles", "Bracers of defense", "Bag of tricks", "Belt of dwarvenkind"
-    ],
-    "legendary": [
+    ),
+    "legendary": (
         "1000 gold pieces", "A +2 weapon of your choice", "Ring of spell storing",
         "Staff of power", "Holy avenger", "Vorpal sword", "Sphere of annihilation",
         "Talisman of pure good"
-    ]
+    )
 }
 
 
@@ -183,7 +196,7 @@ def generate_loot(rarity: str = "common", count: int = 1) -> List[str]:
     if rarity not in LOOT_TABLES:
         rarity = "common"
     
-    return [random.choice(LOOT_TABLES[rarity]) for _ in range(min(count, 10))]
+    return _rng.choices(LOOT_TABLES[rarity], k=min(count, 10))
 
 
 # =============================
@@ -191,41 +204,50 @@ def generate_loot(rarity: str = "common", count: int = 1) -> List[str]:
 # =============================
 
 MONSTERS_BY_CR = {
-    "0": ["Rat", "Frog", "Spider", "Crab"],
-    "1/4": ["Goblin", "Kobold", "Skeleton", "Zombie"],
-    "1/2": ["Orc", "Hobgoblin", "Scout", "Thug"],
-    "1": ["Bugbear", "Dire Wolf", "Specter", "Spy"],
-    "2": ["Ogre", "Werewolf", "Ghast", "Gargoyle"],
-    "3": ["Owlbear", "Hell Hound", "Manticore", "Veteran"],
-    "4": ["Ettin", "Succubus", "Ghost", "Banshee"],
-    "5": ["Hill Giant", "Air Elemental", "Troll", "Gladiator"],
-    "10": ["Stone Golem", "Young Red Dragon", "Aboleth", "Guardian Naga"],
-    "20": ["Ancient Red Dragon", "Lich", "Kraken", "Tarrasque"]
+    "0": ("Rat", "Frog", "Spider", "Crab"),
+    "1/4": ("Goblin", "Kobold", "Skeleton", "Zombie"),
+    "1/2": ("Orc", "Hobgoblin", "Scout", "Thug"),
+    "1": ("Bugbear", "Dire Wolf", "Specter", "Spy"),
+    "2": ("Ogre", "Werewolf", "Ghast", "Gargoyle"),
+    "3": ("Owlbear", "Hell Hound", "Manticore", "Veteran"),
+    "4": ("Ettin", "Succubus", "Ghost", "Banshee"),
+    "5": ("Hill Giant", "Air Elemental", "Troll", "Gladiator"),
+    "10": ("Stone Golem", "Young Red Dragon", "Aboleth", "Guardian Naga"),
+    "20": ("Ancient Red Dragon", "Lich", "Kraken", "Tarrasque")
 }
 
 
+# (CR value, CR label) sorted by value, for nearest-CR lookup
+_CR_SORTED = (
+    (0, "0"), (0.25, "1/4"), (0.5, "1/2"), (1, "1"), (2, "2"),
+    (3, "3"), (4, "4"), (5, "5"), (10, "10"), (20, "20"),
+)
+_CR_FLOATS = tuple(value for value, _ in _CR_SORTED)
+
+
 def generate_encounter(party_level: int, party_size: int = 4) -> Dict:
     """Generate a balanced encounter."""
     # Simplified CR calculation
     avg_cr = max(0.25, party_level / 4)
     
-    # Select appropriate CR
-    available_crs = ["0", "1/4", "1/2", "1", "2", "3", "4", "5", "10", "20"]
-    cr_values = [0, 0.25, 0.5, 1, 2, 3, 4, 5, 10, 20]
-    
-    # Find closest CR
-    closest_idx = min(range(len(cr_values)), key=lambda i: abs(cr_values[i] - avg_cr))
-    selected_cr = available_crs[closest_idx]
+    # Find closest CR (the lower one on a tie)
+    closest_idx = bisect.bisect_left(_CR_FLOATS, avg_cr)
+    if closest_idx == len(_CR_FLOATS) or (
+        closest_idx > 0
+        and avg_cr - _CR_FLOATS[closest_idx - 1] <= _CR_FLOATS[closest_idx] - avg_cr
+    ):
+        closest_idx -= 1
+    cr_value, selected_cr = _CR_SORTED[closest_idx]
     
     # Generate monsters
-    monster_count = max(1, party_size // 2 + random.randint(-1, 1))
-    monsters = random.choices(MONSTERS_BY_CR[selected_cr], k=monster_count)
+    monster_count = max(1, party_size // 2 + _rng.randint(-1, 1))
+    monsters = _rng.choices(MONSTERS_BY_CR[selected_cr], k=monster_count)
     
     return {
         "cr": selected_cr,
         "monsters": monsters,
         "count": len(monsters),
-        "difficulty": "Medium" if party_level > cr_values[closest_idx] else "Hard"
+        "difficulty": "Medium" if party_level > cr_value else "Hard"
     }
 
 
@@ -238,19 +260,24 @@ class InitiativeTracker:
     
     def __init__(self):
         self.combatants: List[Tuple[str, int]] = []
+        # Negated initiatives, parallel to combatants, so bisect can find slots
+        self._keys: List[int] = []
         self.current_index = 0
         self.round_number = 1
     
     def add_combatant(self, name: str, initiative: int):
-        """Add a combatant to initiative."""
-        self.combatants.append((name, initiative))
-        self.combatants.sort(key=lambda x: x[1], reverse=True)
+        """Add a combatant to initiative, after any others with the same roll."""
+        index = bisect.bisect_right(self._keys, -initiative)
+        self._keys.insert(index, -initiative)
+        self.combatants.insert(index, (name, initiative))
     
     def remove_combatant(self, name: str) -> bool:
         """Remove a combatant."""
+        name = name.lower()
         for i, (n, _) in enumerate(self.combatants):
-            if n.lower() == name.lower():
+            if n.lower() == name:
                 self.combatants.pop(i)
+                self._keys.pop(i)
                 return True
         return False
     
@@ -281,18 +308,17 @@ class InitiativeTracker:
     def clear(self):
         """Clear initiative tracker."""
         self.combatants = []
+        self._keys = []
         self.current_index = 0
         self.round_number = 1
 
 
-# Global initiative trackers per guild
-_initiative_trackers: Dict[int, InitiativeTracker] = {}
+# Global initiative trackers per guild, created on first access
+_initiative_trackers: Dict[int, InitiativeTracker] = defaultdict(InitiativeTracker)
 
 
 def get_initiative_tracker(guild_id: int) -> InitiativeTracker:
     """Get or create initiative tracker for guild."""
-    if guild_id not in _initiative_trackers:
-        _initiative_trackers[guild_id] = InitiativeTracker()
     return _initiative_trackers[guild_id]
 
 
@@ -300,35 +326,35 @@ def get_initiative_tracker(guild_id: int) -> InitiativeTracker:
 # Random Generators
 # =============================
 
-FANTASY_FIRST_NAMES = [
+FANTASY_FIRST_NAMES = (
     "Aldric", "Bren", "Cassian", "Draven", "Elara", "Fynn", "Gwendolyn", "Hadrian",
     "Isolde", "Jareth", "Kaelen", "Lyra", "Magnus", "Nyx", "Orion", "Phoebe",
     "Quillon", "Raven", "Seraphina", "Theron", "Ulric", "Vesper", "Wren", "Zephyr"
-]
+)
 
-FANTASY_LAST_NAMES = [
+FANTASY_LAST_NAMES = (
     "Ironforge", "Stormwind", "Darkblade", "Moonwhisper", "Fireheart", "Frostborn",
     "Shadowstep", "Brightwood", "Thornspell", "Silvermane", "Goldleaf", "Ashborne",
     "Ravenclaw", "Nightshade", "Dawnbringer", "Starfall", "Windrunner", "Stonefist"
-]
+)
 
-NPC_PERSONALITIES = [
+NPC_PERSONALITIES = (
     "Cheerful and optimistic", "Grumpy and pessimistic", "Nervous and fidgety",
     "Arrogant and boastful", "Shy and timid", "Wise and thoughtful", "Cunning and sly",
     "Brave and heroic", "Cowardly and fearful", "Friendly and helpful", "Suspicious and paranoid",
     "Calm and collected", "Hot-tempered and aggressive", "Mysterious and secretive",
     "Jovial and loud", "Melancholy and sad"
-]
+)
 
-NPC_QUIRKS = [
+NPC_QUIRKS = (
     "Always adjusts their hat", "Speaks in rhymes", "Has a pet rat on their shoulder",
     "Constantly eating something", "Refers to themselves in third person",
     "Laughs at inappropriate times", "Collects unusual objects", "Has a distinctive accent",
     "Never makes eye contact", "Always carries a lucky charm", "Tells terrible jokes",
     "Has an unusual phobia", "Hums while thinking", "Gestures wildly when talking"
-]
+)
 
-QUEST_HOOKS = [
+QUEST_HOOKS = (
     "A mysterious stranger offers gold for a dangerous task",
     "Local children have gone missing near the old ruins",
     "A plague is spreading through the village",
@@ -344,21 +370,21 @@ QUEST_HOOKS = [
     "A mysterious portal has appeared in the town square",
     "The king's crown has been stolen on coronation day",
     "A beast is terrorizing the countryside"
-]
+)
 
 
 def generate_npc() -> Dict:
     """Generate a random NPC."""
     return {
-        "name": f"{random.choice(FANTASY_FIRST_NAMES)} {random.choice(FANTASY_LAST_NAMES)}",
-        "personality": random.choice(NPC_PERSONALITIES),
-        "quirk": random.choice(NPC_QUIRKS)
+        "name": f"{_rng.choice(FANTASY_FIRST_NAMES)} {_rng.choice(FANTASY_LAST_NAMES)}",
+        "personality": _rng.choice(NPC_PERSONALITIES),
+        "quirk": _rng.choice(NPC_QUIRKS)
     }
 
 
 def generate_quest_hook() -> str:
     """Generate a random quest hook."""
-    return random.choice(QUEST_HOOKS)
+    return _rng.choice(QUEST_HOOKS)
 
 
 # =============================
@@ -382,11 +408,12 @@ async def parse_decklist(decklist: str) -> Dict:
             continue
         
         # Parse "4 Card Name" or "4x Card Name"
-        match = re.match(r'(\d+)x?\s+(.+)', line)
+        match = _DECK_LINE_RE.match(line)
         if match:
             count = int(match.group(1))
             name = match.group(2).strip()
-            cards.append({"count": count, "name": name})
+            # Keep the display line so embeds don't rebuild it on every render
+            cards.append({"count": count, "name": name, "line": f"{count}x {name}"})
             total += count
     
     return {
@@ -405,10 +432,13 @@ def create_decklist_embed(deck_data: Dict, deck_name: str = "MTG Deck") -> disco
     )
     
     # Group cards
-    if deck_data["cards"]:
-        card_list = "\n".join([f"{c['count']}x {c['name']}" for c in deck_data["cards"][:25]])
-        if len(deck_data["cards"]) > 25:
-            card_list += f"\n... and {len(deck_data['cards']) - 25} more cards"
+    cards = deck_data["cards"]
+    if cards:
+        card_list = "\n".join(
+            c.get("line") or f"{c['count']}x {c['name']}" for c in cards[:25]
+        )
+        if len(cards) > 25:
+            card_list += f"\n... and {len(cards) - 25} more cards"
         embed.add_field(name="Decklist", value=card_list, inline=False)
     
     validity = "✅ Valid" if deck_data["valid"] else "❌ Invalid card count"
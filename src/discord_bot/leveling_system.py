@@ -6,12 +6,15 @@ Tracks user activity and rewards with levels and roles.
 from __future__ import annotations
 
 import datetime as dt
+import functools
 import random
+import time
 from typing import Optional, List, Dict, Tuple
 
 import discord
 
-from .storage_api import database_connect
+from .security import has_role
+from .storage_api import TTLCache, WriteBehind, bulk_upsert, on_database_reset, shared_connection, transaction
 
 
 # =============================
@@ -20,47 +23,48 @@ from .storage_api import database_connect
 
 def init_leveling_database() -> None:
     """Initialize the leveling system database tables."""
-    conn = database_connect()
-    cursor = conn.cursor()
-    
-    # User XP table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS user_xp (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            xp INTEGER DEFAULT 0,
-            level INTEGER DEFAULT 0,
-            last_message_time TIMESTAMP,
-            total_messages INTEGER DEFAULT 0,
-            UNIQUE(guild_id, user_id)
-        )
-    """)
-    
-    # Level roles table (role rewards at certain levels)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS level_roles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id INTEGER NOT NULL,
-            level INTEGER NOT NULL,
-            role_id INTEGER NOT NULL,
-            UNIQUE(guild_id, level)
-        )
-    """)
-    
-    # Create indexes
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_user_xp_guild_user 
-        ON user_xp(guild_id, user_id)
-    """)
-    
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_user_xp_guild_xp 
-        ON user_xp(guild_id, xp DESC)
-    """)
-    
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.cursor()
+
+        # User XP table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_xp (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                xp INTEGER DEFAULT 0,
+                level INTEGER DEFAULT 0,
+                last_message_time TIMESTAMP,
+                total_messages INTEGER DEFAULT 0,
+                UNIQUE(guild_id, user_id)
+            )
+        """)
+
+        # Level roles table (role rewards at certain levels)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS level_roles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                level INTEGER NOT NULL,
+                role_id INTEGER NOT NULL,
+                UNIQUE(guild_id, level)
+            )
+        """)
+
+        # Create indexes
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_user_xp_guild_user 
+            ON user_xp(guild_id, user_id)
+        """)
+
+        # Covers the leaderboard so it is served from the index alone; it
+        # replaces the narrower (guild_id, xp) index.
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_user_xp_leaderboard
+            ON user_xp(guild_id, xp DESC, user_id, level)
+        """)
+
+        cursor.execute("DROP INDEX IF EXISTS idx_user_xp_guild_xp")
 
 
 # =============================
@@ -84,6 +88,7 @@ class LevelingConfig:
     STREAK_BONUS_MULTIPLIER = 1.5  # If active multiple days in a row
     
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def xp_for_level(level: int) -> int:
         """Calculate total XP needed to reach a level."""
         return int(LevelingConfig.XP_BASE * (level ** LevelingConfig.XP_EXPONENT))
@@ -91,9 +96,14 @@ class LevelingConfig:
     @staticmethod
     def level_from_xp(xp: int) -> int:
         """Calculate level from total XP."""
-        level = 0
+        if xp <= 0:
+            return 0
+        # Invert the formula, then step past any float rounding at the boundary
+        level = int((xp / LevelingConfig.XP_BASE) ** (1 / LevelingConfig.XP_EXPONENT))
         while xp >= LevelingConfig.xp_for_level(level + 1):
             level += 1
+        while level > 0 and xp < LevelingConfig.xp_for_level(level):
+            level -= 1
         return level
 
 
@@ -101,6 +111,92 @@ class LevelingConfig:
 # XP Management
 # =============================
 
+# Write-behind buffer: (guild_id, user_id) -> [xp, level, new_messages, last_message_time].
+# Holds each active user's current totals until the next flush writes them all
+# in one transaction; readers flush first so they never see stale rows.
+_xp_pending: Dict[Tuple[int, int], list] = {}
+
+# Last (xp, level) written per recently active user. This process is the only
+# writer, so add_xp can start from these instead of reading the row back.
+_xp_totals = TTLCache(maxsize=100_000, ttl=600)
+
+# Re-analyze user_xp every this many flushes so the leaderboard index stays
+# the planner's choice as the table grows.
+ANALYZE_EVERY_FLUSHES = 1000
+_flushes_since_analyze = 0
+
+
+def flush_xp() -> None:
+    """Write buffered XP to the database immediately."""
+    global _xp_pending, _flushes_since_analyze
+    if not _xp_pending:
+        return
+    pending, _xp_pending = _xp_pending, {}
+    try:
+        bulk_upsert("""
+            INSERT INTO user_xp (guild_id, user_id, xp, level, last_message_time, total_messages)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET
+                xp = excluded.xp,
+                level = excluded.level,
+                last_message_time = excluded.last_message_time,
+                total_messages = total_messages + excluded.total_messages
+        """, (
+            (guild_id, user_id, xp, level, last_time, messages)
+            for (guild_id, user_id), (xp, level, messages, last_time) in pending.items()
+        ))
+    except Exception:
+        # Put the batch back so the next flush retries it. Nothing can be
+        # buffered during this synchronous write, but keep anything that was.
+        pending.update(_xp_pending)
+        _xp_pending = pending
+        raise
+    for key, (xp, level, _, _) in pending.items():
+        _xp_totals[key] = (xp, level)
+    _flushes_since_analyze += 1
+    if _flushes_since_analyze >= ANALYZE_EVERY_FLUSHES:
+        _flushes_since_analyze = 0
+        shared_connection().execute("ANALYZE user_xp")
+
+
+_xp_writer = WriteBehind(flush_xp, lambda: len(_xp_pending))
+
+# XP cooldowns: (guild_id, user_id) -> monotonic time the cooldown ends. Entries
+# drop out once the cooldown has passed, which also bounds memory.
+_xp_cooldowns = TTLCache(maxsize=100_000, ttl=LevelingConfig.XP_COOLDOWN_SECONDS)
+_cooldowns_loaded = False
+
+
+def _load_recent_cooldowns() -> None:
+    """Seed cooldowns once from XP granted shortly before this process started."""
+    global _cooldowns_loaded
+    _cooldowns_loaded = True
+    cooldown = LevelingConfig.XP_COOLDOWN_SECONDS
+    now = dt.datetime.now(dt.timezone.utc)
+    since = (now - dt.timedelta(seconds=cooldown)).isoformat()
+    cursor = shared_connection().execute("""
+        SELECT guild_id, user_id, last_message_time FROM user_xp
+        WHERE last_message_time >= ?
+    """, (since,))
+    mono = time.monotonic()
+    for guild_id, user_id, last_time in cursor:
+        age = (now - dt.datetime.fromisoformat(last_time)).total_seconds()
+        _xp_cooldowns[(guild_id, user_id)] = mono + cooldown - age
+
+
+@on_database_reset
+def _forget_cached_xp() -> None:
+    """
+    Drop XP totals and cooldowns read from the database. flush_xp writes
+    absolute totals, so after a restore a stale cached total would overwrite
+    the restored row.
+    """
+    global _cooldowns_loaded
+    _xp_totals.clear()
+    _xp_cooldowns.clear()
+    _cooldowns_loaded = False
+
+
 async def add_xp(
     guild_id: int,
     user_id: int,
@@ -123,68 +219,50 @@ async def add_xp(
             LevelingConfig.MAX_XP_PER_MESSAGE
         )
     
-    conn = database_connect()
-    cursor = conn.cursor()
-    
-    # Get current XP
-    cursor.execute("""
-        SELECT xp, level FROM user_xp
-        WHERE guild_id = ? AND user_id = ?
-    """, (guild_id, user_id))
-    
-    result = cursor.fetchone()
-    if result:
-        current_xp, current_level = result
+    key = (guild_id, user_id)
+    entry = _xp_pending.get(key)
+    if entry is None:
+        # Get current XP, from memory when this user was written recently
+        result = _xp_totals.get(key)
+        if result is None:
+            cursor = shared_connection().execute("""
+                SELECT xp, level FROM user_xp
+                WHERE guild_id = ? AND user_id = ?
+            """, key)
+            result = cursor.fetchone()
+        current_xp, current_level = result if result else (0, 0)
+        entry = _xp_pending[key] = [current_xp, current_level, 0, None]
     else:
-        current_xp, current_level = 0, 0
+        current_xp, current_level = entry[0], entry[1]
     
     # Add XP
     new_xp = current_xp + amount
     new_level = LevelingConfig.level_from_xp(new_xp)
     leveled_up = new_level > current_level
     
-    # Update database
-    cursor.execute("""
-        INSERT INTO user_xp (guild_id, user_id, xp, level, last_message_time, total_messages)
-        VALUES (?, ?, ?, ?, ?, 1)
-        ON CONFLICT(guild_id, user_id) DO UPDATE SET
-            xp = ?,
-            level = ?,
-            last_message_time = ?,
-            total_messages = total_messages + 1
-    """, (guild_id, user_id, new_xp, new_level, dt.datetime.now(dt.timezone.utc).isoformat(),
-          new_xp, new_level, dt.datetime.now(dt.timezone.utc).isoformat()))
-    
-    conn.commit()
-    conn.close()
+    # Buffer the update; the write-behind task persists it
+    entry[0] = new_xp
+    entry[1] = new_level
+    entry[2] += 1
+    entry[3] = dt.datetime.now(dt.timezone.utc).isoformat()
+    _xp_cooldowns[key] = time.monotonic() + LevelingConfig.XP_COOLDOWN_SECONDS
+    _xp_writer.schedule()
     
     return new_xp, new_level, leveled_up
 
 
 async def can_gain_xp(guild_id: int, user_id: int) -> bool:
     """Check if user can gain XP (not on cooldown)."""
-    conn = database_connect()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT last_message_time FROM user_xp
-        WHERE guild_id = ? AND user_id = ?
-    """, (guild_id, user_id))
-    
-    result = cursor.fetchone()
-    conn.close()
-    
-    if not result or not result[0]:
-        return True
-    
-    last_time = dt.datetime.fromisoformat(result[0])
-    now = dt.datetime.now(dt.timezone.utc)
-    return (now - last_time).total_seconds() >= LevelingConfig.XP_COOLDOWN_SECONDS
+    if not _cooldowns_loaded:
+        _load_recent_cooldowns()
+    ends = _xp_cooldowns.get((guild_id, user_id))
+    return ends is None or time.monotonic() >= ends
 
 
 async def get_user_stats(guild_id: int, user_id: int) -> Optional[Dict]:
     """Get user's leveling stats."""
-    conn = database_connect()
+    flush_xp()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -193,7 +271,6 @@ async def get_user_stats(guild_id: int, user_id: int) -> Optional[Dict]:
     """, (guild_id, user_id))
     
     result = cursor.fetchone()
-    conn.close()
     
     if not result:
         return None
@@ -221,7 +298,8 @@ async def get_leaderboard(guild_id: int, limit: int = 10) -> List[Tuple[int, int
     Returns:
         List of (user_id, xp, level) tuples
     """
-    conn = database_connect()
+    flush_xp()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -232,27 +310,30 @@ async def get_leaderboard(guild_id: int, limit: int = 10) -> List[Tuple[int, int
     """, (guild_id, limit))
     
     rows = cursor.fetchall()
-    conn.close()
     
     return rows
 
 
 async def get_user_rank(guild_id: int, user_id: int) -> Optional[int]:
     """Get user's rank in the guild."""
-    conn = database_connect()
+    flush_xp()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
-        SELECT COUNT(*) + 1 FROM user_xp
-        WHERE guild_id = ? AND xp > (
-            SELECT xp FROM user_xp WHERE guild_id = ? AND user_id = ?
-        )
-    """, (guild_id, guild_id, user_id))
+        SELECT xp FROM user_xp WHERE guild_id = ? AND user_id = ?
+    """, (guild_id, user_id))
     
     result = cursor.fetchone()
-    conn.close()
+    if not result:
+        return None
+    
+    cursor.execute("""
+        SELECT COUNT(*) + 1 FROM user_xp
+        WHERE guild_id = ? AND xp > ?
+    """, (guild_id, result[0]))
     
-    return result[0] if result else None
+    return cursor.fetchone()[0]
 
 
 # =============================
@@ -261,7 +342,7 @@ async def get_user_rank(guild_id: int, user_id: int) -> Optional[int]:
 
 async def set_level_role(guild_id: int, level: int, role_id: int) -> None:
     """Set a role reward for reaching a level."""
-    conn = database_connect()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -270,13 +351,11 @@ async def set_level_role(guild_id: int, level: int, role_id: int) -> None:
         ON CONFLICT(guild_id, level) DO UPDATE SET role_id = ?
     """, (guild_id, level, role_id, role_id))
     
-    conn.commit()
-    conn.close()
 
 
 async def remove_level_role(guild_id: int, level: int) -> bool:
     """Remove a level role reward."""
-    conn = database_connect()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -285,15 +364,13 @@ async def remove_level_role(guild_id: int, level: int) -> bool:
     """, (guild_id, level))
     
     success = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
     
     return success
 
 
 async def get_level_roles(guild_id: int) -> List[Tuple[int, int]]:
     """Get all level role rewards for a guild."""
-    conn = database_connect()
+    conn = shared_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -303,7 +380,6 @@ async def get_level_roles(guild_id: int) -> List[Tuple[int, int]]:
     """, (guild_id,))
     
     rows = cursor.fetchall()
-    conn.close()
     
     return rows
 
@@ -316,7 +392,7 @@ async def assign_level_roles(member: discord.Member, level: int) -> List[discord
     for req_level, role_id in level_roles:
         if level >= req_level:
             role = member.guild.get_role(role_id)
-            if role and role not in member.roles:
+            if role and not has_role(member, role_id):
                 await member.add_roles(role, reason=f"Level {req_level} reward")
                 assigned.append(role)
     
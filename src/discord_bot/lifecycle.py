@@ -4,10 +4,14 @@ Lifecycle helpers to centralize Discord bot startup/shutdown and extension manag
 
 from __future__ import annotations
 
-from typing import Iterable, List, Sequence, Tuple
+from typing import TYPE_CHECKING, Iterable, List, Sequence, Tuple
 from discord.ext import commands
 
-from integrations.twitch_integration import TwitchIntegration
+from . import analytics, config_store
+from .storage_api import close_http_session, close_shared_connection
+
+if TYPE_CHECKING:
+    from integrations.twitch_integration import TwitchIntegration
 
 # Extend this list with dotted module paths for your cogs/extensions.
 DEFAULT_EXTENSIONS: List[str] = []
@@ -43,6 +47,10 @@ async def graceful_shutdown(bot: commands.Bot, twitch: TwitchIntegration | None
             await twitch.api.client.aclose()
         except Exception:
             pass
+    await close_http_session()
+    analytics.flush()
+    config_store.flush_config()
+    close_shared_connection()
     await bot.close()
 
 
@@ -4,18 +4,25 @@ Architecture / maintenance utilities.
 
 from __future__ import annotations
 
+import asyncio
 import importlib
 import importlib.util
 import importlib.metadata
 import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Iterable, List
 
+from . import storage_api
+
 ROOT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT_DIR / "data"
 BACKUP_DIR = DATA_DIR / "backups"
 
+# Single worker so backups and restores never run over the data directory at once.
+_BACKUP_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup")
+
 
 def dependency_check(packages: Iterable[str]) -> Dict[str, bool]:
     """
@@ -62,9 +69,19 @@ def update_notifier(current_version: str, latest_version: str | None = None) ->
     return f"Update available: {current_version} -> {latest_version}"
 
 
+def _is_database_file(item: Path) -> bool:
+    """True for the sqlite database and its WAL/SHM/journal side files."""
+    name = storage_api.DB_PATH.name
+    return item.name in (name, f"{name}-wal", f"{name}-shm", f"{name}-journal")
+
+
 def backup_data() -> Path:
     """
     Create a timestamped backup of the data directory.
+
+    The database is copied as a consistent snapshot through sqlite's backup
+    API, since copying the live file and its WAL one at a time can miss
+    transactions checkpointed in between; other files are copied as-is.
     """
     timestamp = time.strftime("%Y%m%d-%H%M%S")
     dest = BACKUP_DIR / f"backup-{timestamp}"
@@ -74,36 +91,77 @@ def backup_data() -> Path:
         raise FileExistsError(f"Backup path already exists: {dest}")
     dest.mkdir(parents=True, exist_ok=True)
     for item in DATA_DIR.iterdir():
-        if item.name == "backups":
+        if item.name == "backups" or _is_database_file(item):
             continue
         target = dest / item.name
         if item.is_dir():
             shutil.copytree(item, target)
         else:
             shutil.copy2(item, target)
+    storage_api.backup_database(dest / storage_api.DB_PATH.name)
     return dest
 
 
-def restore_backup(backup_path: Path) -> Path:
-    """
-    Restore the contents of a given backup path into the data directory.
-    """
-    backup_path = backup_path.resolve()
+def _restore_files(backup_path: Path) -> None:
+    """Replace everything in the data directory except the database with the backup's copy."""
     if not backup_path.exists():
         raise FileNotFoundError(f"Backup not found: {backup_path}")
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     BACKUP_DIR.mkdir(parents=True, exist_ok=True)
     for item in DATA_DIR.iterdir():
-        if item.name == "backups":
+        if item.name == "backups" or _is_database_file(item):
             continue
         if item.is_dir():
             shutil.rmtree(item)
         else:
             item.unlink()
     for item in backup_path.iterdir():
+        if _is_database_file(item):
+            continue
         target = DATA_DIR / item.name
         if item.is_dir():
             shutil.copytree(item, target)
         else:
             shutil.copy2(item, target)
+
+
+def _restore_database(backup_path: Path) -> None:
+    snapshot = backup_path / storage_api.DB_PATH.name
+    if snapshot.exists():
+        storage_api.restore_database(snapshot)
+
+
+def restore_backup(backup_path: Path) -> Path:
+    """
+    Restore the contents of a given backup path into the data directory.
+
+    The database is copied into the live shared connection rather than
+    replaced on disk, so this must run on the thread that uses that
+    connection; from the bot, use restore_backup_async().
+    """
+    backup_path = backup_path.resolve()
+    _restore_files(backup_path)
+    _restore_database(backup_path)
+    return DATA_DIR
+
+
+async def backup_data_async() -> Path:
+    """
+    Run backup_data() on the dedicated backup thread without blocking the event loop.
+    """
+    # Buffered XP and stats live on the loop; write them out so the snapshot has them.
+    storage_api.flush_write_behind()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_BACKUP_EXECUTOR, backup_data)
+
+
+async def restore_backup_async(backup_path: Path) -> Path:
+    """
+    Restore a backup, copying plain files on the dedicated backup thread and
+    the database on the event loop, which owns the shared connection.
+    """
+    backup_path = backup_path.resolve()
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_BACKUP_EXECUTOR, _restore_files, backup_path)
+    _restore_database(backup_path)
     return DATA_DIR
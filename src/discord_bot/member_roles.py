@@ -9,6 +9,8 @@ from typing import Optional
 
 import discord
 
+from .security import has_role
+
 
 async def on_member_join(member: discord.Member, welcome_channel: Optional[discord.TextChannel] = None):
     if welcome_channel:
@@ -22,14 +24,14 @@ async def on_member_remove(member: discord.Member, log_channel: Optional[discord
 
 async def assign_role(member: discord.Member, role_id: int, reason: str | None = None):
     role = member.guild.get_role(role_id)
-    if role and role not in member.roles:
+    if role and not has_role(member, role_id):
         await member.add_roles(role, reason=reason)
     return role
 
 
 async def remove_role(member: discord.Member, role_id: int, reason: str | None = None):
     role = member.guild.get_role(role_id)
-    if role and role in member.roles:
+    if role and has_role(member, role_id):
         await member.remove_roles(role, reason=reason)
     return role
 
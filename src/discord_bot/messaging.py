@@ -4,9 +4,43 @@ Messaging and channel helpers for Discord.
 
 from __future__ import annotations
 
-from typing import Iterable, List, Optional
+from typing import Any, Iterable, List, Optional
 
 import discord
+from discord.ext import commands
+
+from .ratelimit import throttled
+
+
+async def send_queued(ctx: commands.Context, *args: Any, **kwargs: Any) -> discord.Message:
+    """
+    Send a reply through a per-channel token bucket so bursts queue up locally
+    (in order) instead of tripping Discord's rate limit.
+    """
+    # Discord allows roughly 5 messages per 5 seconds per channel.
+    return await throttled(
+        f"messages:{ctx.channel.id}", lambda: ctx.send(*args, **kwargs), rate=5, per=5.0, retries=1
+    )
+
+
+async def send_paginated(ctx: commands.Context, header: str, lines: Iterable[str]) -> discord.Message:
+    """
+    Send a header and list lines as one message when it fits; otherwise as a
+    single embed with the lines split across fields on line boundaries.
+    """
+    lines = list(lines)
+    text = "\n".join([header, *lines])
+    if len(text) <= 2000:
+        return await send_queued(ctx, text)
+
+    # Field values cap at 1024 chars and an embed at 6000 in total, so 5 pages.
+    paginator = commands.Paginator(prefix=None, suffix=None, max_size=1024)
+    for line in lines:
+        paginator.add_line(line)
+    embed = discord.Embed(title=header.strip("*").rstrip(":"), color=discord.Color.green())
+    for idx, page in enumerate(paginator.pages[:5], start=1):
+        embed.add_field(name=f"Page {idx}", value=page, inline=False)
+    return await send_queued(ctx, embed=embed)
 
 
 async def send_message(channel: discord.abc.Messageable, content: str) -> discord.Message:
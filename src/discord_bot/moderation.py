@@ -44,8 +44,14 @@ async def unban_user(guild: discord.Guild, user_id: int, reason: str | None = No
     return f"Unbanned user {user_id}."
 
 
+def _not_pinned(message: discord.Message) -> bool:
+    return not message.pinned
+
+
 async def purge_messages(channel: discord.TextChannel, amount: int, reason: str | None = None):
-    deleted = await channel.purge(limit=amount, reason=reason)
+    # purge() already deletes in bulk-delete batches of 100 and falls back to
+    # single deletes for messages older than 14 days.
+    deleted = await channel.purge(limit=amount, check=_not_pinned, bulk=True, reason=reason)
     return f"Deleted {len(deleted)} messages."
 
 
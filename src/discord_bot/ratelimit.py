@@ -0,0 +1,96 @@
+"""
+Client-side rate limiting helpers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, TypeVar
+
+import discord
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    Async token bucket allowing `rate` acquisitions every `per` seconds.
+
+    Waiters are served in FIFO order, so work throttled through one bucket
+    keeps the order it was submitted in.
+    """
+
+    def __init__(self, rate: float, per: float):
+        self.capacity = float(rate)
+        self.tokens = float(rate)
+        self.fill_rate = rate / per
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.fill_rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+                self._refill()
+            self.tokens -= 1
+
+    async def __aenter__(self) -> "TokenBucket":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+# Shared buckets keyed by route and major parameter, e.g. "reactions:<channel_id>".
+BUCKETS: Dict[str, TokenBucket] = {}
+
+
+def get_bucket(route_key: str, rate: float = 5, per: float = 5.0) -> TokenBucket:
+    """Return the bucket for a route key, creating it with the given rate on first use."""
+    bucket = BUCKETS.get(route_key)
+    if bucket is None:
+        bucket = BUCKETS[route_key] = TokenBucket(rate, per)
+    return bucket
+
+
+def _retry_after(exc: discord.HTTPException) -> float:
+    if exc.response is None:
+        return 1.0
+    return float(exc.response.headers.get("Retry-After", 1))
+
+
+async def throttled(
+    route_key: str,
+    coro_factory: Callable[[], Awaitable[T]],
+    *,
+    rate: float = 5,
+    per: float = 5.0,
+    retries: int = 3,
+) -> T:
+    """
+    Pace a REST call through the route's bucket, retrying 429 responses with
+    exponential backoff (Retry-After * 2**attempt plus jitter).
+
+    `coro_factory` is called once per attempt, since a coroutine can only be awaited once.
+    """
+    bucket = get_bucket(route_key, rate, per)
+    attempt = 0
+    while True:
+        await bucket.acquire()
+        try:
+            return await coro_factory()
+        except discord.HTTPException as exc:
+            if exc.status != 429 or attempt >= retries:
+                raise
+            await asyncio.sleep(_retry_after(exc) * 2 ** attempt + random.random() * 0.1)
+            attempt += 1
@@ -102,15 +102,24 @@ def daily_task_runner(callback: Callback, *, hour: int = 0, minute: int = 0, sec
     return task_id
 
 
-async def temporary_message(channel: discord.abc.Messageable, content: str, duration: float) -> None:
+async def temporary_message(
+    channel: discord.abc.Messageable, content: str, duration: float
+) -> Optional[discord.Message]:
     """
-    Send a message and delete it after `duration` seconds.
+    Send a message and schedule its deletion after `duration` seconds.
+    Returns as soon as the message is sent (None if sending failed).
     """
-    message: Optional[discord.Message] = None
     try:
         message = await channel.send(content)
-        await asyncio.sleep(duration)
-        await message.delete()
-    except Exception:
-        # Swallow errors (e.g., missing permissions or already deleted)
-        pass
+    except discord.HTTPException:
+        return None
+
+    async def _delete():
+        try:
+            await message.delete()
+        except discord.HTTPException:
+            # Already deleted or missing permissions
+            pass
+
+    schedule_task(duration, _delete)
+    return message
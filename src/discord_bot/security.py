@@ -24,7 +24,9 @@ def is_moderator(member: discord.Member) -> bool:
 
 
 def has_role(member: discord.Member, role_id: int) -> bool:
-    return any(role.id == role_id for role in member.roles)
+    # get_role() searches the member's sorted role-id array instead of
+    # building and scanning the member.roles list.
+    return member.get_role(role_id) is not None
 
 
 def has_permission(member: discord.Member, permission: str) -> bool:
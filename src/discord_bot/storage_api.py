@@ -4,19 +4,55 @@ Storage and external API helpers.
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import functools
+import itertools
+import json
+import logging
 import sqlite3
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, Optional, TypeVar
 
+import aiohttp
 import httpx
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
+
 ROOT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT_DIR / "data"
 DB_PATH = DATA_DIR / "db.sqlite3"
 
+log = logging.getLogger(__name__)
+
 _CACHE: Dict[str, tuple[Any, float | None]] = {}
 
+T = TypeVar("T")
+_MISSING = object()
+
+# Shared HTTP client: one connection pool for every outbound API call.
+_HTTP_SESSION: aiohttp.ClientSession | None = None
+_HTTP_CONCURRENCY = asyncio.Semaphore(10)
+
+# Shared sqlite connection, opened lazily by shared_connection().
+_DB_CONN: sqlite3.Connection | None = None
+# journal_mode is stored in the database file, so setting it once when the shared
+# connection opens covers every connection. The rest only last for the
+# connection that sets them and are applied to each new one.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA analysis_limit=400",  # keeps ANALYZE and PRAGMA optimize cheap on big tables
+)
+
 
 def _ensure_data_dir():
     DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -28,9 +64,176 @@ def database_connect() -> sqlite3.Connection:
     """
     _ensure_data_dir()
     conn = sqlite3.connect(DB_PATH)
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
+def shared_connection() -> sqlite3.Connection:
+    """
+    Return the process-wide sqlite connection, opening it on first use.
+
+    The connection is in autocommit mode with WAL journaling; group writes
+    that must land together with `transaction()`.
+    """
+    global _DB_CONN
+    if _DB_CONN is None:
+        _ensure_data_dir()
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        _DB_CONN = conn
+    return _DB_CONN
+
+
+@contextlib.contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """
+    Run a block of writes on the shared connection inside BEGIN IMMEDIATE,
+    committing on success and rolling back on error.
+    """
+    conn = shared_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def bulk_upsert(sql: str, rows: Iterable[tuple[Any, ...]], *, chunk: int = 450) -> int:
+    """
+    Run a parameterized INSERT/upsert for every row in one transaction,
+    feeding executemany `chunk` rows at a time so a generator of rows is never
+    materialized whole. Returns the number of rows written.
+    """
+    written = 0
+    rows = iter(rows)
+    with transaction() as conn:
+        while batch := list(itertools.islice(rows, chunk)):
+            conn.executemany(sql, batch)
+            written += len(batch)
+    return written
+
+
+class WriteBehind:
+    """
+    Defer a buffer's database writes to a background task that calls `flush`
+    at most once per `interval` seconds, or as soon as `pending()` reaches
+    `batch`. Without a running event loop (scripts, tests) writes go through
+    immediately. Buffers are flushed before the shared connection closes.
+
+    `flush` must leave the buffer intact if its write fails; the background
+    task logs the error and retries on the next interval.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[], None],
+        pending: Callable[[], int],
+        *,
+        interval: float = 0.1,
+        batch: int = 500,
+    ):
+        self.flush = flush
+        self.pending = pending
+        self.interval = interval
+        self.batch = batch
+        self._task: asyncio.Task | None = None
+        self._batch_full: asyncio.Event | None = None
+        _WRITE_BEHIND.append(self)
+
+    async def _run(self, batch_full: asyncio.Event) -> None:
+        while self.pending():
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(batch_full.wait(), timeout=self.interval)
+            batch_full.clear()
+            try:
+                self.flush()
+            except Exception:
+                log.exception("Write-behind flush failed; retrying in %.1fs", self.interval)
+
+    def schedule(self) -> None:
+        """Note that the buffer has new data."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        # A task left on a loop that has since closed would never flush
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._batch_full = asyncio.Event()
+            self._task = asyncio.create_task(self._run(self._batch_full))
+        if self.pending() >= self.batch:
+            self._batch_full.set()
+
+
+_WRITE_BEHIND: list[WriteBehind] = []
+_RESET_HOOKS: list[Callable[[], None]] = []
+
+
+def on_database_reset(hook: Callable[[], None]) -> Callable[[], None]:
+    """
+    Register `hook` to run after the shared connection closes or the database
+    is restored, so modules can drop anything cached from the old contents.
+    Usable as a decorator.
+    """
+    _RESET_HOOKS.append(hook)
+    return hook
+
+
+def flush_write_behind() -> None:
+    """Write every write-behind buffer to the database now."""
+    for buffer in _WRITE_BEHIND:
+        buffer.flush()
+
+
+def backup_database(dest: Path) -> bool:
+    """
+    Copy a consistent snapshot of the database to `dest` with sqlite's backup
+    API. Reads through its own connection, so it is safe on a worker thread
+    while the shared connection keeps writing. Flush write-behind buffers
+    first to include them. Returns False if there is no database yet.
+    """
+    if not DB_PATH.exists():
+        return False
+    with contextlib.closing(sqlite3.connect(DB_PATH)) as src, contextlib.closing(sqlite3.connect(dest)) as out:
+        src.backup(out)
+    return True
+
+
+def restore_database(source: Path) -> None:
+    """
+    Overwrite the database with the snapshot at `source`, copying it into the
+    shared connection with sqlite's backup API so the live handle never
+    closes or points at a half-restored file.
+
+    Must run on the event loop thread, like every other use of the shared
+    connection: buffers are flushed first (their rows would otherwise land on
+    top of the restored data) and reset hooks run afterwards.
+    """
+    flush_write_behind()
+    with contextlib.closing(sqlite3.connect(source)) as src:
+        src.backup(shared_connection())
+    for hook in _RESET_HOOKS:
+        hook()
+
+
+def close_shared_connection() -> None:
+    """Flush write-behind buffers and close the shared sqlite connection; the next use reopens it."""
+    global _DB_CONN
+    flush_write_behind()
+    if _DB_CONN is not None:
+        # Refresh planner statistics for tables whose queries would benefit
+        _DB_CONN.execute("PRAGMA optimize")
+        _DB_CONN.close()
+        _DB_CONN = None
+    for hook in _RESET_HOOKS:
+        hook()
+
+
 def database_query(query: str, params: tuple[Any, ...] | None = None) -> list[tuple]:
     """
     Run a simple read-only query and return rows.
@@ -61,6 +264,114 @@ def cache_set(key: str, value: Any, ttl: int | None = None) -> None:
     _CACHE[key] = (value, expires)
 
 
+class TTLCache:
+    """
+    Mapping whose entries expire `ttl` seconds after being set. At most
+    `maxsize` entries are kept; the least recently used is evicted first.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires, value = entry
+        if time.monotonic() >= expires:
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+def async_cached_ttl(
+    ttl: float = 120, maxsize: int = 256
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Memoize an async function's results for `ttl` seconds, keeping at most
+    `maxsize` entries (least recently used are evicted first).
+
+    Empty results are not cached so a failed upstream call is retried next time.
+    """
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        entries = TTLCache(maxsize, ttl)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            key = (args, tuple(sorted(kwargs.items())))
+            value = entries.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+            value = await func(*args, **kwargs)
+            if value:
+                entries[key] = value
+            return value
+
+        wrapper.cache_clear = entries.clear  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Return the process-wide aiohttp session, creating it on first use.
+    Must be called while the event loop is running.
+    """
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None or _HTTP_SESSION.closed:
+        _HTTP_SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=20,
+                limit_per_host=10,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            )
+        )
+    return _HTTP_SESSION
+
+
+@contextlib.asynccontextmanager
+async def http_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Borrow the shared session, bounding in-flight requests to 10.
+    The session stays open when the block exits.
+    """
+    async with _HTTP_CONCURRENCY:
+        yield get_http_session()
+
+
+async def close_http_session() -> None:
+    """Close the shared HTTP session (call on shutdown)."""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is not None and not _HTTP_SESSION.closed:
+        await _HTTP_SESSION.close()
+    _HTTP_SESSION = None
+
+
 def fetch_api_json(url: str, *, timeout: float = 10.0) -> dict[str, Any]:
     """
     Fetch JSON from an HTTP endpoint (GET).
@@ -71,6 +382,29 @@ def fetch_api_json(url: str, *, timeout: float = 10.0) -> dict[str, Any]:
         return response.json()
 
 
+async def fetch_api_json_async(url: str, *, timeout: float = 10.0) -> Any:
+    """
+    Fetch JSON from an HTTP endpoint (GET) without blocking the event loop.
+    """
+    async with http_session() as session:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+
+def format_json(data: Any) -> str:
+    """
+    Pretty-print data as indented, key-sorted JSON for display.
+    Falls back to repr() for values that are not JSON-serializable.
+    """
+    try:
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS).decode()
+        return json.dumps(data, indent=2, sort_keys=True)
+    except (TypeError, ValueError):
+        return str(data)
+
+
 def retry_request(
     func: Callable[[], Any],
     *,
@@ -4,20 +4,23 @@ Miscellaneous utility functions.
 
 from __future__ import annotations
 
+import functools
 import re
 import textwrap
 import time
 import uuid
 from typing import List
 
+_DURATION_RE = re.compile(r"(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?")
 
+
+@functools.lru_cache(maxsize=128)
 def parse_duration(expr: str) -> int:
     """
     Parse duration strings like '1h30m', '45m', '10s' into seconds.
     """
     expr = expr.strip().lower()
-    pattern = r"(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?"
-    match = re.fullmatch(pattern, expr)
+    match = _DURATION_RE.fullmatch(expr)
     if not match:
         raise ValueError("Invalid duration expression")
     hours = int(match.group(1) or 0)
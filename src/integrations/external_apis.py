@@ -8,9 +8,10 @@ from __future__ import annotations
 import os
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
-import aiohttp
 import json
 
+from discord_bot.storage_api import http_session
+
 # =============================
 # API Configuration
 # =============================
@@ -99,7 +100,7 @@ class OpenAIProvider:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 async with session.post(
                     f"{OpenAIProvider.BASE_URL}/chat/completions",
                     headers=headers,
@@ -153,7 +154,7 @@ class AnthropicProvider:
             payload["system"] = system_message
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 async with session.post(
                     f"{AnthropicProvider.BASE_URL}/messages",
                     headers=headers,
@@ -200,7 +201,7 @@ class GoogleGeminiProvider:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 async with session.post(
                     f"{GoogleGeminiProvider.BASE_URL}/models/{model}:generateContent?key={api_config.google_api_key}",
                     json=payload
@@ -226,7 +227,7 @@ class ScryfallAPI:
     async def search_card(query: str, limit: int = 5) -> List[Dict]:
         """Search for MTG cards."""
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 async with session.get(
                     f"{ScryfallAPI.BASE_URL}/cards/search",
                     params={"q": query, "order": "name"}
@@ -242,7 +243,7 @@ class ScryfallAPI:
     async def get_card_by_name(name: str) -> Optional[Dict]:
         """Get a specific card by exact name."""
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 async with session.get(
                     f"{ScryfallAPI.BASE_URL}/cards/named",
                     params={"exact": name}
@@ -257,7 +258,7 @@ class ScryfallAPI:
     async def get_random_card() -> Optional[Dict]:
         """Get a random MTG card."""
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 async with session.get(f"{ScryfallAPI.BASE_URL}/cards/random") as response:
                     if response.status == 200:
                         return await response.json()
@@ -281,7 +282,7 @@ class Open5eAPI:
             params["level"] = level
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 async with session.get(
                     f"{Open5eAPI.BASE_URL}/spells",
                     params=params
@@ -303,7 +304,7 @@ class Open5eAPI:
             params["challenge_rating"] = cr
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 async with session.get(
                     f"{Open5eAPI.BASE_URL}/monsters",
                     params=params
@@ -344,7 +345,7 @@ class PerspectiveAPI:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 async with session.post(
                     f"{PerspectiveAPI.BASE_URL}/comments:analyze?key={api_config.perspective_api_key}",
                     json=payload
@@ -376,7 +377,7 @@ class VirusTotalAPI:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 # Submit URL for scanning
                 async with session.post(
                     f"{VirusTotalAPI.BASE_URL}/urls",
@@ -416,7 +417,7 @@ class GitHubAPI:
             headers["Authorization"] = f"token {api_config.github_token}"
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 async with session.get(
                     f"{GitHubAPI.BASE_URL}/repos/{owner}/{repo}",
                     headers=headers
@@ -435,7 +436,7 @@ class GitHubAPI:
             headers["Authorization"] = f"token {api_config.github_token}"
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 async with session.get(
                     f"{GitHubAPI.BASE_URL}/repos/{owner}/{repo}/releases/latest",
                     headers=headers
@@ -7,9 +7,13 @@ from __future__ import annotations
 
 import asyncio
 import datetime as dt
+import functools
+import itertools
+import time
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Optional, List, Dict
+from typing import Any, Callable, Deque, Optional, List, Dict
 
 import discord
 from discord.ext import commands
@@ -20,6 +24,29 @@ from config import (
     SPOTIFY_REDIRECT_URI,
     SPOTIFY_REFRESH_TOKEN,
 )
+from discord_bot.storage_api import async_cached_ttl
+
+
+# Access token obtained from the refresh token, reused until shortly before expiry
+_token_cache: Dict[str, Any] = {"token": None, "expires_at": 0.0}
+_TOKEN_EXPIRY_MARGIN = 60
+# Held while refreshing so commands arriving at expiry share one refresh
+_token_lock = asyncio.Lock()
+
+# Spotify's maximum page size and how many pages may be in flight at once
+_PAGE_SIZE = 50
+_PAGE_CONCURRENCY = 5
+
+
+def _normalize_query(query: str) -> str:
+    """Collapse whitespace and case so equivalent searches share a cache entry."""
+    return " ".join(query.split()).casefold()
+
+
+def _format_duration(duration_ms: int) -> str:
+    """Format a track length in milliseconds as ``m:ss``."""
+    minutes, seconds = divmod(duration_ms // 1000, 60)
+    return f"{minutes}:{seconds:02d}"
 
 
 class LoopMode(Enum):
@@ -52,15 +79,19 @@ class SpotifyIntegration:
     def __init__(self, bot: commands.Bot | None = None):
         self.bot = bot
         self.sp = None
+        self._auth_manager = None
+        self._client_token: Optional[str] = None
         self._initialize_client()
         
         # Voice playback state
         self.voice_client: Optional[discord.VoiceClient] = None
         self.current_track: Optional[Dict[str, Any]] = None
-        self.queue: List[Dict[str, Any]] = []
+        self.queue: Deque[Dict[str, Any]] = deque()
         self.loop_mode: LoopMode = LoopMode.OFF
         self.is_paused: bool = False
         self.volume: float = 0.5
+        # (track, embed) for the voice now-playing card; rebuilt when the track changes
+        self._np_embed: Optional[tuple[Dict[str, Any], discord.Embed]] = None
 
     def _initialize_client(self):
         """Initialize Spotify client if credentials are available."""
@@ -81,10 +112,11 @@ class SpotifyIntegration:
             # If we have a refresh token, use it to get an access token
             if SPOTIFY_REFRESH_TOKEN:
                 try:
-                    token_info = auth_manager.refresh_access_token(SPOTIFY_REFRESH_TOKEN)
-                    # Create Spotify client with the refreshed token directly
-                    self.sp = spotipy.Spotify(auth=token_info['access_token'])
+                    self._auth_manager = auth_manager
+                    self._refresh_token()
+                    self._sync_client()
                 except Exception:
+                    self._auth_manager = None
                     # Fall back to using auth_manager if refresh fails
                     self.sp = spotipy.Spotify(auth_manager=auth_manager)
             else:
@@ -94,13 +126,85 @@ class SpotifyIntegration:
         except Exception as e:
             print(f"Warning: Could not initialize Spotify client: {e}")
 
+    @staticmethod
+    def _token_expiring() -> bool:
+        return not _token_cache["token"] or time.time() >= _token_cache["expires_at"] - _TOKEN_EXPIRY_MARGIN
+
+    def _refresh_token(self) -> None:
+        """Fetch a new access token from the refresh token (blocking HTTP request)."""
+        now = time.time()
+        token_info = self._auth_manager.refresh_access_token(SPOTIFY_REFRESH_TOKEN)
+        _token_cache.update(
+            token=token_info["access_token"],
+            expires_at=now + token_info.get("expires_in", 3600),
+        )
+
+    def _sync_client(self) -> None:
+        """Point the spotipy client at the cached access token if it changed."""
+        if self._client_token != _token_cache["token"]:
+            import spotipy
+
+            self.sp = spotipy.Spotify(auth=_token_cache["token"])
+            self._client_token = _token_cache["token"]
+
+    async def _ensure_token(self) -> None:
+        """
+        Make sure the client holds a valid access token.
+
+        Only applies when authenticating with a refresh token; the cached token
+        is reused until it is within a minute of expiring, so most calls skip
+        the round-trip to the accounts service entirely. The refresh runs in a
+        worker thread, and only once for concurrent callers.
+        """
+        if not self._auth_manager:
+            return
+
+        if self._token_expiring():
+            async with _token_lock:
+                # Another command may have refreshed while this one waited
+                if self._token_expiring():
+                    await asyncio.to_thread(self._refresh_token)
+
+        self._sync_client()
+
+    async def _fetch_pages(self, fetch: Callable[..., Any], limit: int) -> List[Dict[str, Any]]:
+        """
+        Collect up to `limit` items from a paginated endpoint.
+
+        The first page is fetched to learn the total; the remaining pages are
+        then requested concurrently. Calls run in worker threads because
+        spotipy is blocking.
+        """
+        page_size = min(limit, _PAGE_SIZE)
+        first = await asyncio.to_thread(fetch, limit=page_size, offset=0)
+        if not first:
+            return []
+
+        items = list(first.get("items", []))
+        total = min(limit, first.get("total", len(items)))
+        offsets = range(page_size, total, page_size)
+        if not offsets:
+            return items
+
+        semaphore = asyncio.Semaphore(_PAGE_CONCURRENCY)
+
+        async def fetch_page(offset: int) -> Any:
+            async with semaphore:
+                return await asyncio.to_thread(fetch, limit=min(page_size, total - offset), offset=offset)
+
+        for page in await asyncio.gather(*(fetch_page(offset) for offset in offsets)):
+            if page:
+                items.extend(page.get("items", []))
+        return items
+
     async def get_current_track(self) -> Optional[SpotifyTrack]:
         """Get the currently playing track."""
         if not self.sp:
             return None
 
         try:
-            current = self.sp.current_playback()
+            await self._ensure_token()
+            current = await asyncio.to_thread(self.sp.current_playback)
             if not current or not current.get("item"):
                 return None
 
@@ -126,11 +230,16 @@ class SpotifyIntegration:
 
     async def search_track(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Search for tracks on Spotify."""
+        return await self._search_track(_normalize_query(query), limit)
+
+    @async_cached_ttl(ttl=120)
+    async def _search_track(self, query: str, limit: int) -> List[Dict[str, Any]]:
         if not self.sp:
             return []
 
         try:
-            results = self.sp.search(q=query, type="track", limit=limit)
+            await self._ensure_token()
+            results = await asyncio.to_thread(self.sp.search, q=query, type="track", limit=limit)
             tracks = []
             
             if not results:
@@ -151,6 +260,7 @@ class SpotifyIntegration:
             print(f"Error searching tracks: {e}")
             return []
 
+    @async_cached_ttl(ttl=120)
     async def get_top_tracks(self, time_range: str = "medium_term", limit: int = 5) -> List[Dict[str, Any]]:
         """
         Get user's top tracks.
@@ -160,13 +270,11 @@ class SpotifyIntegration:
             return []
 
         try:
-            results = self.sp.current_user_top_tracks(time_range=time_range, limit=limit)
+            await self._ensure_token()
+            items = await self._fetch_pages(functools.partial(self.sp.current_user_top_tracks, time_range=time_range), limit)
             tracks = []
             
-            if not results:
-                return []
-            
-            for item in results.get("items", []):
+            for item in items:
                 artists = ", ".join([artist["name"] for artist in item.get("artists", [])])
                 tracks.append({
                     "name": item.get("name", "Unknown"),
@@ -180,6 +288,7 @@ class SpotifyIntegration:
             print(f"Error getting top tracks: {e}")
             return []
 
+    @async_cached_ttl(ttl=120)
     async def get_top_artists(self, time_range: str = "medium_term", limit: int = 5) -> List[Dict[str, Any]]:
         """
         Get user's top artists.
@@ -189,13 +298,11 @@ class SpotifyIntegration:
             return []
 
         try:
-            results = self.sp.current_user_top_artists(time_range=time_range, limit=limit)
+            await self._ensure_token()
+            items = await self._fetch_pages(functools.partial(self.sp.current_user_top_artists, time_range=time_range), limit)
             artists = []
             
-            if not results:
-                return []
-            
-            for item in results.get("items", []):
+            for item in items:
                 genres = ", ".join(item.get("genres", [])[:3])  # First 3 genres
                 artists.append({
                     "name": item.get("name", "Unknown"),
@@ -209,19 +316,18 @@ class SpotifyIntegration:
             print(f"Error getting top artists: {e}")
             return []
 
+    @async_cached_ttl(ttl=3600)
     async def get_playlists(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get user's playlists."""
         if not self.sp:
             return []
 
         try:
-            results = self.sp.current_user_playlists(limit=limit)
+            await self._ensure_token()
+            items = await self._fetch_pages(self.sp.current_user_playlists, limit)
             playlists = []
             
-            if not results:
-                return []
-            
-            for item in results.get("items", []):
+            for item in items:
                 playlists.append({
                     "name": item.get("name", "Unknown"),
                     "tracks": (item.get("tracks") or {}).get("total", 0),
@@ -273,7 +379,8 @@ class SpotifyIntegration:
         
         try:
             # Try to get current user info
-            user = self.sp.current_user()
+            await self._ensure_token()
+            user = await asyncio.to_thread(self.sp.current_user)
             if user:
                 return f"Spotify integration is active (logged in as: {user.get('display_name', 'Unknown')})"
         except Exception as e:
@@ -307,6 +414,7 @@ class SpotifyIntegration:
         await self.voice_client.disconnect()
         self.voice_client = None
         self.current_track = None
+        self._np_embed = None
         self.queue.clear()
         self.is_paused = False
         return "Disconnected from voice channel."
@@ -325,7 +433,8 @@ class SpotifyIntegration:
         if not tracks:
             return f"No tracks found for '{query}'"
         
-        track = tracks[0]
+        # Copy so queue state never leaks into the cached search results
+        track = dict(tracks[0])
         track["requester"] = requester
         
         # Add to queue
@@ -351,14 +460,18 @@ class SpotifyIntegration:
             if not self.queue:
                 self.current_track = None
                 return
-            track = self.queue.pop(0)
+            track = self.queue.popleft()
         else:
             if not self.queue:
                 self.current_track = None
                 return
-            track = self.queue.pop(0)
+            track = self.queue.popleft()
         
         self.current_track = track
+        self._np_embed = None
+        # Format the display duration once per track rather than on every !np.
+        if "duration_str" not in track and track.get("duration_ms"):
+            track["duration_str"] = _format_duration(track["duration_ms"])
         
         # Note: Spotify API provides preview_url for 30-second samples
         # For full track playback, you would need to integrate with a different service
@@ -430,6 +543,7 @@ class SpotifyIntegration:
         self.voice_client.stop()
         self.queue.clear()
         self.current_track = None
+        self._np_embed = None
         self.is_paused = False
         return "⏹️ Playback stopped and queue cleared."
 
@@ -482,7 +596,7 @@ class SpotifyIntegration:
             lines.append("")
         
         lines.append("**Queue:**")
-        for idx, track in enumerate(self.queue[:10], start=1):
+        for idx, track in enumerate(itertools.islice(self.queue, 10), start=1):
             duration_sec = track.get("duration_ms", 0) // 1000
             duration_str = f"{duration_sec // 60}:{duration_sec % 60:02d}"
             requester = track.get("requester", "Unknown")
@@ -518,7 +632,8 @@ class SpotifyIntegration:
         if position < 1 or position > len(self.queue):
             return f"Invalid position. Queue has {len(self.queue)} track(s)."
         
-        removed = self.queue.pop(position - 1)
+        removed = self.queue[position - 1]
+        del self.queue[position - 1]
         return f"Removed from queue: **{removed['name']}** by {removed['artist']}"
 
     async def shuffle_queue(self) -> str:
@@ -527,9 +642,42 @@ class SpotifyIntegration:
             return "Not enough tracks in queue to shuffle."
         
         import random
-        random.shuffle(self.queue)
+        # Shuffle a list copy: deque indexing is O(n), which would make an
+        # in-place shuffle quadratic.
+        tracks = list(self.queue)
+        random.shuffle(tracks)
+        self.queue = deque(tracks)
         return f"🔀 Shuffled {len(self.queue)} track(s) in the queue."
 
+    def create_voice_now_playing_embed(self) -> Optional[discord.Embed]:
+        """Create (or reuse) the embed for the track playing in voice."""
+        track = self.current_track
+        if not track:
+            return None
+        if self._np_embed and self._np_embed[0] is track:
+            return self._np_embed[1]
+
+        embed = discord.Embed(
+            title="🎵 Now Playing",
+            description=f"**{track['name']}**",
+            color=discord.Color.green(),
+            url=track['url'],
+        )
+        
+        embed.add_field(name="Artist", value=track['artist'], inline=True)
+        embed.add_field(name="Album", value=track.get('album', 'Unknown'), inline=True)
+        
+        if track.get('duration_str'):
+            embed.add_field(name="Duration", value=track['duration_str'], inline=True)
+        
+        if track.get('requester'):
+            embed.add_field(name="Requested by", value=track['requester'], inline=True)
+        
+        embed.set_footer(text="Spotify Music Player")
+        
+        self._np_embed = (track, embed)
+        return embed
+
     def create_queue_embed(self) -> discord.Embed:
         """Create a rich embed for the queue display."""
         embed = discord.Embed(
@@ -547,7 +695,7 @@ class SpotifyIntegration:
         
         if self.queue:
             queue_text = []
-            for idx, track in enumerate(self.queue[:10], start=1):
+            for idx, track in enumerate(itertools.islice(self.queue, 10), start=1):
                 duration_sec = track.get("duration_ms", 0) // 1000
                 duration_str = f"{duration_sec // 60}:{duration_sec % 60:02d}"
                 queue_text.append(f"`{idx}.` **{track['name']}** - {track['artist']} `[{duration_str}]`")
@@ -587,4 +735,5 @@ class SpotifyIntegration:
             await self.voice_client.disconnect()
         self.voice_client = None
         self.current_track = None
+        self._np_embed = None
         self.queue.clear()
@@ -1,5 +1,8 @@
+import os
 from pathlib import Path
 
+import pytest
+
 from src.discord_bot import config_store
 
 
@@ -13,6 +16,45 @@ def test_load_save_config(tmp_path: Path):
     assert loaded["guilds"]["123"]["key"] == "value"
 
 
+def test_load_config_reloads_when_file_changes(tmp_path: Path):
+    path = tmp_path / "config.json"
+    config_store.save_config({"version": 1, "guilds": {"1": {"a": 1}}, "users": {}}, path)
+    first = config_store.load_config(path)
+    first["guilds"]["1"]["a"] = 99  # callers get their own copy
+    assert config_store.load_config(path)["guilds"]["1"]["a"] == 1
+
+    path.write_text('{"version": 1, "guilds": {"1": {"a": 2}}, "users": {}}', encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert config_store.load_config(path)["guilds"]["1"]["a"] == 2
+
+
+@pytest.mark.asyncio
+async def test_debounced_save_is_served_then_flushed(tmp_path: Path):
+    path = tmp_path / "config.json"
+    cfg = config_store.load_config(path)
+    cfg["guilds"]["1"] = {"key": "value"}
+    config_store._schedule_save(cfg, path)
+    cfg["guilds"]["1"]["key"] = "changed later"  # the pending save is a snapshot
+
+    assert not path.exists()
+    assert config_store.load_config(path)["guilds"]["1"]["key"] == "value"
+
+    config_store.flush_config()
+    assert path.exists()
+    assert config_store.load_config(path)["guilds"]["1"]["key"] == "value"
+
+
+@pytest.mark.asyncio
+async def test_save_config_supersedes_pending_save(tmp_path: Path):
+    path = tmp_path / "config.json"
+    config_store._schedule_save({"version": 1, "guilds": {"1": {"key": "old"}}, "users": {}}, path)
+    config_store.save_config({"version": 1, "guilds": {"1": {"key": "new"}}, "users": {}}, path)
+
+    config_store.flush_config()
+    assert config_store.load_config(path)["guilds"]["1"]["key"] == "new"
+
+
 def test_migrate_config(tmp_path: Path):
     path = tmp_path / "config.json"
     cfg = {"version": 0, "guilds": {}, "users": {}}
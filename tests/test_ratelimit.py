@@ -0,0 +1,85 @@
+import asyncio
+import time
+import types
+
+import discord
+import pytest
+
+from src.discord_bot import ratelimit
+
+
+def _http_error(status: int) -> discord.HTTPException:
+    response = types.SimpleNamespace(status=status, reason="error", headers={"Retry-After": "0.001"})
+    return discord.HTTPException(response, "error")
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(ratelimit.random, "random", lambda: 0.0)
+    yield
+    ratelimit.BUCKETS.clear()
+
+
+@pytest.mark.asyncio
+async def test_bucket_serves_waiters_in_order():
+    bucket = ratelimit.TokenBucket(rate=1, per=0.01)
+    order = []
+
+    async def take(i):
+        await bucket.acquire()
+        order.append(i)
+
+    await asyncio.gather(*(take(i) for i in range(5)))
+    assert order == list(range(5))
+
+
+@pytest.mark.asyncio
+async def test_bucket_refills_over_time():
+    bucket = ratelimit.TokenBucket(rate=2, per=0.1)
+    start = time.monotonic()
+    await bucket.acquire()
+    await bucket.acquire()
+    assert time.monotonic() - start < 0.02
+    await bucket.acquire()  # one token refills every 0.05 s
+    assert time.monotonic() - start >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_throttled_retries_429():
+    calls = []
+
+    async def request():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _http_error(429)
+        return "ok"
+
+    assert await ratelimit.throttled("test:429", request, rate=10, per=0.1) == "ok"
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_throttled_gives_up_after_retries():
+    calls = []
+
+    async def request():
+        calls.append(1)
+        raise _http_error(429)
+
+    with pytest.raises(discord.HTTPException):
+        await ratelimit.throttled("test:exhausted", request, rate=10, per=0.1, retries=2)
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_throttled_reraises_other_errors_immediately():
+    calls = []
+
+    async def request():
+        calls.append(1)
+        raise _http_error(403)
+
+    with pytest.raises(discord.HTTPException) as info:
+        await ratelimit.throttled("test:403", request, rate=10, per=0.1)
+    assert info.value.status == 403
+    assert len(calls) == 1
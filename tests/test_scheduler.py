@@ -24,3 +24,21 @@ async def test_cancel_task():
 
     task_id = scheduler.schedule_task(60, _cb)
     assert scheduler.cancel_task(task_id) is True
+
+
+@pytest.mark.asyncio
+async def test_temporary_message_returns_before_delete():
+    class _Message:
+        deleted = False
+
+        async def delete(self):
+            self.deleted = True
+
+    class _Channel:
+        async def send(self, content):
+            return _Message()
+
+    message = await scheduler.temporary_message(_Channel(), "hi", 0.01)
+    assert message.deleted is False
+    await asyncio.sleep(0.05)
+    assert message.deleted is True
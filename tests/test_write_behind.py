@@ -0,0 +1,71 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from src.discord_bot import community_features, leveling_system, storage_api
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    storage_api.close_shared_connection()
+    monkeypatch.setattr(storage_api, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(storage_api, "DB_PATH", tmp_path / "db.sqlite3")
+    leveling_system.init_leveling_database()
+    community_features.init_community_database()
+    yield tmp_path / "db.sqlite3"
+    storage_api.close_shared_connection()
+
+
+def test_schedule_writes_through_without_loop(temp_db):
+    community_features._stats_pending[(1, "2026-01-01")] = [1, 0, 2]
+    community_features._stats_writer.schedule()
+    assert not community_features._stats_pending
+    with sqlite3.connect(temp_db) as conn:
+        row = conn.execute(
+            "SELECT members_joined, messages_sent FROM server_stats WHERE guild_id = 1"
+        ).fetchone()
+    assert row == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_buffered_xp_is_visible_to_readers(temp_db):
+    await leveling_system.add_xp(1, 2, 100)
+    assert (1, 2) in leveling_system._xp_pending
+    stats = await leveling_system.get_user_stats(1, 2)
+    assert stats["xp"] == 100
+    assert not leveling_system._xp_pending
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_buffers_and_retries(temp_db, monkeypatch):
+    real_upsert = storage_api.bulk_upsert
+    calls = {"failed": 0}
+    failing = {"on": True}
+
+    def flaky_upsert(*args, **kwargs):
+        if failing["on"]:
+            calls["failed"] += 1
+            raise sqlite3.OperationalError("database is locked")
+        return real_upsert(*args, **kwargs)
+
+    monkeypatch.setattr(leveling_system, "bulk_upsert", flaky_upsert)
+    monkeypatch.setattr(community_features, "bulk_upsert", flaky_upsert)
+    monkeypatch.setattr(leveling_system._xp_writer, "interval", 0.01)
+    monkeypatch.setattr(community_features._stats_writer, "interval", 0.01)
+
+    await leveling_system.add_xp(1, 2, 100)
+    await community_features.update_server_stats(1, messages_sent=3)
+    await asyncio.sleep(0.1)
+    assert calls["failed"] >= 4  # both writers retried after failing
+    assert leveling_system._xp_pending[(1, 2)][0] == 100
+    assert list(community_features._stats_pending.values()) == [[0, 0, 3]]
+    assert (1, 2) not in leveling_system._xp_totals
+
+    failing["on"] = False
+    await asyncio.sleep(0.1)
+    assert not leveling_system._xp_pending
+    assert not community_features._stats_pending
+    stats = await community_features.get_server_stats(1)
+    assert stats[0].messages_sent == 3
+    assert (await leveling_system.get_user_stats(1, 2))["xp"] == 100